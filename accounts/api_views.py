@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from figflix.pagination import paginate
 from .serializers import UserRegistrationSerializer, UserSerializer, UserPreferenceSerializer
 from .models import UserPreference
 
@@ -92,13 +93,14 @@ def list_users_view(request):
     """
     List all users (Admin only).
     GET /api/users/
+    GET /api/users/?cursor=   (paginated)
     """
     if request.user.role != 'admin':
         return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
 
-    users = User.objects.all().order_by('-date_joined')
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data)
+    ordering = ('-date_joined', '-id')
+    users = User.objects.select_related('preferences').order_by(*ordering)
+    return paginate(request, users, UserSerializer, ordering)
 
 
 @api_view(['GET'])
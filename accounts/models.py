@@ -24,6 +24,12 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.role})"
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pagination of the admin user list (figflix.pagination)
+            models.Index(fields=['-date_joined', '-id'], name='user_date_joined_idx'),
+        ]
+
     @property
     def is_admin_user(self):
         """Check if user has admin role"""
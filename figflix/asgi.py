@@ -4,8 +4,14 @@ ASGI config for figflix project.
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'figflix.settings')
 
 application = get_asgi_application()
+
+if settings.AUTOCOMPLETE_WARM_START:
+    from movies.autocomplete import movie_autocomplete
+
+    movie_autocomplete.warm()
@@ -0,0 +1,41 @@
+"""
+System checks for features that rely on a cache shared by all workers.
+
+Table versions (conditional.py) live in the default cache. In a
+per-process backend, a write handled by one worker is invisible to the
+others, which keep serving 304s and cached data from before it. Such a
+backend is only safe with a single process, so these features are refused
+on one rather than trusted to a settings comment. Registered by
+MoviesConfig.ready().
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends whose entries are not seen by other processes
+PER_PROCESS_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Settings that need a shared cache, with their check ids
+SHARED_CACHE_FEATURES = (
+    ('CONDITIONAL_GET_ENABLED', 'figflix.E001'),
+    ('RESPONSE_CACHE_ENABLED', 'figflix.E002'),
+)
+
+
+@register(Tags.caches)
+def check_shared_cache_features(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PER_PROCESS_BACKENDS:
+        return []
+    return [
+        Error(
+            f'{setting} is enabled, but the default cache ({backend}) is not '
+            f'shared between processes.',
+            hint=f'Set REDIS_URL to use a shared cache, or set {setting}=False.',
+            id=check_id,
+        )
+        for setting, check_id in SHARED_CACHE_FEATURES
+        if getattr(settings, setting)
+    ]
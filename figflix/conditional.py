@@ -0,0 +1,110 @@
+"""
+Conditional GET (ETag / Last-Modified) for read endpoints.
+
+Each table that feeds a cached response has a version counter in the Django
+cache, bumped by signals and bulk writers whenever the table changes. A
+view decorated with conditional_get(Model, ...) derives its validators
+from those counters and the request URL, so a matching If-None-Match or
+If-Modified-Since is answered with 304 before any query or serialization.
+
+Counters are microsecond timestamps of the last change, which also gives
+Last-Modified (one-second resolution, so only a fallback for clients that
+do not send If-None-Match). A counter lost to eviction or a cache restart
+is reseeded from the clock, so it never comes back with a value an old
+ETag used.
+
+Counters in a per-process cache would miss other workers' writes and
+answer 304 with stale data, so validators are only sent with
+CONDITIONAL_GET_ENABLED, which defaults to on when REDIS_URL configures a
+shared cache; figflix/checks.py refuses it on a per-process backend.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+KEY_PREFIX = 'table_version:'
+
+
+def _key(model) -> str:
+    return KEY_PREFIX + model._meta.label_lower
+
+
+def _now() -> int:
+    return time.time_ns() // 1000
+
+
+def table_versions(*models) -> tuple:
+    """Current version of each model's table."""
+    keys = [_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = _now()
+        for key in missing:
+            # add() keeps a value another process set in the meantime
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+    return tuple(versions.get(key, 0) for key in keys)
+
+
+def bump(*models):
+    """
+    Mark the models' tables as changed once the current transaction commits.
+
+    Bumping after commit means a reader never pairs a new version with
+    rows from before the change.
+    """
+    def apply():
+        now = _now()
+        for model in models:
+            key = _key(model)
+            cache.set(key, max(now, cache.get(key, 0) + 1), timeout=None)
+
+    transaction.on_commit(apply)
+
+
+def conditional_get(*models):
+    """
+    Decorator adding ETag and Last-Modified to a view whose response depends
+    only on the request URL and the tables of `models`.
+
+    Place it under @api_view, or on the get() method of a class view via
+    method_decorator, so DRF authentication runs first.
+    """
+    def versions(request):
+        if not hasattr(request, '_table_versions'):
+            request._table_versions = table_versions(*models)
+        return request._table_versions
+
+    def etag(request, *args, **kwargs):
+        parts = [
+            request.get_host(), request.get_full_path(), request.headers.get('Accept', ''),
+            *map(str, versions(request)),
+        ]
+        return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        return datetime.fromtimestamp(max(versions(request)) / 1_000_000, tz=timezone.utc)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not settings.CONDITIONAL_GET_ENABLED:
+                return view(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            # Revalidate on every use instead of heuristic freshness from Last-Modified
+            if not response.has_header('Cache-Control'):
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+
+    return decorator
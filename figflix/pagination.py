@@ -0,0 +1,203 @@
+"""
+Pagination for the API.
+
+FlexiblePagination is the default pagination class. It keeps the existing
+page-number responses and adds two opt-in modes:
+
+    ?count=false   page-number pagination without the COUNT(*) query
+                   ('count' is null; 'next' is found by fetching one extra row)
+    ?cursor=       keyset pagination on an indexed (timestamp, id) ordering:
+                   no COUNT and no OFFSET, so every page costs the same.
+                   Pass the returned 'next' URL to continue.
+
+Views opt in to cursor mode by declaring `cursor_ordering`, or by
+defining get_cursor_ordering() that returns None when the current request
+is ordered some other way (e.g. by search rank).
+
+Function views that historically returned whole lists use paginate(),
+which only paginates when the client passes a pagination parameter.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+CURSOR_PARAM = 'cursor'
+COUNT_PARAM = 'count'
+PAGINATION_PARAMS = (CURSOR_PARAM, 'page', 'page_size')
+
+
+def _encode_cursor(values: List) -> str:
+    raw = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode()
+
+
+def _decode_cursor(cursor: str, fields: Sequence[str], model) -> List:
+    """
+    Values of a cursor from _encode_cursor(), converted by their fields.
+
+    Cursors come from clients, so anything that is not one scalar per
+    field, valid for that field, is answered with 404 rather than reaching
+    the query.
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise NotFound('Invalid cursor')
+    if not isinstance(raw, list) or len(raw) != len(fields):
+        raise NotFound('Invalid cursor')
+
+    values = []
+    for field_name, value in zip(fields, raw):
+        # bool is an int, but never one a cursor holds
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            raise NotFound('Invalid cursor')
+        field = model._meta.get_field(field_name)
+        try:
+            value = field.to_python(value)
+            if value is None:
+                raise NotFound('Invalid cursor')
+            # Range checks, e.g. an id too large for its integer column
+            field.run_validators(value)
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound('Invalid cursor')
+        values.append(value)
+    return values
+
+
+def keyset_filter(ordering: Sequence[str], values: Sequence) -> Q:
+    """
+    Rows strictly after `values` in `ordering`, e.g. for ('-created_at', '-id'):
+    created_at <= v0 AND (created_at < v0 OR (created_at = v0 AND id < v1)).
+
+    The leading inclusive bound is redundant but lets the database seek the
+    index instead of scanning it from the start to evaluate the OR.
+    """
+    condition = Q()
+    for i, order in enumerate(reversed(ordering)):
+        index = len(ordering) - 1 - i
+        field = order.lstrip('-')
+        lookup = 'lt' if order.startswith('-') else 'gt'
+        after = Q(**{f'{field}__{lookup}': values[index]})
+        condition = after if i == 0 else after | (Q(**{field: values[index]}) & condition)
+
+    first = ordering[0]
+    lookup = 'lte' if first.startswith('-') else 'gte'
+    return Q(**{f'{first.lstrip("-")}__{lookup}': values[0]}) & condition
+
+
+class FlexiblePagination(PageNumberPagination):
+    """
+    Page-number pagination with opt-in count skipping and keyset cursors.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_cursor_ordering(self, view) -> Optional[Sequence[str]]:
+        if view is None:
+            return None
+        if hasattr(view, 'get_cursor_ordering'):
+            return view.get_cursor_ordering()
+        return getattr(view, 'cursor_ordering', None)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.mode = 'page'
+        ordering = self.get_cursor_ordering(view)
+
+        if CURSOR_PARAM in request.query_params and ordering:
+            self.mode = 'cursor'
+            return self._paginate_cursor(queryset, request, ordering)
+        if request.query_params.get(COUNT_PARAM) in ('false', '0'):
+            self.mode = 'nocount'
+            return self._paginate_without_count(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def _paginate_cursor(self, queryset, request, ordering):
+        page_size = self.get_page_size(request)
+        fields = [order.lstrip('-') for order in ordering]
+        queryset = queryset.order_by(*ordering)
+
+        cursor = request.query_params.get(CURSOR_PARAM)
+        if cursor:
+            values = _decode_cursor(cursor, fields, queryset.model)
+            queryset = queryset.filter(keyset_filter(ordering, values))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = (
+            _encode_cursor([getattr(rows[-1], f) for f in fields]) if self.has_next else None
+        )
+        return rows
+
+    def _paginate_without_count(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = max(int(request.query_params.get(self.page_query_param, 1)), 1)
+        except ValueError:
+            raise NotFound('Invalid page.')
+        offset = (self.page_number - 1) * page_size
+
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_next_link(self):
+        url = self.request.build_absolute_uri()
+        if self.mode == 'cursor':
+            return replace_query_param(url, CURSOR_PARAM, self.next_cursor) if self.has_next else None
+        if self.mode == 'nocount':
+            return replace_query_param(url, self.page_query_param, self.page_number + 1) if self.has_next else None
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        url = self.request.build_absolute_uri()
+        if self.mode == 'cursor':
+            # Keyset cursors are forward-only
+            return None
+        if self.mode == 'nocount':
+            if self.page_number <= 1:
+                return None
+            if self.page_number == 2:
+                return remove_query_param(url, self.page_query_param)
+            return replace_query_param(url, self.page_query_param, self.page_number - 1)
+        return super().get_previous_link()
+
+    def get_paginated_response(self, data):
+        count = None if self.mode in ('cursor', 'nocount') else self.page.paginator.count
+        return Response({
+            'count': count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count']['nullable'] = True
+        return schema
+
+
+def paginate(request, queryset, serializer_class, cursor_ordering: Sequence[str], **serializer_kwargs):
+    """
+    Respond with a paginated list if the client asked for pagination
+    (?cursor=, ?page= or ?page_size=), otherwise with the whole list as
+    before. Used by function views that predate pagination.
+    """
+    if not any(param in request.query_params for param in PAGINATION_PARAMS):
+        serializer = serializer_class(queryset, many=True, context={'request': request}, **serializer_kwargs)
+        return Response(serializer.data)
+
+    paginator = FlexiblePagination()
+    view = type('PaginatedView', (), {'cursor_ordering': cursor_ordering})()
+    page = paginator.paginate_queryset(queryset, request, view)
+    serializer = serializer_class(page, many=True, context={'request': request}, **serializer_kwargs)
+    return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,30 @@
+"""
+Fast JSON parsing for the REST API; see renderers.py for the renderer.
+
+FastJSONParser parses with orjson when it is installed and the request
+body is UTF-8, and falls back to DRF's JSONParser otherwise. orjson, like
+JSONParser in strict mode, rejects NaN and infinity.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    Drop-in replacement for JSONParser built on orjson.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
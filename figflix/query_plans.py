@@ -0,0 +1,121 @@
+"""
+EXPLAIN-based checks that hot queries are answered from indexes.
+
+Each PlanCheck names the tables a query must reach through an index, and
+whether its ORDER BY must come from an index; explain() runs the
+database's EXPLAIN on the compiled queryset and reports every listed table
+read by a full scan and any separate sort step. Used by
+`manage.py check_query_plans`.
+
+On SQLite, any SCAN of a listed table fails (SEARCH is an index seek), as
+does a temporary B-tree for ORDER BY (one that only orders ties, "RIGHT
+PART OF ORDER BY", is accepted). On PostgreSQL, sequential scans are
+disabled for the check (enable_seqscan=off), so a Seq Scan on a listed
+table means no usable index exists rather than that the planner preferred
+one on a small table; a Sort node fails an index-ordered check. Other
+databases raise UnsupportedDatabase.
+"""
+import json
+import re
+from typing import Callable, List, NamedTuple, Tuple
+
+from django.db import connections, transaction
+from django.db.models import QuerySet
+
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+
+# "movies_movie_genres" U0 -> alias U0 of table movies_movie_genres
+_ALIAS_RE = re.compile(r'"(\w+)" ([A-Z]\d+)\b')
+_SQLITE_SCAN_RE = re.compile(r'^SCAN (\w+)')
+
+
+class UnsupportedDatabase(Exception):
+    """The database has no plan checks (see SUPPORTED_VENDORS)."""
+
+
+class PlanCheck(NamedTuple):
+    label: str
+    # Builds the queryset lazily, after apps are loaded
+    queryset: Callable[[], QuerySet]
+    # Tables that must not be read by a full scan
+    indexed_tables: Tuple[str, ...] = ()
+    # Rows must come out of an index in ORDER BY order, without a sort step
+    index_ordered: bool = False
+
+
+class PlanResult(NamedTuple):
+    check: PlanCheck
+    plan: List[str]
+    full_scans: List[str]
+    has_sort: bool
+
+    @property
+    def ok(self) -> bool:
+        return not self.full_scans and not (self.check.index_ordered and self.has_sort)
+
+    @property
+    def problems(self) -> List[str]:
+        problems = [f'full scan of {table}' for table in self.full_scans]
+        if self.check.index_ordered and self.has_sort:
+            problems.append('sort step for ORDER BY')
+        return problems
+
+
+def _explain_sqlite(connection, sql: str, params, tables) -> Tuple[List[str], List[str], bool]:
+    aliases = {alias: table for table, alias in _ALIAS_RE.findall(sql)}
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        details = [row[3] for row in cursor.fetchall()]
+
+    scanned = []
+    for detail in details:
+        match = _SQLITE_SCAN_RE.match(detail)
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            if table in tables:
+                scanned.append(table)
+    return details, scanned, any(d.startswith('USE TEMP B-TREE FOR ORDER BY') for d in details)
+
+
+def _walk_postgresql(node, depth, lines, scanned, sorts, tables):
+    relation = node.get('Relation Name')
+    line = '  ' * depth + node['Node Type']
+    if relation:
+        line += f' on {relation}'
+    if node.get('Index Name'):
+        line += f' using {node["Index Name"]}'
+    lines.append(line)
+    if node['Node Type'] == 'Seq Scan' and relation in tables:
+        scanned.append(relation)
+    if node['Node Type'] in ('Sort', 'Incremental Sort'):
+        sorts.append(node['Node Type'])
+    for child in node.get('Plans', []):
+        _walk_postgresql(child, depth + 1, lines, scanned, sorts, tables)
+
+
+def _explain_postgresql(connection, sql: str, params, tables) -> Tuple[List[str], List[str], bool]:
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        document = cursor.fetchone()[0]
+    if isinstance(document, str):
+        document = json.loads(document)
+
+    lines, scanned, sorts = [], [], []
+    _walk_postgresql(document[0]['Plan'], 0, lines, scanned, sorts, tables)
+    return lines, scanned, bool(sorts)
+
+
+def explain(check: PlanCheck) -> PlanResult:
+    """Run EXPLAIN for a check's queryset and collect what makes it slow."""
+    queryset = check.queryset()
+    connection = connections[queryset.db]
+    if connection.vendor not in SUPPORTED_VENDORS:
+        raise UnsupportedDatabase(f'Query plan checks are not available on {connection.vendor}')
+
+    sql, params = queryset.query.sql_with_params()
+    if connection.vendor == 'sqlite':
+        plan, scanned, sort = _explain_sqlite(connection, sql, params, check.indexed_tables)
+    else:
+        plan, scanned, sort = _explain_postgresql(connection, sql, params, check.indexed_tables)
+    return PlanResult(check, plan, sorted(set(scanned)), sort)
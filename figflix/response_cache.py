@@ -0,0 +1,167 @@
+"""
+Server-side cache of rendered responses for anonymous read endpoints.
+
+Entries are keyed by view, host, Accept header, normalized query string and
+the current version of every table the view reads (see conditional.py).
+Any write to those tables bumps a version, so stale entries are never
+looked up again and simply expire. Hits are served without running DRF,
+the view or any query, and still answer If-None-Match with 304.
+
+Only anonymous GET requests (no session user, no Authorization header) are
+cached. Configure with RESPONSE_CACHE_ENABLED / RESPONSE_CACHE_TIMEOUT;
+hit ratios per view are reported by response_cache.stats(). Like table
+versions, entries must be shared by all workers: the cache defaults to off
+without REDIS_URL, and figflix/checks.py refuses it on a per-process backend.
+"""
+import hashlib
+import threading
+from collections import defaultdict
+from functools import wraps
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from .conditional import table_versions
+
+KEY_PREFIX = 'response:'
+
+# Response headers replayed on a hit
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Vary', 'Allow')
+
+
+class ResponseCache:
+    """
+    Rendered-response store with per-view hit/miss counters.
+    """
+
+    def __init__(self, cache_alias: str = 'default'):
+        self.cache_alias = cache_alias
+        self._counters = defaultdict(lambda: {'hits': 0, 'misses': 0, 'bypassed': 0})
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def make_key(self, name: str, request, versions: tuple) -> str:
+        """
+        Build a key from the view name, the request and table versions.
+
+        Query parameters are sorted so ?a=1&b=2 and ?b=2&a=1 share an entry.
+        """
+        query = urlencode(sorted(request.GET.lists()), doseq=True)
+        raw = '|'.join([
+            name, request.get_host(), request.path, query,
+            request.headers.get('Accept', ''), *map(str, versions),
+        ])
+        return KEY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.cache.get(key)
+
+    def set(self, key: str, response, timeout: int):
+        entry = {
+            'status': response.status_code,
+            'content': response.content,
+            'headers': {h: response[h] for h in STORED_HEADERS if response.has_header(h)},
+        }
+        self.cache.set(key, entry, timeout=timeout)
+
+    def record(self, name: str, counter: str):
+        with self._lock:
+            self._counters[name][counter] += 1
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for this process, overall and per view."""
+        with self._lock:
+            views = {name: dict(counters) for name, counters in self._counters.items()}
+        totals = {'hits': 0, 'misses': 0, 'bypassed': 0}
+        for counters in views.values():
+            for counter, value in counters.items():
+                totals[counter] += value
+            lookups = counters['hits'] + counters['misses']
+            counters['hit_ratio'] = round(counters['hits'] / lookups, 4) if lookups else 0.0
+        lookups = totals['hits'] + totals['misses']
+        totals['hit_ratio'] = round(totals['hits'] / lookups, 4) if lookups else 0.0
+        return {**totals, 'views': views}
+
+
+response_cache = ResponseCache()
+
+
+def _is_anonymous(request) -> bool:
+    user = getattr(request, 'user', None)
+    return (
+        'HTTP_AUTHORIZATION' not in request.META
+        and (user is None or not user.is_authenticated)
+    )
+
+
+def _replay(request, entry: Dict) -> HttpResponse:
+    headers = entry['headers']
+    last_modified = headers.get('Last-Modified')
+    not_modified = get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+    )
+    if not_modified is not None:
+        for header in ('ETag', 'Last-Modified', 'Cache-Control', 'Vary'):
+            if header in headers:
+                not_modified[header] = headers[header]
+        return not_modified
+
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def cache_response(*models, timeout: Optional[int] = None, name: Optional[str] = None):
+    """
+    Cache a read view's rendered responses for anonymous clients.
+
+    Wrap the outermost view callable (outside @api_view, or `dispatch` of a
+    class view via method_decorator) so that hits skip DRF entirely.
+
+    Args:
+        models: models whose tables the response is built from
+        timeout: seconds to keep an entry (default RESPONSE_CACHE_TIMEOUT);
+            0 disables caching for the view
+        name: label for keys and metrics (default: the view's name)
+    """
+    def decorator(view):
+        # as_view() functions (including @api_view ones) are all named "view"
+        label = name or getattr(view, 'view_class', view).__name__
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            ttl = settings.RESPONSE_CACHE_TIMEOUT if timeout is None else timeout
+            if not settings.RESPONSE_CACHE_ENABLED or not ttl or request.method != 'GET':
+                return view(request, *args, **kwargs)
+            if not _is_anonymous(request):
+                response_cache.record(label, 'bypassed')
+                return view(request, *args, **kwargs)
+
+            key = response_cache.make_key(label, request, table_versions(*models))
+            entry = response_cache.get(key)
+            if entry is not None:
+                response_cache.record(label, 'hits')
+                return _replay(request, entry)
+
+            response_cache.record(label, 'misses')
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.cookies and not response.streaming:
+                if hasattr(response, 'render') and not response.is_rendered:
+                    response.add_post_render_callback(lambda r: response_cache.set(key, r, ttl))
+                else:
+                    response_cache.set(key, response, ttl)
+            return response
+        return wrapper
+
+    return decorator
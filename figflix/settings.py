@@ -107,6 +107,72 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache. Table versions (figflix/conditional.py) and everything validated by
+# them must be shared by all worker processes, so set REDIS_URL for any
+# multi-process deployment; without it each process has its own memory cache
+# and features that need a shared one are off by default (see figflix/checks.py).
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+SHARED_CACHE = bool(REDIS_URL)
+
+# ETag / Last-Modified on catalog reads (figflix/conditional.py)
+CONDITIONAL_GET_ENABLED = config('CONDITIONAL_GET_ENABLED', default=SHARED_CACHE, cast=bool)
+
+# Full-text search (movies/search.py); text search configuration on PostgreSQL
+SEARCH_PG_CONFIG = 'english'
+# Shorter final words match whole words only: very short prefixes match
+# most of the catalog and make ranking slow
+SEARCH_MIN_PREFIX_LENGTH = 3
+
+# Rendered-response cache for anonymous catalog reads (figflix/response_cache.py).
+# Entries are invalidated through table versions; the timeout only bounds memory.
+# Needs the shared cache, like conditional GET.
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=SHARED_CACHE, cast=bool)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=60 * 10, cast=int)
+
+# Catalog facet counts (movies/facets.py), cached per filter signature and
+# invalidated by catalog writes; 0 disables the cache, which needs a shared
+# one to see writes from other processes
+FACETS_CACHE_TIMEOUT = 60 * 30 if SHARED_CACHE else 0
+
+# Search-box autocomplete (movies/autocomplete.py): in-memory prefix index
+# per process, built in the background. Warm start begins when a WSGI/ASGI
+# worker starts, otherwise on the first query, which gets no suggestions
+# until it is done; writes from other processes are picked up every
+# AUTOCOMPLETE_REFRESH_INTERVAL seconds, and local writes beyond
+# AUTOCOMPLETE_OVERLAY_MAX trigger a rebuild.
+AUTOCOMPLETE_WARM_START = config('AUTOCOMPLETE_WARM_START', default=True, cast=bool)
+AUTOCOMPLETE_REFRESH_INTERVAL = config('AUTOCOMPLETE_REFRESH_INTERVAL', default=60 * 5, cast=int)
+AUTOCOMPLETE_OVERLAY_MAX = 1000
+
+# Image proxy: resized poster/backdrop variants (see movies/image_proxy.py)
+IMAGE_PROXY_CACHE_DIR = config('IMAGE_PROXY_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'images'))
+IMAGE_PROXY_CACHE_MAX_BYTES = config('IMAGE_PROXY_CACHE_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
+IMAGE_PROXY_WIDTHS = (92, 185, 342, 500, 780, 1280)
+# Variant width emitted by serializers per image kind and context
+IMAGE_PROXY_VARIANTS = {
+    'poster': {'list': 342, 'detail': 780},
+    'backdrop': {'list': 780, 'detail': 1280},
+}
+IMAGE_PROXY_QUALITY = 80
+IMAGE_PROXY_ALLOWED_HOSTS = ['image.tmdb.org']
+# TMDb rendition downloaded once as the source of all variants
+IMAGE_PROXY_TMDB_SOURCE_SIZE = 'original'
+IMAGE_PROXY_MAX_SOURCE_BYTES = 15 * 1024 * 1024
+IMAGE_PROXY_MAX_AGE = 60 * 60 * 24 * 365
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -122,8 +188,19 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'figflix.pagination.FlexiblePagination',
     'PAGE_SIZE': 20,
+    # orjson-based JSON (optional: `poetry install -E fast-json`); both fall
+    # back to DRF's stdlib json classes when orjson is not installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'figflix.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'figflix.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # JWT Settings
@@ -146,6 +223,66 @@ TMDB_API_KEY = config('TMDB_API_KEY', default='')
 TMDB_BASE_URL = config('TMDB_BASE_URL', default='https://api.themoviedb.org/3')
 TMDB_IMAGE_BASE_URL = config('TMDB_IMAGE_BASE_URL', default='https://image.tmdb.org/t/p/w500')
 
+# TMDb HTTP client: keep-alive connection pool and retry policy
+TMDB_POOL_CONNECTIONS = config('TMDB_POOL_CONNECTIONS', default=4, cast=int)
+TMDB_POOL_MAXSIZE = config('TMDB_POOL_MAXSIZE', default=16, cast=int)
+TMDB_MAX_RETRIES = config('TMDB_MAX_RETRIES', default=3, cast=int)
+TMDB_BACKOFF_FACTOR = config('TMDB_BACKOFF_FACTOR', default=0.5, cast=float)
+# Longest wait between retries, including one asked for by Retry-After
+TMDB_BACKOFF_MAX = config('TMDB_BACKOFF_MAX', default=10, cast=float)
+TMDB_CONNECT_TIMEOUT = config('TMDB_CONNECT_TIMEOUT', default=3.05, cast=float)
+TMDB_READ_TIMEOUT = config('TMDB_READ_TIMEOUT', default=10, cast=float)
+
+# Per-endpoint (connect, read) timeouts, matched by longest endpoint prefix
+TMDB_TIMEOUTS = {
+    '/search/movie': (TMDB_CONNECT_TIMEOUT, 5),
+    '/genre/movie/list': (TMDB_CONNECT_TIMEOUT, 5),
+}
+
+# TMDb response cache: in-process LRU in front of the Django cache.
+# Set REDIS_URL to share entries between workers.
+TMDB_CACHE_ENABLED = config('TMDB_CACHE_ENABLED', default=True, cast=bool)
+TMDB_CACHE_LOCAL_MAXSIZE = config('TMDB_CACHE_LOCAL_MAXSIZE', default=512, cast=int)
+TMDB_CACHE_DEFAULT_TTL = 60 * 30
+# How long an expired entry may still be served while it is refreshed
+TMDB_CACHE_STALE_TTL = config('TMDB_CACHE_STALE_TTL', default=60 * 60, cast=int)
+
+# Per-endpoint freshness in seconds, matched by longest endpoint prefix
+TMDB_CACHE_TTLS = {
+    '/genre/movie/list': 60 * 60 * 24,
+    '/movie/popular': 60 * 15,
+    '/movie/top_rated': 60 * 60,
+    '/discover/movie': 60 * 30,
+    '/search/movie': 60 * 10,
+    '/movie/': 60 * 60 * 6,
+}
+
+# Last successful payload per request, served while TMDb is unreachable
+TMDB_CACHE_LAST_GOOD_TTL = 60 * 60 * 24 * 7
+
+# Client-side rate limit shared by all workers (TMDb allows roughly 50 requests/second)
+TMDB_RATE_LIMIT = config('TMDB_RATE_LIMIT', default=40, cast=int)
+# Longest a request may wait for the rate limit before it is dropped
+TMDB_RATE_LIMIT_MAX_WAIT = config('TMDB_RATE_LIMIT_MAX_WAIT', default=2.0, cast=float)
+
+# Circuit breaker: stop calling TMDb after repeated failures, probe again after the reset timeout
+TMDB_BREAKER_FAILURE_THRESHOLD = config('TMDB_BREAKER_FAILURE_THRESHOLD', default=5, cast=int)
+TMDB_BREAKER_FAILURE_WINDOW = 60
+TMDB_BREAKER_RESET_TIMEOUT = config('TMDB_BREAKER_RESET_TIMEOUT', default=30, cast=int)
+
+# Request coalescing: how long a worker may hold the upstream-fetch lock for a
+# key, and how long other workers wait on it before fetching themselves
+TMDB_SINGLEFLIGHT_LOCK_TIMEOUT = 30
+TMDB_SINGLEFLIGHT_WAIT_TIMEOUT = 15
+
+# Serve TMDb popular/top-rated/discover listings from the local mirror
+# kept up to date by `python manage.py sync_tmdb_catalog`
+TMDB_SERVE_FROM_MIRROR = config('TMDB_SERVE_FROM_MIRROR', default=False, cast=bool)
+
+# Serve the TMDb proxy endpoints with async views (run under ASGI, e.g. uvicorn figflix.asgi:application)
+TMDB_ASYNC_VIEWS = config('TMDB_ASYNC_VIEWS', default=False, cast=bool)
+TMDB_ASYNC_MAX_CONNECTIONS = config('TMDB_ASYNC_MAX_CONNECTIONS', default=100, cast=int)
+
 # Login/Logout URLs
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
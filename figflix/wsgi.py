@@ -4,8 +4,14 @@ WSGI config for figflix project.
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'figflix.settings')
 
 application = get_wsgi_application()
+
+if settings.AUTOCOMPLETE_WARM_START:
+    from movies.autocomplete import movie_autocomplete
+
+    movie_autocomplete.warm()
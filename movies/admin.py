@@ -2,7 +2,7 @@
 Admin configuration for movies app.
 """
 from django.contrib import admin
-from .models import Movie, Genre, WatchHistory
+from .models import Movie, Genre, Person, WatchHistory, TMDbSyncState
 
 
 @admin.register(Genre)
@@ -19,7 +19,7 @@ class MovieAdmin(admin.ModelAdmin):
     list_filter = ('source', 'release_year', 'genres', 'language')
     search_fields = ('title', 'description', 'director')
     filter_horizontal = ('genres',)
-    readonly_fields = ('created_at', 'updated_at', 'average_rating')
+    readonly_fields = ('created_at', 'updated_at', 'average_rating', 'rating_count')
 
     fieldsets = (
         ('Basic Information', {
@@ -39,11 +39,15 @@ class MovieAdmin(admin.ModelAdmin):
             'fields': ('source', 'uploaded_by')
         }),
         ('Metadata', {
-            'fields': ('created_at', 'updated_at', 'average_rating'),
+            'fields': ('created_at', 'updated_at', 'average_rating', 'rating_count'),
             'classes': ('collapse',)
         }),
     )
 
+    @admin.display(description='Average rating', ordering='rating_avg')
+    def average_rating(self, obj):
+        return obj.average_rating
+
     def save_model(self, request, obj, form, change):
         """Set uploaded_by to current user if admin upload"""
         if not change and obj.source == 'admin':
@@ -51,6 +55,13 @@ class MovieAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(Person)
+class PersonAdmin(admin.ModelAdmin):
+    """Person admin (credits are derived from movie actors/director)"""
+    list_display = ('name',)
+    search_fields = ('name',)
+
+
 @admin.register(WatchHistory)
 class WatchHistoryAdmin(admin.ModelAdmin):
     """Watch history admin"""
@@ -58,3 +69,10 @@ class WatchHistoryAdmin(admin.ModelAdmin):
     list_filter = ('watched_at',)
     search_fields = ('user__username', 'movie__title')
     date_hierarchy = 'watched_at'
+
+
+@admin.register(TMDbSyncState)
+class TMDbSyncStateAdmin(admin.ModelAdmin):
+    """TMDb sync watermark admin"""
+    list_display = ('name', 'watermark', 'updated_at')
+    readonly_fields = ('updated_at',)
@@ -1,9 +1,17 @@
 """
 API URL patterns for movies app.
 """
+from django.conf import settings
 from django.urls import path
 from . import api_views
 
+# TMDb proxy views: async variants free worker threads while waiting on TMDb
+# under ASGI; the DRF views remain the default for WSGI deployments.
+if settings.TMDB_ASYNC_VIEWS:
+    from . import async_api_views as tmdb_views
+else:
+    tmdb_views = api_views
+
 urlpatterns = [
     # Genre endpoints
     path('genres/', api_views.genre_list_view, name='api_genre_list'),
@@ -11,17 +19,23 @@ urlpatterns = [
 
     # Local movie endpoints
     path('', api_views.MovieListView.as_view(), name='api_movie_list'),
+    path('facets/', api_views.movie_facets_view, name='api_movie_facets'),
+    path('autocomplete/', api_views.movie_autocomplete_view, name='api_movie_autocomplete'),
     path('<int:pk>/', api_views.MovieDetailView.as_view(), name='api_movie_detail'),
     path('create/', api_views.MovieCreateView.as_view(), name='api_movie_create'),
     path('<int:pk>/update/', api_views.update_movie_view, name='api_movie_update'),
     path('<int:pk>/delete/', api_views.delete_movie_view, name='api_movie_delete'),
+    path('<int:pk>/image/<str:kind>/', api_views.movie_image_view, name='api_movie_image'),
 
     # TMDb integration endpoints
-    path('tmdb/search/', api_views.tmdb_search_view, name='api_tmdb_search'),
-    path('tmdb/popular/', api_views.tmdb_popular_view, name='api_tmdb_popular'),
-    path('tmdb/top-rated/', api_views.tmdb_top_rated_view, name='api_tmdb_top_rated'),
-    path('tmdb/discover/', api_views.tmdb_discover_view, name='api_tmdb_discover'),
-    path('tmdb/<int:tmdb_id>/', api_views.tmdb_movie_detail_view, name='api_tmdb_movie_detail'),
+    path('tmdb/search/', tmdb_views.tmdb_search_view, name='api_tmdb_search'),
+    path('tmdb/popular/', tmdb_views.tmdb_popular_view, name='api_tmdb_popular'),
+    path('tmdb/top-rated/', tmdb_views.tmdb_top_rated_view, name='api_tmdb_top_rated'),
+    path('tmdb/discover/', tmdb_views.tmdb_discover_view, name='api_tmdb_discover'),
+    path('tmdb/metrics/', api_views.tmdb_metrics_view, name='api_tmdb_metrics'),
+    path('cache/metrics/', api_views.response_cache_metrics_view, name='api_response_cache_metrics'),
+    path('tmdb/import/bulk/', api_views.bulk_import_from_tmdb_view, name='api_tmdb_bulk_import'),
+    path('tmdb/<int:tmdb_id>/', tmdb_views.tmdb_movie_detail_view, name='api_tmdb_movie_detail'),
     path('tmdb/<int:tmdb_id>/import/', api_views.import_from_tmdb_view, name='api_tmdb_import'),
 
     # Watch history endpoints
@@ -3,15 +3,40 @@ API views for movies app.
 """
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from django.db.models import Q, Avg
-from .models import Movie, Genre, WatchHistory
+from django.conf import settings
+from django.db.models import Avg
+from django.http import FileResponse, Http404, HttpResponseNotModified, HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_GET
+from figflix.conditional import conditional_get
+from figflix.pagination import paginate
+from figflix.response_cache import cache_response, response_cache
+from . import facets, local_catalog, search
+from .autocomplete import KINDS as AUTOCOMPLETE_KINDS, movie_autocomplete
+from .genre_registry import genre_registry
+from .image_proxy import FORMATS as IMAGE_FORMATS, get_variant, movie_image_source, source_version
+from .models import Credit, Movie, Genre, WatchHistory
 from .serializers import (
-    MovieSerializer, MovieCreateSerializer, GenreSerializer, WatchHistorySerializer
+    MovieSerializer, MovieCardSerializer, MovieCreateSerializer, GenreSerializer,
+    WatchHistorySerializer, WatchHistoryCardSerializer
+)
+from .tmdb_import import (
+    ALREADY_IMPORTED, FAILED, IMPORTED, NOT_FOUND, build_movie, bulk_import_movies, upsert_genres
 )
 from .tmdb_service import tmdb_service
 
+# Upper bound on ids per bulk import request; use the import_tmdb_movies
+# management command for larger batches
+BULK_IMPORT_MAX_IDS = 500
+
+# Upper bound on suggestions per kind from the autocomplete endpoint
+AUTOCOMPLETE_MAX_LIMIT = 20
+
 
 class IsAdminUserOrReadOnly(permissions.BasePermission):
     """
@@ -24,7 +49,9 @@ class IsAdminUserOrReadOnly(permissions.BasePermission):
 
 
 # Genre endpoints
+@cache_response(Genre, timeout=60 * 60)
 @api_view(['GET'])
+@conditional_get(Genre)
 def genre_list_view(request):
     """
     Get all genres.
@@ -46,66 +73,181 @@ def sync_genres_view(request):
         return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
 
     tmdb_genres = tmdb_service.get_genres()
-    created_count = 0
-
-    for genre_data in tmdb_genres:
-        genre, created = Genre.objects.get_or_create(
-            tmdb_id=genre_data['id'],
-            defaults={'name': genre_data['name']}
-        )
-        if created:
-            created_count += 1
+    created_count = sum(1 for g in tmdb_genres if genre_registry.get_by_tmdb_id(g['id']) is None)
+    upsert_genres(tmdb_genres)
 
     return Response({
         'message': f'Synced {created_count} new genres',
-        'total_genres': Genre.objects.count()
+        'total_genres': len(genre_registry.all())
     })
 
 
 # Movie endpoints
+def parse_genre_filter(params):
+    """
+    Genres requested by ?genre= (comma-separated pks, slugs or names) and
+    whether movies must have all of them (?genre_match=all) or any.
+
+    Returns:
+        (genre pks, match_all), or None without a genre filter. Unknown
+        genres are dropped; with match_all none can then match, so the
+        pks are empty.
+    """
+    values = [v for v in params.get('genre', '').split(',') if v.strip()]
+    if not values:
+        return None
+    match_all = params.get('genre_match') == 'all'
+    entries = [genre_registry.resolve(value) for value in values]
+    if match_all and None in entries:
+        return [], True
+    return sorted({entry.id for entry in entries if entry}), match_all
+
+
+def filter_movies(queryset, params, order_by_rank=True, rank=True):
+    """
+    Apply the catalog filters shared by the movie list and its facets:
+    genre (see parse_genre_filter), year, actor/director (exact name, any
+    case) and full-text search. With rank=False, search matches are not
+    ranked and the result can be used as a subquery.
+
+    Raises:
+        ValidationError: for a malformed ?year= (answered with 400)
+    """
+    genres = parse_genre_filter(params)
+    if genres is not None:
+        genre_ids, match_all = genres
+        queryset = queryset.with_genres(genre_ids, match_all=match_all)
+
+    year = params.get('year', '').strip()
+    if year:
+        # isdecimal() rather than isdigit(): int() rejects digits like '²'
+        if not year.isdecimal() or len(year) > 4:
+            raise ValidationError({'year': 'Enter a year, e.g. 2020.'})
+        queryset = queryset.filter(release_year=int(year))
+
+    for role in (Credit.ACTOR, Credit.DIRECTOR):
+        name = params.get(role, '').strip()
+        if name:
+            queryset = queryset.credited([name], role=role)
+
+    query = params.get('search')
+    if query and rank:
+        queryset = search.search(queryset, query, order_by_rank=order_by_rank)
+    elif query:
+        queryset = search.matching(queryset, query)
+    return queryset
+
+
+@method_decorator(cache_response(Movie, Genre, name='movie_list'), name='dispatch')
+@method_decorator(conditional_get(Movie, Genre), name='get')
 class MovieListView(generics.ListAPIView):
     """
     List all movies (both admin-uploaded and from database).
-    GET /api/movies/
+    GET /api/movies/?genre=action&year=2020&search=nolan&sort=top_rated
+    GET /api/movies/?genre=action,12&genre_match=all (genre pks or slugs)
+    GET /api/movies/?actor=tom hanks    (or ?director=; exact name, any case)
+    GET /api/movies/?cursor=            (keyset pagination, newest first)
+    GET /api/movies/?page=3&count=false (skip the total count)
+    GET /api/movies/?view=card          (compact shape for grids)
+    GET /api/movies/?fields=id,title    (or ?omit=description,actors)
     """
     queryset = Movie.objects.all()
     serializer_class = MovieSerializer
     permission_classes = [permissions.AllowAny]
 
+    def get_serializer_class(self):
+        if self.request.query_params.get('view') == 'card':
+            return MovieCardSerializer
+        return MovieSerializer
+
+    def get_cursor_ordering(self):
+        # Search and top-rated listings have their own ordering; they use
+        # page numbers even when a cursor is passed
+        params = self.request.query_params
+        if params.get('search') or params.get('sort') == 'top_rated':
+            return None
+        return ('-created_at', '-id')
+
     def get_queryset(self):
-        queryset = Movie.objects.all()
+        serializer_class = self.get_serializer_class()
+        # Fetch only the columns the response needs; created_at is read
+        # back by cursor pagination
+        queryset = serializer_class.restrict_queryset(
+            Movie.objects.all(),
+            serializer_class.requested_fields(self.request),
+            extra_columns=('created_at',),
+        )
 
-        # Filter by genre
-        genre = self.request.query_params.get('genre')
-        if genre:
-            queryset = queryset.filter(genres__name__icontains=genre)
+        # Sort by user rating (denormalized, indexed)
+        top_rated = self.request.query_params.get('sort') == 'top_rated'
 
-        # Filter by year
-        year = self.request.query_params.get('year')
-        if year:
-            queryset = queryset.filter(release_year=year)
+        # Search results are ranked by relevance unless sorted otherwise
+        queryset = filter_movies(queryset, self.request.query_params, order_by_rank=not top_rated)
 
-        # Filter by search query
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(director__icontains=search)
-            )
+        if top_rated:
+            queryset = queryset.top_rated_locally()
 
-        return queryset.distinct()
+        return queryset
 
 
+@api_view(['GET'])
+@conditional_get(Movie, Genre)
+def movie_facets_view(request):
+    """
+    Genre, year, language and source counts over the movies matching the
+    movie list filters.
+    GET /api/movies/facets/?genre=action&year=2020&search=nolan
+    """
+    params = request.query_params
+    queryset = filter_movies(Movie.objects.all(), params, rank=False)
+    signature = {
+        name: params.get(name, '').strip().lower()
+        for name in ('year', 'actor', 'director', 'search')
+    }
+    signature['genre'] = str(parse_genre_filter(params))
+    return Response(facets.get_facets(queryset, signature))
+
+
+@require_GET
+def movie_autocomplete_view(request):
+    """
+    Search-box suggestions: titles, directors and actors starting with `q`,
+    most popular (TMDb vote count) first.
+    GET /api/movies/autocomplete/?q=dark&limit=5&types=titles,directors
+
+    Plain Django view: it is called on every keystroke and answered from
+    memory, so DRF's request/response machinery would dominate its cost.
+    """
+    query = request.GET.get('q', '')
+    limit = request.GET.get('limit', '')
+    limit = min(int(limit), AUTOCOMPLETE_MAX_LIMIT) if limit.isdecimal() else 10
+    kinds = [k for k in request.GET.get('types', '').split(',') if k]
+    unknown = [k for k in kinds if k not in AUTOCOMPLETE_KINDS]
+    if unknown:
+        return JsonResponse(
+            {'error': f"types must be a comma-separated subset of: {', '.join(AUTOCOMPLETE_KINDS)}"},
+            status=400,
+        )
+    suggestions = movie_autocomplete.suggest(query, limit=limit, kinds=kinds or AUTOCOMPLETE_KINDS)
+    return JsonResponse({'query': query, **suggestions})
+
+
+@method_decorator(cache_response(Movie, Genre, name='movie_detail'), name='dispatch')
+@method_decorator(conditional_get(Movie, Genre), name='get')
 class MovieDetailView(generics.RetrieveAPIView):
     """
     Get movie details.
-    GET /api/movies/{id}/
+    GET /api/movies/{id}/?fields=id,title,description
     """
     queryset = Movie.objects.all()
     serializer_class = MovieSerializer
     permission_classes = [permissions.AllowAny]
 
+    def get_queryset(self):
+        return MovieSerializer.restrict_queryset(
+            Movie.objects.all(), MovieSerializer.requested_fields(self.request)
+        )
+
 
 class MovieCreateView(generics.CreateAPIView):
     """
@@ -177,6 +319,66 @@ def delete_movie_view(request, pk):
         return Response({'error': 'Movie not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@require_GET
+def movie_image_view(request, pk, kind):
+    """
+    Resized poster or backdrop of a local movie, served from the image cache.
+    GET /api/movies/{id}/image/{poster|backdrop}/?w=342&fmt=webp&v=...
+
+    Plain Django view: DRF content negotiation does not apply to image bytes.
+    Without `fmt`, WebP is served to clients that accept it. URLs carrying
+    the current source version `v` (as emitted by the serializers) are
+    cached by clients for a year.
+    """
+    if kind not in ('poster', 'backdrop'):
+        raise Http404
+    movie = get_object_or_404(Movie, pk=pk)
+    original = movie.poster_url if kind == 'poster' else movie.backdrop_url
+
+    resolved = movie_image_source(movie, kind)
+    if resolved is None:
+        if original:
+            return HttpResponseRedirect(original)
+        raise Http404
+    source, loader = resolved
+
+    fmt = request.GET.get('fmt')
+    if fmt is None:
+        fmt = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+    if fmt not in IMAGE_FORMATS:
+        return JsonResponse({'error': f"fmt must be one of: {', '.join(IMAGE_FORMATS)}"}, status=400)
+    width = request.GET.get('w', '')
+    width = int(width) if width.isdecimal() else None
+
+    variant = get_variant(source, loader, width, fmt)
+    if variant is None:
+        # Source unavailable (e.g. TMDb unreachable): let the client load it directly
+        if original:
+            return HttpResponseRedirect(original)
+        raise Http404
+
+    if request.headers.get('If-None-Match') == variant.etag:
+        response = HttpResponseNotModified()
+    else:
+        try:
+            response = FileResponse(open(variant.path, 'rb'), content_type=variant.content_type)
+        except FileNotFoundError:
+            # Evicted between lookup and open
+            variant = get_variant(source, loader, width, fmt)
+            if variant is None:
+                raise Http404
+            response = FileResponse(open(variant.path, 'rb'), content_type=variant.content_type)
+
+    response['ETag'] = variant.etag
+    if request.GET.get('v') == source_version(source):
+        response['Cache-Control'] = f'public, max-age={settings.IMAGE_PROXY_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = 'public, max-age=3600'
+    if 'fmt' not in request.GET:
+        patch_vary_headers(response, ['Accept'])
+    return response
+
+
 # TMDb API endpoints
 @api_view(['GET'])
 def tmdb_search_view(request):
@@ -190,7 +392,7 @@ def tmdb_search_view(request):
     if not query:
         return Response({'error': 'Search query required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    results = tmdb_service.search_movies(query, page)
+    results = tmdb_service.search_movies(query, page, fallback=True)
     return Response(results)
 
 
@@ -201,7 +403,9 @@ def tmdb_popular_view(request):
     GET /api/movies/tmdb/popular/?page=1
     """
     page = int(request.query_params.get('page', 1))
-    results = tmdb_service.get_popular_movies(page)
+    if settings.TMDB_SERVE_FROM_MIRROR:
+        return Response(local_catalog.popular_movies(page))
+    results = tmdb_service.get_popular_movies(page, fallback=True)
     return Response(results)
 
 
@@ -212,7 +416,9 @@ def tmdb_top_rated_view(request):
     GET /api/movies/tmdb/top-rated/?page=1
     """
     page = int(request.query_params.get('page', 1))
-    results = tmdb_service.get_top_rated_movies(page)
+    if settings.TMDB_SERVE_FROM_MIRROR:
+        return Response(local_catalog.top_rated_movies(page))
+    results = tmdb_service.get_top_rated_movies(page, fallback=True)
     return Response(results)
 
 
@@ -222,26 +428,13 @@ def tmdb_movie_detail_view(request, tmdb_id):
     Get movie details from TMDb.
     GET /api/movies/tmdb/{tmdb_id}/
     """
-    movie_data = tmdb_service.get_movie_details(tmdb_id)
-    if not movie_data:
+    # Details, trailer, cast and director in a single upstream request;
+    # while TMDb is down, the local copy of the movie is served if there is one
+    bundle = tmdb_service.get_movie_bundle(tmdb_id, fallback=True)
+    if not bundle:
         return Response({'error': 'Movie not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    # Get videos and credits
-    videos = tmdb_service.get_movie_videos(tmdb_id)
-    credits = tmdb_service.get_movie_credits(tmdb_id)
-
-    # Add trailer URL
-    if videos:
-        movie_data['trailer_url'] = f"https://www.youtube.com/watch?v={videos[0]['key']}"
-
-    # Add cast
-    movie_data['actors'] = [actor['name'] for actor in credits['cast'][:10]]
-
-    # Add director
-    directors = [crew['name'] for crew in credits['crew'] if crew['job'] == 'Director']
-    movie_data['director'] = directors[0] if directors else ''
-
-    return Response(movie_data)
+    return Response(bundle['details'])
 
 
 @api_view(['POST'])
@@ -258,45 +451,53 @@ def import_from_tmdb_view(request, tmdb_id):
     if Movie.objects.filter(tmdb_id=tmdb_id).exists():
         return Response({'error': 'Movie already imported'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Fetch from TMDb
-    movie_data = tmdb_service.get_movie_details(tmdb_id)
-    if not movie_data:
+    # Fetch details, videos and credits from TMDb
+    bundle = tmdb_service.get_movie_bundle(tmdb_id)
+    if not bundle:
         return Response({'error': 'Movie not found on TMDb'}, status=status.HTTP_404_NOT_FOUND)
-
-    # Get additional data
-    videos = tmdb_service.get_movie_videos(tmdb_id)
-    credits = tmdb_service.get_movie_credits(tmdb_id)
+    movie_data = bundle['details']
 
     # Create movie
-    movie = Movie.objects.create(
-        title=movie_data['title'],
-        description=movie_data['description'],
-        release_year=movie_data['release_year'],
-        runtime=movie_data['runtime'],
-        tmdb_id=tmdb_id,
-        tmdb_rating=movie_data['tmdb_rating'],
-        tmdb_vote_count=movie_data['tmdb_vote_count'],
-        poster_url=movie_data['poster_url'],
-        backdrop_url=movie_data['backdrop_url'],
-        trailer_url=f"https://www.youtube.com/watch?v={videos[0]['key']}" if videos else '',
-        actors=[actor['name'] for actor in credits['cast'][:10]],
-        director=next((crew['name'] for crew in credits['crew'] if crew['job'] == 'Director'), ''),
-        language=movie_data['language'],
-        source='tmdb',
-        uploaded_by=request.user
-    )
+    movie = build_movie(movie_data, user=request.user)
+    movie.save()
 
     # Add genres
-    for genre_id in movie_data['genre_ids']:
-        try:
-            genre = Genre.objects.get(tmdb_id=genre_id)
-            movie.genres.add(genre)
-        except Genre.DoesNotExist:
-            pass
+    movie.genres.add(*genre_registry.ids_for_tmdb_ids(movie_data['genre_ids']))
 
     return Response(MovieSerializer(movie).data, status=status.HTTP_201_CREATED)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_import_from_tmdb_view(request):
+    """
+    Import many movies from TMDb to local database (admin only).
+    POST /api/movies/tmdb/import/bulk/
+    Body: {"tmdb_ids": [27205, 155, 680]}
+    """
+    if request.user.role != 'admin':
+        return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+
+    tmdb_ids = request.data.get('tmdb_ids')
+    if not isinstance(tmdb_ids, list) or not tmdb_ids:
+        return Response({'error': 'tmdb_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(tmdb_ids) > BULK_IMPORT_MAX_IDS:
+        return Response(
+            {'error': f'At most {BULK_IMPORT_MAX_IDS} tmdb_ids per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        tmdb_ids = [int(tmdb_id) for tmdb_id in tmdb_ids]
+    except (TypeError, ValueError):
+        return Response({'error': 'tmdb_ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = bulk_import_movies(tmdb_ids, user=request.user)
+    summary = {s: sum(1 for r in results if r['status'] == s)
+               for s in (IMPORTED, ALREADY_IMPORTED, NOT_FOUND, FAILED)}
+
+    return Response({'results': results, 'summary': summary})
+
+
 @api_view(['GET'])
 def tmdb_discover_view(request):
     """
@@ -304,20 +505,52 @@ def tmdb_discover_view(request):
     GET /api/movies/tmdb/discover/?genre_ids=28,12&year=2023&min_rating=7.0&page=1
     """
     genre_ids = request.query_params.get('genre_ids', '').split(',')
-    genre_ids = [int(g) for g in genre_ids if g.isdigit()]
+    genre_ids = [int(g) for g in genre_ids if g.isdecimal()]
 
     year = request.query_params.get('year')
-    year = int(year) if year and year.isdigit() else None
+    year = int(year) if year and year.isdecimal() else None
 
     min_rating = request.query_params.get('min_rating')
     min_rating = float(min_rating) if min_rating else None
 
     page = int(request.query_params.get('page', 1))
 
-    results = tmdb_service.discover_movies(genre_ids, year, min_rating, page)
+    if settings.TMDB_SERVE_FROM_MIRROR:
+        return Response(local_catalog.discover_movies(genre_ids, year, min_rating, page))
+    results = tmdb_service.discover_movies(genre_ids, year, min_rating, page, fallback=True)
     return Response(results)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tmdb_metrics_view(request):
+    """
+    Get TMDb client metrics for this worker process (admin only).
+    GET /api/movies/tmdb/metrics/
+    """
+    if request.user.role != 'admin':
+        return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+
+    return Response({
+        'cache': tmdb_service.cache_stats(),
+        'singleflight': tmdb_service.singleflight_stats(),
+        **tmdb_service.resilience_stats(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def response_cache_metrics_view(request):
+    """
+    Get anonymous response cache hit ratios for this worker process (admin only).
+    GET /api/movies/cache/metrics/
+    """
+    if request.user.role != 'admin':
+        return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+
+    return Response(response_cache.stats())
+
+
 # Watch history endpoints
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -353,7 +586,18 @@ def get_watch_history_view(request):
     """
     Get user's watch history.
     GET /api/movies/watch-history/
-    """
-    history = WatchHistory.objects.filter(user=request.user)
-    serializer = WatchHistorySerializer(history, many=True)
-    return Response(serializer.data)
+    GET /api/movies/watch-history/?cursor=   (paginated)
+    GET /api/movies/watch-history/?view=card (compact movie cards)
+    """
+    if request.query_params.get('view') == 'card':
+        serializer_class, movie_serializer = WatchHistoryCardSerializer, MovieCardSerializer
+    else:
+        serializer_class, movie_serializer = WatchHistorySerializer, MovieSerializer
+    movie_columns = movie_serializer.model_columns(movie_serializer.Meta.fields)
+    history = (
+        WatchHistory.objects.filter(user=request.user)
+        .select_related('movie')
+        .only('id', 'watched_at', 'movie', *[f'movie__{column}' for column in movie_columns])
+        .prefetch_related('movie__genres')
+    )
+    return paginate(request, history, serializer_class, ('-watched_at', '-id'))
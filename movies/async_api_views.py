@@ -0,0 +1,102 @@
+"""
+Async API views for the TMDb proxy endpoints.
+
+These are plain Django async views (DRF's api_view only supports sync
+views), so under ASGI a request waiting on TMDb does not hold a worker
+thread. They return the same payloads as their counterparts in
+api_views.py and are wired in by api_urls.py when TMDB_ASYNC_VIEWS is on.
+"""
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponseNotAllowed, JsonResponse
+from . import local_catalog
+from .async_tmdb_service import async_tmdb_service
+
+
+def require_get(view):
+    """Async-safe equivalent of django.views.decorators.http.require_GET."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET'])
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@require_get
+async def tmdb_search_view(request):
+    """
+    Search TMDb for movies.
+    GET /api/movies/tmdb/search/?q=Inception&page=1
+    """
+    query = request.GET.get('q', '')
+    page = int(request.GET.get('page', 1))
+
+    if not query:
+        return JsonResponse({'error': 'Search query required'}, status=400)
+
+    results = await async_tmdb_service.search_movies(query, page, fallback=True)
+    return JsonResponse(results)
+
+
+@require_get
+async def tmdb_popular_view(request):
+    """
+    Get popular movies from TMDb.
+    GET /api/movies/tmdb/popular/?page=1
+    """
+    page = int(request.GET.get('page', 1))
+    if settings.TMDB_SERVE_FROM_MIRROR:
+        return JsonResponse(await sync_to_async(local_catalog.popular_movies)(page))
+    results = await async_tmdb_service.get_popular_movies(page, fallback=True)
+    return JsonResponse(results)
+
+
+@require_get
+async def tmdb_top_rated_view(request):
+    """
+    Get top rated movies from TMDb.
+    GET /api/movies/tmdb/top-rated/?page=1
+    """
+    page = int(request.GET.get('page', 1))
+    if settings.TMDB_SERVE_FROM_MIRROR:
+        return JsonResponse(await sync_to_async(local_catalog.top_rated_movies)(page))
+    results = await async_tmdb_service.get_top_rated_movies(page, fallback=True)
+    return JsonResponse(results)
+
+
+@require_get
+async def tmdb_movie_detail_view(request, tmdb_id):
+    """
+    Get movie details from TMDb.
+    GET /api/movies/tmdb/{tmdb_id}/
+    """
+    bundle = await async_tmdb_service.get_movie_bundle(tmdb_id, fallback=True)
+    if not bundle:
+        return JsonResponse({'error': 'Movie not found'}, status=404)
+
+    return JsonResponse(bundle['details'])
+
+
+@require_get
+async def tmdb_discover_view(request):
+    """
+    Discover movies with filters from TMDb.
+    GET /api/movies/tmdb/discover/?genre_ids=28,12&year=2023&min_rating=7.0&page=1
+    """
+    genre_ids = request.GET.get('genre_ids', '').split(',')
+    genre_ids = [int(g) for g in genre_ids if g.isdecimal()]
+
+    year = request.GET.get('year')
+    year = int(year) if year and year.isdecimal() else None
+
+    min_rating = request.GET.get('min_rating')
+    min_rating = float(min_rating) if min_rating else None
+
+    page = int(request.GET.get('page', 1))
+
+    if settings.TMDB_SERVE_FROM_MIRROR:
+        return JsonResponse(await sync_to_async(local_catalog.discover_movies)(genre_ids, year, min_rating, page))
+    results = await async_tmdb_service.discover_movies(genre_ids, year, min_rating, page, fallback=True)
+    return JsonResponse(results)
@@ -0,0 +1,283 @@
+"""
+Asynchronous TMDb API client, used by the async TMDb views under ASGI.
+"""
+import asyncio
+import random
+import weakref
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from typing import Dict, List, Optional
+from .tmdb_service import TMDbService, RETRY_STATUSES, is_upstream_failure
+
+
+class AsyncTMDbService(TMDbService):
+    """
+    Asyncio-based TMDb client.
+
+    Shares configuration, the shared cache tier and all response formatting
+    with TMDbService; only the transport differs. Public methods are
+    coroutines with the same names and return values as the sync client.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.max_connections = settings.TMDB_ASYNC_MAX_CONNECTIONS
+        # httpx connections are bound to the event loop that opened them
+        self._clients = weakref.WeakKeyDictionary()
+        self._inflight = weakref.WeakKeyDictionary()
+        self._background_tasks = set()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled keep-alive client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=settings.TMDB_POOL_MAXSIZE,
+                ),
+                headers={'Accept': 'application/json'},
+            )
+            self._clients[loop] = client
+        return client
+
+    async def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
+        """
+        Make HTTP request to TMDb API, served from cache when possible.
+
+        Same caching and last-good fallback rules as
+        TMDbService._make_request. Identical concurrent misses on one event
+        loop share a single upstream request.
+        """
+        if not self.cache_enabled:
+            return await self._fetch_async(endpoint, params)
+
+        key = self.cache.make_key(endpoint, params)
+        cached = await sync_to_async(self.cache.get, thread_sensitive=False)(key)
+        if cached is not None:
+            payload, is_fresh = cached
+            if not is_fresh and key not in self._refreshing:
+                self._refreshing.add(key)
+                task = asyncio.ensure_future(self._fetch_coalesced(key, endpoint, params))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+                task.add_done_callback(lambda _: self._refreshing.discard(key))
+            return payload
+
+        data = await self._fetch_coalesced(key, endpoint, params)
+        if data is None:
+            data = await sync_to_async(self.cache.get_last_good, thread_sensitive=False)(key)
+            if data is not None:
+                self._incr_degraded('last_good_served')
+        return data
+
+    async def _fetch_coalesced(self, key: str, endpoint: str, params: Optional[Dict]) -> Optional[Dict]:
+        """Fetch and cache a payload, joining an identical in-flight request."""
+        inflight = self._inflight.setdefault(asyncio.get_running_loop(), {})
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, endpoint, params))
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        # Shield so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, key: str, endpoint: str, params: Optional[Dict]) -> Optional[Dict]:
+        data = await self._fetch_async(endpoint, params)
+        if data is not None:
+            await sync_to_async(self.cache.set, thread_sensitive=False)(key, endpoint, data)
+        return data
+
+    async def _fetch_async(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
+        """
+        Fetch a payload from the TMDb API, bypassing the cache.
+
+        Retries 429/5xx responses and transport errors with the same
+        jittered backoff as the sync client, and shares its circuit breaker
+        and rate limiter.
+        """
+        if not self.api_key:
+            print("Warning: TMDB_API_KEY not configured")
+            return None
+
+        if not await sync_to_async(self.breaker.allow_request, thread_sensitive=False)():
+            return None
+        if not await self._acquire_rate_limit():
+            print(f"TMDb rate limit: dropped request to {endpoint}")
+            return None
+
+        url = f"{self.base_url}{endpoint}"
+        default_params = {'api_key': self.api_key, 'language': 'en-US'}
+
+        if params:
+            default_params.update(params)
+
+        connect_timeout, read_timeout = self._get_timeout(endpoint)
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        max_retries = settings.TMDB_MAX_RETRIES
+        client = self._get_client()
+
+        for attempt in range(max_retries + 1):
+            try:
+                response = await client.get(url, params=default_params, timeout=timeout)
+                if response.status_code in RETRY_STATUSES and attempt < max_retries:
+                    await asyncio.sleep(self._retry_delay(attempt, response))
+                    continue
+                response.raise_for_status()
+                data = response.json()
+            except httpx.TransportError as e:
+                if attempt < max_retries:
+                    await asyncio.sleep(self._retry_delay(attempt))
+                    continue
+                print(f"TMDb API Error: {e}")
+                await sync_to_async(self.breaker.record_failure, thread_sensitive=False)()
+                return None
+            except httpx.HTTPStatusError as e:
+                print(f"TMDb API Error: {e}")
+                if is_upstream_failure(e.response.status_code):
+                    await sync_to_async(self.breaker.record_failure, thread_sensitive=False)()
+                else:
+                    await sync_to_async(self.breaker.record_success, thread_sensitive=False)()
+                return None
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"TMDb API Error: {e}")
+                return None
+
+            await sync_to_async(self.breaker.record_success, thread_sensitive=False)()
+            return data
+        return None
+
+    async def _acquire_rate_limit(self) -> bool:
+        """Async counterpart of RateLimiter.acquire() that sleeps without blocking."""
+        try_acquire = sync_to_async(self.rate_limiter.try_acquire, thread_sensitive=False)
+        waited = 0.0
+        while True:
+            delay = await try_acquire()
+            if delay == 0:
+                self.rate_limiter.record_wait(waited)
+                return True
+            if waited + delay > self.rate_limiter.max_wait:
+                self.rate_limiter.record_wait(waited, rejected=True)
+                return False
+            await asyncio.sleep(delay)
+            waited += delay
+
+    async def _local_fallback_async(self, name: str, *args):
+        """Serve a read from the local catalog while TMDb is unavailable."""
+        return await sync_to_async(self._local_fallback)(name, *args)
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """
+        Honour Retry-After if present, otherwise jittered exponential backoff,
+        either way no longer than TMDB_BACKOFF_MAX.
+        """
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdecimal():
+                return min(float(retry_after), settings.TMDB_BACKOFF_MAX)
+        backoff = min(settings.TMDB_BACKOFF_FACTOR * (2 ** attempt), settings.TMDB_BACKOFF_MAX)
+        return random.uniform(backoff / 2, backoff)
+
+    async def search_movies(self, query: str, page: int = 1, fallback: bool = False) -> Dict:
+        """
+        Search for movies by title.
+        """
+        data = await self._make_request('/search/movie', {'query': query, 'page': page})
+        if data is None and fallback:
+            return await self._local_fallback_async('search_movies', query, page)
+        return self._format_movie_results(data)
+
+    async def get_popular_movies(self, page: int = 1, fallback: bool = False) -> Dict:
+        """
+        Get popular movies.
+        """
+        data = await self._make_request('/movie/popular', {'page': page})
+        if data is None and fallback:
+            return await self._local_fallback_async('popular_movies', page)
+        return self._format_movie_results(data)
+
+    async def get_top_rated_movies(self, page: int = 1, fallback: bool = False) -> Dict:
+        """
+        Get top rated movies.
+        """
+        data = await self._make_request('/movie/top_rated', {'page': page})
+        if data is None and fallback:
+            return await self._local_fallback_async('top_rated_movies', page)
+        return self._format_movie_results(data)
+
+    async def get_movie_details(self, movie_id: int, fallback: bool = False) -> Optional[Dict]:
+        """
+        Get detailed information about a movie.
+        """
+        data = await self._make_request(f'/movie/{movie_id}')
+        if data:
+            return self._format_movie_detail(data)
+        if fallback:
+            return await self._local_fallback_async('movie_detail', movie_id)
+        return None
+
+    async def get_movie_videos(self, movie_id: int) -> List[Dict]:
+        """
+        Get movie trailers and videos.
+        """
+        data = await self._make_request(f'/movie/{movie_id}/videos')
+        return self._format_videos(data)
+
+    async def get_movie_credits(self, movie_id: int) -> Dict:
+        """
+        Get movie cast and crew.
+        """
+        data = await self._make_request(f'/movie/{movie_id}/credits')
+        return self._format_credits(data)
+
+    async def get_movie_bundle(self, movie_id: int, fallback: bool = False) -> Optional[Dict]:
+        """
+        Get movie details, trailers and credits in one round trip.
+
+        Missing appended parts are fetched concurrently, as in the sync client.
+        """
+        data = await self._make_request(f'/movie/{movie_id}', {'append_to_response': 'videos,credits'})
+        if not data:
+            if not fallback:
+                return None
+            return self._local_bundle(await self._local_fallback_async('movie_detail', movie_id))
+
+        videos = self._format_videos(data['videos']) if 'videos' in data else None
+        credits = self._format_credits(data['credits']) if 'credits' in data else None
+
+        if videos is None and credits is None:
+            videos, credits = await asyncio.gather(
+                self.get_movie_videos(movie_id), self.get_movie_credits(movie_id)
+            )
+        elif videos is None:
+            videos = await self.get_movie_videos(movie_id)
+        elif credits is None:
+            credits = await self.get_movie_credits(movie_id)
+
+        return self._format_bundle(data, videos, credits)
+
+    async def get_genres(self, fallback: bool = False) -> List[Dict]:
+        """
+        Get list of all movie genres.
+        """
+        data = await self._make_request('/genre/movie/list')
+        if data is None:
+            return await self._local_fallback_async('genres') if fallback else []
+        return data.get('genres', [])
+
+    async def discover_movies(self, genre_ids: List[int] = None, year: int = None,
+                              min_rating: float = None, page: int = 1, fallback: bool = False) -> Dict:
+        """
+        Discover movies with filters.
+        """
+        params = self._discover_params(genre_ids, year, min_rating, page)
+        data = await self._make_request('/discover/movie', params)
+        if data is None and fallback:
+            return await self._local_fallback_async('discover_movies', genre_ids, year, min_rating, page)
+        return self._format_movie_results(data)
+
+
+# Singleton instance
+async_tmdb_service = AsyncTMDbService()
@@ -0,0 +1,429 @@
+"""
+Process-wide prefix index for search-box autocomplete (titles, directors,
+actors), ranked by TMDb vote count.
+
+Each kind is a sorted array of normalized keys: the entries for a prefix
+are one contiguous range found with bisect, and a max-popularity segment
+tree over the array yields that range's entries most-popular-first in
+O(log n) each, however many titles share the prefix.
+
+The arrays are built in one pass over Movie in a background thread, at
+worker startup (AUTOCOMPLETE_WARM_START) or on first use; queries return
+no suggestions until the first build is done, as building a large catalog
+takes seconds. Movie writes in this process are applied immediately
+through a small overlay of changed rows, which is folded into the arrays
+by a background rebuild once it grows past AUTOCOMPLETE_OVERLAY_MAX.
+Writes made by other processes show up when the catalog's signature (the
+latest updated_at and the row count, read from the database) has moved,
+checked in the background at most every AUTOCOMPLETE_REFRESH_INTERVAL
+seconds.
+"""
+import heapq
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+
+KINDS = ('titles', 'directors', 'actors')
+
+# Titles are also indexed without a leading article, so "dark kn" finds
+# "The Dark Knight"
+ARTICLES = ('the ', 'a ', 'an ')
+
+# Sorts after any character a normalized key can contain
+_KEY_END = '\U0010ffff'
+
+
+def normalize(text: str) -> str:
+    """Case-, accent- and whitespace-insensitive form of `text`."""
+    if text.isascii():
+        return ' '.join(text.lower().split())
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+def title_keys(title: str) -> List[str]:
+    key = normalize(title)
+    keys = [key] if key else []
+    for article in ARTICLES:
+        if key.startswith(article) and len(key) > len(article):
+            keys.append(key[len(article):])
+            break
+    return keys
+
+
+class PrefixIndex:
+    """
+    Immutable sorted (key, popularity, payload) entries answering
+    "most popular entries whose key starts with a prefix".
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, int, object]]):
+        entries = sorted(entries, key=lambda e: e[0])
+        self.keys = [e[0] for e in entries]
+        self.popularity = array('q', (e[1] for e in entries))
+        self.payloads = [e[2] for e in entries]
+
+        # tree[size + i] is entry i; tree[node] is the most popular entry
+        # under node (ties go to the alphabetically first)
+        size = self.size = len(entries)
+        popularity = self.popularity
+        tree = self._tree = array('q', [0]) * (2 * size)
+        for i in range(size):
+            tree[size + i] = i
+        for node in range(size - 1, 0, -1):
+            left, right = tree[2 * node], tree[2 * node + 1]
+            tree[node] = left if popularity[left] >= popularity[right] else right
+
+    def __len__(self):
+        return self.size
+
+    def _argmax(self, lo: int, hi: int) -> int:
+        """Index of the most popular entry in [lo, hi)."""
+        tree, popularity = self._tree, self.popularity
+        best = -1
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                candidate = tree[lo]
+                if best < 0 or popularity[candidate] > popularity[best] or (
+                        popularity[candidate] == popularity[best] and candidate < best):
+                    best = candidate
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                candidate = tree[hi]
+                if best < 0 or popularity[candidate] > popularity[best] or (
+                        popularity[candidate] == popularity[best] and candidate < best):
+                    best = candidate
+            lo >>= 1
+            hi >>= 1
+        return best
+
+    def top(self, prefix: str) -> Iterator[Tuple[int, object]]:
+        """Yield (popularity, payload) for keys starting with `prefix`, most popular first."""
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _KEY_END, lo)
+        if lo >= hi:
+            return
+        popularity = self.popularity
+        best = self._argmax(lo, hi)
+        heap = [(-popularity[best], best, lo, hi)]
+        while heap:
+            _, i, lo, hi = heapq.heappop(heap)
+            yield popularity[i], self.payloads[i]
+            # Split the range around the entry just returned
+            if lo < i:
+                j = self._argmax(lo, i)
+                heapq.heappush(heap, (-popularity[j], j, lo, i))
+            if i + 1 < hi:
+                j = self._argmax(i + 1, hi)
+                heapq.heappush(heap, (-popularity[j], j, i + 1, hi))
+
+
+class MovieRow(NamedTuple):
+    id: int
+    title: str
+    release_year: Optional[int]
+    director: str
+    actors: list
+    votes: int
+
+
+class OverlayEntry(NamedTuple):
+    seq: int
+    # None when the movie was deleted
+    row: Optional[MovieRow]
+    title_keys: List[str]
+    person_keys: Dict[str, List[Tuple[str, str]]]
+
+
+class _Snapshot(NamedTuple):
+    titles: PrefixIndex
+    directors: PrefixIndex
+    actors: PrefixIndex
+    # Catalog signature when the build started (see _signature())
+    signature: tuple
+    built_at: float
+
+
+# Ids per query when re-reading changed movies
+FETCH_CHUNK_SIZE = 500
+
+ROW_FIELDS = ('id', 'title', 'release_year', 'director', 'actors', 'tmdb_vote_count')
+
+
+def _row(values) -> MovieRow:
+    movie_id, title, year, director, actors, votes = values
+    return MovieRow(movie_id, title, year, director or '', actors or [], votes or 0)
+
+
+def _people(row: MovieRow) -> Dict[str, List[str]]:
+    return {
+        'directors': [row.director] if row.director else [],
+        'actors': [a for a in row.actors if isinstance(a, str) and a],
+    }
+
+
+class MovieAutocomplete:
+    """
+    Title/director/actor suggestions from in-memory prefix indexes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        # movie id -> latest change not yet in the snapshot
+        self._overlay: Dict[int, OverlayEntry] = {}
+        self._seq = 0
+        self._rebuilding = False
+        self._checked_at = 0.0
+
+    # Building
+
+    def _signature(self) -> tuple:
+        """
+        Latest updated_at and row count of the catalog, which change with any
+        write that matters here, in any process. Two queries, each answered
+        from an index. Writes to other tables do not move it: review
+        counters and genre links are updated without touching updated_at.
+        """
+        from .models import Movie
+
+        movies = Movie.objects.order_by()
+        return (movies.aggregate(Max('updated_at'))['updated_at__max'], movies.count())
+
+    def _build(self) -> _Snapshot:
+        from .models import Movie
+
+        signature = self._signature()
+        titles = []
+        # kind -> name as written -> summed votes of the person's movies
+        people = {'directors': {}, 'actors': {}}
+        rows = Movie.objects.order_by().values_list(*ROW_FIELDS).iterator(chunk_size=10000)
+        for row in map(_row, rows):
+            payload = (row.id, row.title, row.release_year)
+            for key in title_keys(row.title):
+                titles.append((key, row.votes, payload))
+            for kind, names in _people(row).items():
+                votes_by_name = people[kind]
+                for name in names:
+                    votes_by_name[name] = votes_by_name.get(name, 0) + row.votes
+
+        def person_index(votes_by_name):
+            # Spellings that normalize alike are one person, shown as the
+            # most popular spelling
+            by_key = {}
+            for name, votes in votes_by_name.items():
+                key = normalize(name)
+                if not key:
+                    continue
+                entry = by_key.get(key)
+                if entry is None:
+                    by_key[key] = [name, votes, votes]
+                else:
+                    if votes > entry[2]:
+                        entry[0], entry[2] = name, votes
+                    entry[1] += votes
+            return PrefixIndex((key, votes, name) for key, (name, votes, _) in by_key.items())
+
+        return _Snapshot(
+            titles=PrefixIndex(titles),
+            directors=person_index(people['directors']),
+            actors=person_index(people['actors']),
+            signature=signature,
+            built_at=time.time(),
+        )
+
+    def rebuild(self):
+        """Rebuild the indexes from the database and fold in the overlay."""
+        with self._build_lock:
+            with self._lock:
+                seq = self._seq
+            snapshot = self._build()
+            with self._lock:
+                self._snapshot = snapshot
+                # Changes made while building may or may not have been read:
+                # keep them in the overlay, which takes precedence
+                self._overlay = {k: e for k, e in self._overlay.items() if e.seq > seq}
+                self._rebuilding = False
+                self._checked_at = time.monotonic()
+
+    def _rebuild_in_background(self, unless_signature: Optional[tuple] = None):
+        """Rebuild in a thread, skipped if the catalog still has `unless_signature`."""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                if unless_signature is None or self._signature() != unless_signature:
+                    self.rebuild()
+            finally:
+                self._rebuilding = False
+                # Each run is a new thread, with a connection of its own
+                connection.close()
+
+        threading.Thread(target=run, name='movie-autocomplete-rebuild', daemon=True).start()
+
+    def warm(self):
+        """Start building in the background (call at worker startup)."""
+        if self._snapshot is None:
+            self._rebuild_in_background()
+
+    def _ensure_snapshot(self) -> Optional[_Snapshot]:
+        """The current snapshot, or None while the first build runs."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self._rebuild_in_background()
+            return None
+
+        now = time.monotonic()
+        if now - self._checked_at >= settings.AUTOCOMPLETE_REFRESH_INTERVAL:
+            self._checked_at = now
+            self._rebuild_in_background(unless_signature=snapshot.signature)
+        return snapshot
+
+    # Incremental updates (from signals and bulk writers)
+
+    def movies_changed(self, movie_ids: Iterable[int]):
+        """Re-read the given movies once the current transaction commits."""
+        movie_ids = list(movie_ids)
+        if self._snapshot is None or not movie_ids:
+            return
+        transaction.on_commit(lambda: self._apply(movie_ids))
+
+    def movies_removed(self, movie_ids: Iterable[int]):
+        movie_ids = list(movie_ids)
+        if self._snapshot is None or not movie_ids:
+            return
+        transaction.on_commit(lambda: self._apply(movie_ids, removed=True))
+
+    def _apply(self, movie_ids: List[int], removed: bool = False):
+        from .models import Movie
+
+        if len(self._overlay) + len(movie_ids) > settings.AUTOCOMPLETE_OVERLAY_MAX:
+            # A rebuild started after the commit reads these changes itself;
+            # one already running may not have, so then use the overlay too
+            if not removed and not self._rebuilding:
+                self._rebuild_in_background()
+                return
+            self._rebuild_in_background()
+
+        rows = {}
+        if not removed:
+            for start in range(0, len(movie_ids), FETCH_CHUNK_SIZE):
+                chunk = movie_ids[start:start + FETCH_CHUNK_SIZE]
+                values = Movie.objects.filter(pk__in=chunk).values_list(*ROW_FIELDS)
+                rows.update((row.id, row) for row in map(_row, values))
+
+        with self._lock:
+            for movie_id in movie_ids:
+                self._seq += 1
+                row = rows.get(movie_id)
+                if row is None:
+                    self._overlay[movie_id] = OverlayEntry(self._seq, None, [], {})
+                    continue
+                person_keys = {
+                    kind: [(normalize(name), name) for name in names]
+                    for kind, names in _people(row).items()
+                }
+                self._overlay[movie_id] = OverlayEntry(self._seq, row, title_keys(row.title), person_keys)
+
+    # Queries
+
+    def suggest(self, prefix: str, limit: int = 10, kinds: Iterable[str] = KINDS) -> Dict[str, List[Dict]]:
+        """
+        Most popular titles, directors and actors starting with `prefix`.
+
+        Returns:
+            {'titles': [{'id', 'title', 'release_year'}], 'directors':
+            [{'name'}], 'actors': [{'name'}]} for the requested kinds; empty
+            until the index is first built
+        """
+        snapshot = self._ensure_snapshot()
+        if snapshot is None:
+            return {kind: [] for kind in kinds}
+        key = normalize(prefix)
+        with self._lock:
+            overlay = dict(self._overlay)
+
+        results = {}
+        for kind in kinds:
+            if not key:
+                results[kind] = []
+            elif kind == 'titles':
+                results[kind] = self._titles(snapshot.titles, key, limit, overlay)
+            else:
+                results[kind] = self._people(getattr(snapshot, kind), kind, key, limit, overlay)
+        return results
+
+    def _titles(self, index: PrefixIndex, key: str, limit: int, overlay: Dict[int, OverlayEntry]):
+        found = []
+        seen = set()
+        for votes, payload in index.top(key):
+            if len(found) >= limit:
+                break
+            movie_id = payload[0]
+            # Changed movies are answered from the overlay
+            if movie_id in overlay or movie_id in seen:
+                continue
+            seen.add(movie_id)
+            found.append((votes, payload))
+
+        for entry in overlay.values():
+            if entry.row and any(k.startswith(key) for k in entry.title_keys):
+                row = entry.row
+                found.append((row.votes, (row.id, row.title, row.release_year)))
+
+        found.sort(key=lambda f: -f[0])
+        return [
+            {'id': movie_id, 'title': title, 'release_year': year}
+            for _, (movie_id, title, year) in found[:limit]
+        ]
+
+    def _people(self, index: PrefixIndex, kind: str, key: str, limit: int,
+                overlay: Dict[int, OverlayEntry]):
+        # Popularity of people only tracks overlay movies roughly (their own
+        # vote count) until the next rebuild
+        found = {}
+        for votes, name in index.top(key):
+            if len(found) >= limit:
+                break
+            found.setdefault(normalize(name), (votes, name))
+
+        for entry in overlay.values():
+            for person_key, name in entry.person_keys.get(kind, ()):
+                if person_key.startswith(key) and person_key not in found:
+                    found[person_key] = (entry.row.votes, name)
+
+        ranked = sorted(found.values(), key=lambda f: -f[0])
+        return [{'name': name} for _, name in ranked[:limit]]
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {'built': False, 'overlay': len(self._overlay)}
+        return {
+            'built': True,
+            'built_at': snapshot.built_at,
+            'titles': len(snapshot.titles),
+            'directors': len(snapshot.directors),
+            'actors': len(snapshot.actors),
+            'overlay': len(self._overlay),
+            'rebuilding': self._rebuilding,
+        }
+
+
+# Singleton instance
+movie_autocomplete = MovieAutocomplete()
@@ -0,0 +1,102 @@
+"""
+Credit rows (movies/models.py: Person, Credit) derived from the actors and
+director columns of Movie.
+
+Movie.actors/director stay the source of truth shown by the API; credits
+are rewritten from them whenever a movie is saved (signals) or bulk
+written (tmdb_import), and `manage.py backfill_credits` builds them for
+existing rows.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from .models import Credit, Movie, Person
+
+BATCH_SIZE = 500
+
+# Ids/names per IN (...) lookup, below SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 5000
+
+
+def movie_people(director: str, actors) -> List[Tuple[str, str]]:
+    """(role, name) pairs of a movie in billing order, without blanks or repeats."""
+    people = []
+    if director and director.strip():
+        people.append((Credit.DIRECTOR, director.strip()))
+    for actor in actors or []:
+        if isinstance(actor, str) and actor.strip():
+            people.append((Credit.ACTOR, actor.strip()))
+    seen = set()
+    unique = []
+    for role, name in people:
+        key = (role, Person.name_key_for(name))
+        if key not in seen:
+            seen.add(key)
+            unique.append((role, name))
+    return unique
+
+
+def get_or_create_people(names: Iterable[str]) -> Dict[str, int]:
+    """
+    Person pk per name key, inserting people that do not exist yet.
+    """
+    by_key = {}
+    for name in names:
+        by_key.setdefault(Person.name_key_for(name), name)
+
+    Person.objects.bulk_create(
+        [Person(name=name, name_key=key) for key, name in by_key.items()],
+        batch_size=BATCH_SIZE,
+        # Existing people (or ones inserted concurrently) keep their row
+        ignore_conflicts=True,
+    )
+    keys = list(by_key)
+    ids = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+        ids.update(Person.objects.filter(name_key__in=chunk).values_list('name_key', 'id'))
+    return ids
+
+
+def set_movie_credits(movie_people_map: Dict[int, List[Tuple[str, str]]]):
+    """
+    Replace the credits of many movies at once.
+
+    Args:
+        movie_people_map: local movie pk -> movie_people() pairs
+    """
+    person_ids = get_or_create_people(
+        name for people in movie_people_map.values() for _, name in people
+    )
+    rows = []
+    for movie_id, people in movie_people_map.items():
+        order = {Credit.ACTOR: 0, Credit.DIRECTOR: 0}
+        for role, name in people:
+            rows.append(Credit(
+                person_id=person_ids[Person.name_key_for(name)],
+                movie_id=movie_id,
+                role=role,
+                order=order[role],
+            ))
+            order[role] += 1
+
+    movie_ids = list(movie_people_map)
+    for start in range(0, len(movie_ids), LOOKUP_CHUNK_SIZE):
+        Credit.objects.filter(movie_id__in=movie_ids[start:start + LOOKUP_CHUNK_SIZE]).delete()
+    Credit.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def sync_movie_credits(movie_ids: Iterable[int]) -> int:
+    """
+    Rebuild the credits of the given movies from their actors/director.
+
+    Returns:
+        Number of movies processed.
+    """
+    movie_ids = list(movie_ids)
+    people = {}
+    for start in range(0, len(movie_ids), LOOKUP_CHUNK_SIZE):
+        chunk = movie_ids[start:start + LOOKUP_CHUNK_SIZE]
+        rows = Movie.objects.filter(pk__in=chunk).values_list('id', 'director', 'actors')
+        people.update((movie_id, movie_people(director, actors)) for movie_id, director, actors in rows)
+    set_movie_credits(people)
+    return len(people)
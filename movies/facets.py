@@ -0,0 +1,91 @@
+"""
+Facet counts for the movie catalog: how many movies of the current filtered
+set fall under each genre, release year, language and source.
+
+Each facet is one grouped aggregate query over the filtered movie ids, so
+a page can show per-value counts without one request per filter value.
+Results are cached per filter signature under the current Movie/Genre
+table versions (figflix/conditional.py), so any catalog write makes them
+recompute on the next request.
+"""
+import hashlib
+import json
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, QuerySet
+
+from figflix.conditional import table_versions
+from .genre_registry import genre_registry
+from .models import Genre, Movie
+
+CACHE_KEY_PREFIX = 'movies:facets:'
+
+# Response key -> Movie column counted per value
+COLUMN_FACETS = {
+    'years': 'release_year',
+    'languages': 'language',
+    'sources': 'source',
+}
+
+
+def compute_facets(queryset: QuerySet) -> Dict:
+    """
+    Count the movies of a (filtered) Movie queryset per facet value.
+
+    Returns:
+        {'count': n, 'genres': [{'id', 'name', 'count'}], 'years': [...],
+        'languages': [...], 'sources': [...]}; column facets are lists of
+        {'value', 'count'}. Years are newest first, the rest by count.
+    """
+    genre_links = Movie.genres.through.objects.all()
+    if queryset.query.has_filters():
+        # Match on ids: the filters may join genres (repeating movies) or
+        # the search index, and the facets must count each movie once
+        ids = queryset.order_by().values('pk')
+        movies = Movie.objects.filter(pk__in=ids)
+        genre_links = genre_links.filter(movie_id__in=ids)
+    else:
+        movies = Movie.objects.all()
+
+    facets = {}
+    for name, column in COLUMN_FACETS.items():
+        rows = movies.order_by().values(column).annotate(count=Count('pk'))
+        facets[name] = [{'value': row[column], 'count': row['count']} for row in rows]
+    facets['years'].sort(key=lambda row: (row['value'] is not None, row['value']), reverse=True)
+    facets['languages'].sort(key=lambda row: -row['count'])
+    facets['sources'].sort(key=lambda row: -row['count'])
+
+    genres = []
+    for row in genre_links.order_by().values('genre_id').annotate(count=Count('movie_id')):
+        entry = genre_registry.get_by_id(row['genre_id'])
+        if entry:
+            genres.append({'id': entry.id, 'name': entry.name, 'count': row['count']})
+    genres.sort(key=lambda row: (-row['count'], row['name']))
+
+    # Every movie has a source, so the source counts add up to the total
+    return {
+        'count': sum(row['count'] for row in facets['sources']),
+        'genres': genres,
+        **facets,
+    }
+
+
+def get_facets(queryset: QuerySet, signature: Dict[str, str]) -> Dict:
+    """
+    Cached compute_facets().
+
+    Args:
+        queryset: the filtered movies
+        signature: the normalized filter parameters that produced `queryset`
+    """
+    if not settings.FACETS_CACHE_TIMEOUT:
+        return compute_facets(queryset)
+    raw = json.dumps([sorted(signature.items()), table_versions(Movie, Genre)])
+    key = CACHE_KEY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, timeout=settings.FACETS_CACHE_TIMEOUT)
+    return facets
@@ -0,0 +1,306 @@
+"""
+Offline stand-in for the TMDb API, used for load testing and benchmarks.
+
+Serves the endpoints used by TMDbService from deterministic synthetic data,
+from fixtures recorded against the real API, or by recording them while
+proxying to it. Latency and upstream errors can be injected to exercise
+the client's caching, retry and circuit-breaker paths. Point the app at it
+with TMDB_BASE_URL=http://127.0.0.1:<port>.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+SYNTHETIC = 'synthetic'
+RECORD = 'record'
+REPLAY = 'replay'
+MODES = (SYNTHETIC, RECORD, REPLAY)
+
+PAGE_SIZE = 20
+TOTAL_PAGES = 500
+
+# TMDb's movie genre list
+GENRES = [
+    (28, 'Action'), (12, 'Adventure'), (16, 'Animation'), (35, 'Comedy'),
+    (80, 'Crime'), (99, 'Documentary'), (18, 'Drama'), (10751, 'Family'),
+    (14, 'Fantasy'), (36, 'History'), (27, 'Horror'), (10402, 'Music'),
+    (9648, 'Mystery'), (10749, 'Romance'), (878, 'Science Fiction'),
+    (10770, 'TV Movie'), (53, 'Thriller'), (10752, 'War'), (37, 'Western'),
+]
+
+# Query parameters that never change the response body
+IGNORED_PARAMS = ('api_key',)
+
+MOVIE_PATH_RE = re.compile(r'^/movie/(\d+)(?:/(videos|credits))?$')
+
+
+def fixture_key(path: str, params: Dict[str, str]) -> str:
+    """Canonical request identity used to name recorded fixtures."""
+    kept = sorted((k, v) for k, v in params.items() if k not in IGNORED_PARAMS)
+    return f"{path}?{urlencode(kept)}" if kept else path
+
+
+class SyntheticTMDb:
+    """
+    Deterministic fake TMDb payloads: the same request always returns the
+    same body, so benchmark runs are comparable.
+    """
+
+    def movie_summary(self, movie_id: int) -> Dict:
+        rng = random.Random(movie_id)
+        return {
+            'id': movie_id,
+            'title': f'Movie {movie_id}',
+            'overview': f'Synthetic overview for movie {movie_id}.',
+            'release_date': f'{rng.randint(1950, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'poster_path': f'/poster{movie_id}.jpg',
+            'backdrop_path': f'/backdrop{movie_id}.jpg',
+            'vote_average': round(rng.uniform(3, 9), 1),
+            'vote_count': rng.randint(10, 30000),
+            'popularity': round(rng.uniform(1, 500), 3),
+            'genre_ids': sorted(g for g, _ in rng.sample(GENRES, rng.randint(1, 3))),
+            'original_language': rng.choice(['en', 'en', 'en', 'fr', 'es', 'ja', 'ko']),
+        }
+
+    def videos(self, movie_id: int) -> Dict:
+        return {
+            'id': movie_id,
+            'results': [{'site': 'YouTube', 'type': 'Trailer', 'key': f'trailer{movie_id}', 'name': 'Official Trailer'}],
+        }
+
+    def credits(self, movie_id: int) -> Dict:
+        return {
+            'id': movie_id,
+            'cast': [{'name': f'Actor {movie_id}-{i}', 'character': f'Role {i}', 'order': i} for i in range(12)],
+            'crew': [{'name': f'Director {movie_id}', 'job': 'Director'}],
+        }
+
+    def movie_detail(self, movie_id: int, append: str = '') -> Dict:
+        data = self.movie_summary(movie_id)
+        genre_names = dict(GENRES)
+        data['genres'] = [{'id': g, 'name': genre_names[g]} for g in data.pop('genre_ids')]
+        data['runtime'] = random.Random(movie_id).randint(80, 180)
+        data['homepage'] = ''
+        for part in filter(None, append.split(',')):
+            if part == 'videos':
+                data['videos'] = self.videos(movie_id)
+            elif part == 'credits':
+                data['credits'] = self.credits(movie_id)
+        return data
+
+    def movie_list(self, seed: str, page: int, sort_key: Optional[str] = None) -> Dict:
+        """A page of movies whose ids are derived from `seed` and `page`."""
+        base = int(hashlib.sha1(seed.encode()).hexdigest()[:6], 16) * 1000
+        results = [self.movie_summary(base + (page - 1) * PAGE_SIZE + i + 1) for i in range(PAGE_SIZE)]
+        if sort_key:
+            results.sort(key=lambda m: m[sort_key], reverse=True)
+        return {
+            'page': page,
+            'results': results,
+            'total_pages': TOTAL_PAGES,
+            'total_results': TOTAL_PAGES * PAGE_SIZE,
+        }
+
+    def changes(self, params: Dict[str, str]) -> Dict:
+        page = int(params.get('page', 1))
+        seed = f"{params.get('start_date')}:{params.get('end_date')}"
+        base = int(hashlib.sha1(seed.encode()).hexdigest()[:4], 16)
+        return {
+            'results': [{'id': base + (page - 1) * 100 + i, 'adult': False} for i in range(100)],
+            'page': page,
+            'total_pages': 3,
+            'total_results': 300,
+        }
+
+    def respond(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict]:
+        page = int(params.get('page', 1) or 1)
+        if path == '/genre/movie/list':
+            return 200, {'genres': [{'id': g, 'name': n} for g, n in GENRES]}
+        if path == '/movie/popular':
+            return 200, self.movie_list('popular', page, 'popularity')
+        if path == '/movie/top_rated':
+            return 200, self.movie_list('top_rated', page, 'vote_average')
+        if path == '/movie/changes':
+            return 200, self.changes(params)
+        if path == '/search/movie':
+            return 200, self.movie_list(f"search:{params.get('query', '').lower()}", page)
+        if path == '/discover/movie':
+            seed = 'discover:' + urlencode(sorted((k, v) for k, v in params.items()
+                                                  if k not in IGNORED_PARAMS + ('page',)))
+            return 200, self.movie_list(seed, page, 'popularity')
+
+        match = MOVIE_PATH_RE.match(path)
+        if match:
+            movie_id, part = int(match.group(1)), match.group(2)
+            if part == 'videos':
+                return 200, self.videos(movie_id)
+            if part == 'credits':
+                return 200, self.credits(movie_id)
+            return 200, self.movie_detail(movie_id, params.get('append_to_response', ''))
+
+        return 404, {'status_code': 34, 'status_message': 'The resource you requested could not be found.', 'success': False}
+
+
+class FixtureStore:
+    """Recorded responses on disk, one JSON file per request."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    def load(self, key: str) -> Optional[Tuple[int, Dict]]:
+        try:
+            with open(self._path(key)) as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            return None
+        return fixture['status'], fixture['body']
+
+    def save(self, key: str, status_code: int, body: Dict):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self._path(key), 'w') as f:
+            json.dump({'request': key, 'status': status_code, 'body': body}, f, indent=1)
+
+
+class FakeTMDb:
+    """
+    Request handling policy shared by all server threads.
+
+    Args:
+        mode: 'synthetic', 'record' (proxy to upstream and save) or 'replay'
+        fixtures: directory of recorded responses
+        upstream: real TMDb base URL, used in record mode
+        api_key: key sent upstream in record mode
+        latency: added delay per request, in seconds
+        jitter: random extra delay of up to this many seconds
+        error_rate: fraction of requests answered with `error_status`
+        error_status: HTTP status for injected errors (429 adds Retry-After)
+        strict: in replay mode, answer unrecorded requests with 404 instead
+            of synthetic data
+    """
+
+    def __init__(self, mode: str = SYNTHETIC, fixtures: Optional[Path] = None,
+                 upstream: str = '', api_key: str = '', latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, strict: bool = False, seed: Optional[int] = None):
+        self.mode = mode
+        self.store = FixtureStore(fixtures) if fixtures else None
+        self.upstream = upstream.rstrip('/')
+        self.api_key = api_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.strict = strict
+        self.synthetic = SyntheticTMDb()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._session = requests.Session()
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'injected_errors': 0, 'replayed': 0, 'recorded': 0, 'synthetic': 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def handle(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict, Dict]:
+        """Return (status, JSON body, extra headers) for one request."""
+        self._count('requests')
+        delay = self.latency + (self.jitter * self._random() if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if self.error_rate and self._random() < self.error_rate:
+            self._count('injected_errors')
+            headers = {'Retry-After': '1'} if self.error_status == 429 else {}
+            body = {'status_code': 25 if self.error_status == 429 else 11,
+                    'status_message': 'Injected error', 'success': False}
+            return self.error_status, body, headers
+
+        key = fixture_key(path, params)
+        if self.mode == REPLAY:
+            recorded = self.store.load(key)
+            if recorded is not None:
+                self._count('replayed')
+                return recorded[0], recorded[1], {}
+            if self.strict:
+                return 404, {'status_code': 34, 'status_message': f'No fixture for {key}', 'success': False}, {}
+        elif self.mode == RECORD:
+            status_code, body = self._fetch_upstream(path, params)
+            # Rate limits and upstream failures are not part of the fixture set
+            if status_code < 500 and status_code != 429:
+                self.store.save(key, status_code, body)
+                self._count('recorded')
+            return status_code, body, {}
+
+        self._count('synthetic')
+        status_code, body = self.synthetic.respond(path, params)
+        return status_code, body, {}
+
+    def _fetch_upstream(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict]:
+        upstream_params = dict(params, api_key=self.api_key)
+        try:
+            response = self._session.get(f"{self.upstream}{path}", params=upstream_params, timeout=(3.05, 10))
+            return response.status_code, response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return 502, {'status_code': 11, 'status_message': f'Upstream error: {e}', 'success': False}
+
+
+class FakeTMDbHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 keep-alive handler delegating to the server's FakeTMDb."""
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeTMDb/1.0'
+    # Headers and body are separate writes; with Nagle on, keep-alive
+    # clients stall on delayed ACKs for every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/')
+        # Accept base URLs with or without the /3 version prefix
+        if path.startswith('/3/'):
+            path = path[2:]
+        params = dict(parse_qsl(url.query))
+
+        status_code, body, headers = self.server.fake.handle(path, params)
+        payload = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def make_server(fake: FakeTMDb, host: str = '127.0.0.1', port: int = 8765,
+                verbose: bool = False) -> ThreadingHTTPServer:
+    """Create (but do not start) a threaded HTTP server; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), FakeTMDbHandler)
+    server.daemon_threads = True
+    server.fake = fake
+    server.verbose = verbose
+    return server
@@ -0,0 +1,135 @@
+"""
+Process-wide registry of genres (local id <-> name <-> TMDb id).
+
+Genres are a tiny, almost static table that is looked up on hot paths
+(TMDb imports, recommendations), so the whole table is loaded in one query
+and kept in memory. Writes bump a version counter in the Django cache
+once their transaction commits; every process compares it on access and
+reloads when it changed. A counter lost to eviction or a cache restart is
+reseeded from the clock, so it never comes back with a version a process
+already holds (as in figflix/conditional.py).
+"""
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.text import slugify
+
+VERSION_KEY = 'movies:genre_registry:version'
+
+
+class GenreEntry(NamedTuple):
+    id: int
+    name: str
+    tmdb_id: Optional[int]
+
+
+class GenreRegistry:
+    """
+    In-memory snapshot of the Genre table with cross-process invalidation.
+    """
+
+    def __init__(self, cache_alias: str = 'default'):
+        self.cache_alias = cache_alias
+        self._lock = threading.Lock()
+        self._version = None
+        self._by_id: Dict[int, GenreEntry] = {}
+        self._by_name: Dict[str, GenreEntry] = {}
+        self._by_tmdb_id: Dict[int, GenreEntry] = {}
+        self._by_slug: Dict[str, GenreEntry] = {}
+
+    @property
+    def _cache(self):
+        return caches[self.cache_alias]
+
+    def _current_version(self) -> int:
+        version = self._cache.get(VERSION_KEY)
+        if version is None:
+            # add() is a no-op if another process already set the counter
+            self._cache.add(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+            version = self._cache.get(VERSION_KEY)
+        return version
+
+    def _snapshot(self):
+        """Return the lookup maps, reloading them if the table changed."""
+        version = self._current_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+        return self._by_id, self._by_name, self._by_tmdb_id, self._by_slug
+
+    def _load(self, version: int):
+        from .models import Genre
+
+        entries = [GenreEntry(*row) for row in Genre.objects.values_list('id', 'name', 'tmdb_id')]
+        self._by_id = {e.id: e for e in entries}
+        self._by_name = {e.name.lower(): e for e in entries}
+        self._by_tmdb_id = {e.tmdb_id: e for e in entries if e.tmdb_id is not None}
+        self._by_slug = {slugify(e.name): e for e in entries}
+        self._version = version
+
+    def invalidate(self):
+        """
+        Mark every process's snapshot as stale; call after Genre writes.
+
+        The version is bumped once the current transaction commits, so no
+        process can load the table from before the write under the new
+        version. This process drops its snapshot at once, to see its own
+        writes inside the transaction.
+        """
+        def bump():
+            try:
+                self._cache.incr(VERSION_KEY)
+            except ValueError:
+                self._cache.set(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+
+        with self._lock:
+            self._version = None
+        transaction.on_commit(bump)
+
+    def all(self) -> List[GenreEntry]:
+        return list(self._snapshot()[0].values())
+
+    def get_by_id(self, genre_id: int) -> Optional[GenreEntry]:
+        return self._snapshot()[0].get(genre_id)
+
+    def get_by_name(self, name: str) -> Optional[GenreEntry]:
+        """Case-insensitive lookup by genre name."""
+        return self._snapshot()[1].get(name.lower())
+
+    def get_by_tmdb_id(self, tmdb_id: int) -> Optional[GenreEntry]:
+        return self._snapshot()[2].get(tmdb_id)
+
+    def get_by_slug(self, slug: str) -> Optional[GenreEntry]:
+        """Lookup by Genre.slug; a genre name is slugified first."""
+        return self._snapshot()[3].get(slugify(slug))
+
+    def resolve(self, value: str) -> Optional[GenreEntry]:
+        """Genre for a ?genre= value: a local pk, a slug or a name."""
+        value = value.strip()
+        # isdecimal(): isdigit() also accepts digits like '²' that int() rejects
+        if value.isdecimal():
+            return self.get_by_id(int(value))
+        return self.get_by_slug(value)
+
+    def tmdb_id_map(self) -> Dict[int, int]:
+        """TMDb genre id -> local genre pk."""
+        return {tmdb_id: e.id for tmdb_id, e in self._snapshot()[2].items()}
+
+    def ids_for_tmdb_ids(self, tmdb_ids: Iterable[int]) -> List[int]:
+        """Local genre pks for the given TMDb genre ids; unknown ids are skipped."""
+        by_tmdb_id = self._snapshot()[2]
+        return [by_tmdb_id[t].id for t in tmdb_ids if t in by_tmdb_id]
+
+    def tmdb_ids_for_names(self, names: Iterable[str]) -> List[int]:
+        """TMDb genre ids for the given genre names; unknown names are skipped."""
+        by_name = self._snapshot()[1]
+        entries = (by_name.get(n.lower()) for n in names)
+        return [e.tmdb_id for e in entries if e is not None and e.tmdb_id is not None]
+
+
+# Singleton instance
+genre_registry = GenreRegistry()
@@ -0,0 +1,296 @@
+"""
+Resized poster/backdrop variants served from a local disk cache.
+
+Source images (uploaded posters or TMDb images) are read or downloaded
+once and stored by the SHA-256 of their bytes. Width/format variants are
+generated from them with Pillow and stored next to them under the same
+digest, so identical sources share variants and a variant file never
+changes once written. The cache is bounded by total size; the least
+recently used files are evicted first.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from PIL import Image, ImageOps
+
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+# TMDb image URLs embed the rendition size: .../t/p/w500/abc.jpg
+TMDB_SIZE_RE = re.compile(r'/t/p/[^/]+/')
+
+# Suffix of files being written; eviction and size accounting skip them
+TMP_SUFFIX = '.tmp'
+
+# Files stat()ed per eviction pass, so a large cache is not walked in full
+# on every write that crosses the limit
+EVICT_SCAN_LIMIT = 5000
+
+
+class ImageVariant(NamedTuple):
+    path: Path
+    content_type: str
+    etag: str
+
+
+def pick_width(width: Optional[int]) -> int:
+    """Round a requested width up to the nearest configured variant width."""
+    widths = sorted(settings.IMAGE_PROXY_WIDTHS)
+    if not width:
+        return widths[-1]
+    return next((w for w in widths if w >= width), widths[-1])
+
+
+def source_version(source: str) -> str:
+    """Short, stable token that changes whenever the source changes."""
+    return hashlib.sha1(source.encode()).hexdigest()[:12]
+
+
+def is_proxyable_url(url: str) -> bool:
+    """Only images on allowed hosts are downloaded (no open proxy)."""
+    return urlparse(url).hostname in settings.IMAGE_PROXY_ALLOWED_HOSTS
+
+
+def original_tmdb_url(url: str) -> str:
+    """Request the largest TMDb rendition so every variant can be derived from it."""
+    return TMDB_SIZE_RE.sub(f'/t/p/{settings.IMAGE_PROXY_TMDB_SOURCE_SIZE}/', url, count=1)
+
+
+class ImageCache:
+    """
+    Content-addressed, size-bounded disk cache of source images and variants.
+
+    Layout under `root`:
+        refs/<sha1 of source>        digest of the source bytes
+        blobs/<d[:2]>/<d>            source bytes
+        blobs/<d[:2]>/<d>-<w>.<fmt>  generated variants
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+        self._evict_passes = 0
+
+    def _write(self, path: Path, data: bytes) -> bool:
+        """
+        Write atomically, so concurrent readers never see partial files.
+
+        Returns False if the file could not be written, e.g. because a
+        cache clear in another process removed the temporary file.
+        """
+        tmp = path.with_name(f'.{path.name}.{uuid.uuid4().hex}{TMP_SUFFIX}')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except FileNotFoundError:
+            tmp.unlink(missing_ok=True)
+            return False
+        self._account(len(data))
+        return True
+
+    def _touch(self, path: Path):
+        """Mark a file as recently used for eviction."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _ref_path(self, source: str) -> Path:
+        return self.root / 'refs' / hashlib.sha1(source.encode()).hexdigest()
+
+    def _blob_path(self, digest: str, suffix: str = '') -> Path:
+        return self.root / 'blobs' / digest[:2] / f'{digest}{suffix}'
+
+    def source_digest(self, source: str, loader) -> Optional[str]:
+        """
+        Digest of the source's bytes, calling `loader()` only on first use.
+        """
+        ref = self._ref_path(source)
+        try:
+            digest = ref.read_text()
+            if self._blob_path(digest).exists():
+                return digest
+        except FileNotFoundError:
+            pass
+
+        data = loader()
+        if not data:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists() and not self._write(blob, data):
+            return None
+        self._write(ref, digest.encode())
+        return digest
+
+    def variant(self, digest: str, width: int, fmt: str) -> Optional[ImageVariant]:
+        """Get or generate the `width`/`fmt` variant of a stored source."""
+        path = self._blob_path(digest, f'-{width}.{fmt}')
+        content_type = FORMATS[fmt][1]
+        etag = f'"{digest[:16]}-{width}-{fmt}"'
+
+        if path.exists():
+            self._touch(path)
+            return ImageVariant(path, content_type, etag)
+
+        source = self._blob_path(digest)
+        try:
+            data = render_variant(source.read_bytes(), width, fmt)
+        except (FileNotFoundError, OSError, Image.DecompressionBombError):
+            return None
+        self._touch(source)
+        if not self._write(path, data):
+            return None
+        return ImageVariant(path, content_type, etag)
+
+    def _dirs(self):
+        return [self.root / 'refs'] + sorted(self.root.glob('blobs/*'))
+
+    def _files(self, dirs=None):
+        """Cached files, without the temporary files of writes in progress."""
+        for directory in self._dirs() if dirs is None else dirs:
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith(TMP_SUFFIX) and entry.is_file():
+                    yield Path(entry.path)
+
+    def _account(self, added: int):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(p.stat().st_size for p in self._files())
+            else:
+                self._size += added
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Delete least recently used files until 90% of the limit is free.
+
+        A pass looks at no more than EVICT_SCAN_LIMIT files, starting from a
+        different shard directory each time, and evicts the oldest of them;
+        if that frees too little, the next write runs another pass.
+        """
+        dirs = self._dirs()
+        start = self._evict_passes % len(dirs)
+        self._evict_passes += 1
+
+        entries = []
+        for path in self._files(dirs[start:] + dirs[:start]):
+            if len(entries) == EVICT_SCAN_LIMIT:
+                break
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        if len(entries) < EVICT_SCAN_LIMIT:
+            # The whole cache was seen: resync with what other processes wrote or evicted
+            self._size = sum(e[1] for e in entries)
+        entries.sort()
+
+        target = self.max_bytes * 0.9
+        for _, file_size, path in entries:
+            if self._size <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= file_size
+        # Refs to evicted blobs are detected and refilled on next use
+
+    def clear(self):
+        with self._lock:
+            for path in self._files():
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+
+def render_variant(data: bytes, width: int, fmt: str) -> bytes:
+    """Downscale an image to at most `width` pixels wide and encode it."""
+    pil_format = FORMATS[fmt][0]
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.LANCZOS)
+        if pil_format == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGB')
+
+        out = io.BytesIO()
+        if pil_format == 'WEBP':
+            image.save(out, pil_format, quality=settings.IMAGE_PROXY_QUALITY, method=4)
+        else:
+            image.save(out, pil_format, quality=settings.IMAGE_PROXY_QUALITY, optimize=True, progressive=True)
+        return out.getvalue()
+
+
+def fetch_url(url: str) -> Optional[bytes]:
+    """Download a remote source image, refusing oversized responses."""
+    max_bytes = settings.IMAGE_PROXY_MAX_SOURCE_BYTES
+    try:
+        with requests.get(url, stream=True, timeout=(3.05, 10)) as response:
+            response.raise_for_status()
+            data = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                data.extend(chunk)
+                if len(data) > max_bytes:
+                    print(f"Image proxy: source too large: {url}")
+                    return None
+            return bytes(data)
+    except requests.exceptions.RequestException as e:
+        print(f"Image proxy error: {e}")
+        return None
+
+
+def movie_image_source(movie, kind: str) -> Optional[Tuple[str, Callable[[], Optional[bytes]]]]:
+    """
+    Resolve a movie's poster or backdrop to (source identity, loader).
+
+    Uploaded posters win over TMDb URLs, as in Movie.poster_image_url.
+    Returns None when there is no proxyable source.
+    """
+    if kind == 'poster' and movie.poster:
+        def read_upload():
+            with movie.poster.open('rb') as f:
+                return f.read()
+        return f'upload:{movie.poster.name}', read_upload
+
+    url = movie.poster_url if kind == 'poster' else movie.backdrop_url
+    if url and is_proxyable_url(url):
+        url = original_tmdb_url(url)
+        return url, lambda: fetch_url(url)
+    return None
+
+
+def get_variant(source: str, loader, width: int, fmt: str) -> Optional[ImageVariant]:
+    """
+    Get a cached variant of an image.
+
+    Args:
+        source: stable identity of the source (file name or URL)
+        loader: callable returning the source bytes on a cache miss
+    """
+    digest = image_cache.source_digest(source, loader)
+    if digest is None:
+        return None
+    return image_cache.variant(digest, pick_width(width), fmt)
+
+
+# Singleton instance
+image_cache = ImageCache(settings.IMAGE_PROXY_CACHE_DIR, settings.IMAGE_PROXY_CACHE_MAX_BYTES)
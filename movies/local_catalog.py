@@ -0,0 +1,103 @@
+"""
+Local catalog reads in the same shape as TMDbService results.
+
+Used as a degraded-mode fallback when TMDb is unavailable, and to serve the
+TMDb listing endpoints from the local mirror (see the sync_tmdb_catalog
+command) when TMDB_SERVE_FROM_MIRROR is on.
+"""
+from math import ceil
+from typing import Dict, List, Optional
+from .genre_registry import genre_registry
+from .models import Movie
+
+PAGE_SIZE = 20
+
+
+def _tmdb_movies():
+    return Movie.objects.filter(tmdb_id__isnull=False).prefetch_related('genres')
+
+
+def format_movie(movie: Movie) -> Dict:
+    """Format a Movie like an entry of TMDbService._format_movie_results."""
+    return {
+        'tmdb_id': movie.tmdb_id,
+        'title': movie.title,
+        'description': movie.description,
+        'release_year': str(movie.release_year) if movie.release_year else None,
+        'poster_url': movie.poster_url,
+        'backdrop_url': movie.backdrop_url,
+        'tmdb_rating': movie.tmdb_rating,
+        'tmdb_vote_count': movie.tmdb_vote_count,
+        'popularity': movie.popularity,
+        'genre_ids': [g.tmdb_id for g in movie.genres.all() if g.tmdb_id],
+    }
+
+
+def format_movie_detail(movie: Movie) -> Dict:
+    """Format a Movie like TMDbService._format_movie_detail plus bundle extras."""
+    data = format_movie(movie)
+    data.update({
+        'runtime': movie.runtime,
+        'genres': [g.name for g in movie.genres.all()],
+        'language': movie.language,
+        'homepage': None,
+        'trailer_url': movie.trailer_url,
+        'actors': movie.actors,
+        'director': movie.director,
+    })
+    return data
+
+
+def paginate(queryset, page: int) -> Dict:
+    """Slice a queryset into a TMDb-style results page."""
+    page = max(int(page), 1)
+    total_results = queryset.count()
+    offset = (page - 1) * PAGE_SIZE
+    return {
+        'results': [format_movie(m) for m in queryset[offset:offset + PAGE_SIZE]],
+        'total_pages': ceil(total_results / PAGE_SIZE),
+        'total_results': total_results,
+        'page': page,
+    }
+
+
+def popular_movies(page: int = 1) -> Dict:
+    return paginate(_tmdb_movies().order_by('-popularity', '-id'), page)
+
+
+def top_rated_movies(page: int = 1) -> Dict:
+    return paginate(_tmdb_movies().order_by('-tmdb_rating', '-tmdb_vote_count', '-id'), page)
+
+
+def search_movies(query: str, page: int = 1) -> Dict:
+    queryset = _tmdb_movies().filter(title__icontains=query)
+    return paginate(queryset.order_by('-popularity', '-id'), page)
+
+
+def discover_movies(genre_ids: List[int] = None, year: int = None,
+                    min_rating: float = None, page: int = 1) -> Dict:
+    queryset = _tmdb_movies()
+    if genre_ids:
+        # TMDb's with_genres=a,b means "all of these genres"
+        genre_ids = set(genre_ids)
+        local_ids = genre_registry.ids_for_tmdb_ids(genre_ids)
+        if len(local_ids) < len(genre_ids):
+            # A genre unknown locally: no movie has all of them
+            queryset = queryset.none()
+        else:
+            queryset = queryset.with_genres(local_ids, match_all=True)
+    if year:
+        queryset = queryset.filter(release_year=year)
+    if min_rating:
+        queryset = queryset.filter(tmdb_rating__gte=min_rating)
+    return paginate(queryset.order_by('-popularity', '-id'), page)
+
+
+def movie_detail(tmdb_id: int) -> Optional[Dict]:
+    movie = _tmdb_movies().filter(tmdb_id=tmdb_id).first()
+    return format_movie_detail(movie) if movie else None
+
+
+def genres() -> List[Dict]:
+    entries = sorted(genre_registry.all(), key=lambda g: g.name)
+    return [{'id': g.tmdb_id, 'name': g.name} for g in entries if g.tmdb_id is not None]
@@ -0,0 +1,49 @@
+"""
+Management command to build Person/Credit rows from Movie.actors and
+Movie.director for existing movies. Saves and TMDb imports keep credits in
+sync afterwards; rerun after bulk changes that bypass them (raw SQL,
+QuerySet.update).
+
+Movies are processed in primary-key order, one transaction per batch, so an
+interrupted run can be resumed with --start-id.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from movies.credits import movie_people, set_movie_credits
+from movies.models import Movie
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Backfill Person/Credit rows from movie actors and directors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=f'Movies per transaction (default: {BATCH_SIZE})')
+        parser.add_argument('--start-id', type=int, default=0,
+                            help='Resume after this movie id (default: from the start)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = options['start_id']
+        total = Movie.objects.filter(pk__gt=last_id).count()
+        self.stdout.write(f'🔎 Backfilling credits of {total} movies')
+
+        done = 0
+        while True:
+            rows = list(
+                Movie.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('id', 'director', 'actors')[:batch_size]
+            )
+            if not rows:
+                break
+            with transaction.atomic():
+                set_movie_credits({
+                    movie_id: movie_people(director, actors) for movie_id, director, actors in rows
+                })
+            last_id = rows[-1][0]
+            done += len(rows)
+            self.stdout.write(f'   {done}/{total} movies (last id {last_id})')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Backfilled credits of {done} movies'))
@@ -0,0 +1,101 @@
+"""
+Management command to compare the TMDb proxy views under the WSGI and ASGI
+concurrency models: the DRF view (api_views) on a fixed pool of worker
+threads, as a threaded WSGI server runs it, against the async view
+(async_api_views) with every request on one event loop, as under ASGI.
+
+Requests go to an in-process fake TMDb server (movies/fake_tmdb.py) with
+--latency of delay each, and bypass the response cache and rate limiter,
+so every request waits on the upstream.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncRequestFactory, RequestFactory
+from movies import api_views, async_api_views
+from movies.async_tmdb_service import async_tmdb_service
+from movies.fake_tmdb import FakeTMDb, make_server
+from movies.tmdb_service import tmdb_service
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the sync TMDb views on worker threads (WSGI) vs. the async views (ASGI)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Concurrent requests per run (default: 200)')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='WSGI worker threads (default: 8)')
+        parser.add_argument('--latency', type=float, default=100,
+                            help='Fake TMDb delay per request in milliseconds (default: 100)')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['threads'] < 1:
+            raise CommandError('--requests and --threads must be positive')
+
+        server = make_server(FakeTMDb(latency=options['latency'] / 1000), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+        base_url = f'http://{host}:{port}/3'
+        self.stdout.write(
+            f'🔎 Fake TMDb on {base_url}, {options["latency"]:.0f} ms latency, '
+            f'{options["requests"]} concurrent movie detail requests'
+        )
+
+        saved = [(service, service.base_url, service.api_key, service.cache_enabled, service.rate_limiter.rate)
+                 for service in (tmdb_service, async_tmdb_service)]
+        try:
+            for service in (tmdb_service, async_tmdb_service):
+                service.base_url = base_url
+                service.api_key = service.api_key or 'benchmark'
+                service.cache_enabled = False
+                service.rate_limiter.rate = 0
+
+            ids = range(1, options['requests'] + 1)
+            wsgi = self._run_wsgi(ids, options['threads'])
+            asgi = asyncio.run(self._run_asgi(ids))
+        finally:
+            for service, url, key, cache_enabled, rate in saved:
+                service.base_url, service.api_key = url, key
+                service.cache_enabled, service.rate_limiter.rate = cache_enabled, rate
+            server.shutdown()
+            server.server_close()
+
+        count = len(ids)
+        self.stdout.write(f'   WSGI, {options["threads"]} threads  {wsgi * 1000:8.1f} ms ({count / wsgi:6.0f} req/s)')
+        self.stdout.write(
+            f'   ASGI, event loop   {asgi * 1000:8.1f} ms ({count / asgi:6.0f} req/s)   ({wsgi / asgi:.1f}x)'
+        )
+
+    def _run_wsgi(self, ids, threads: int) -> float:
+        factory = RequestFactory()
+
+        def call(tmdb_id):
+            response = api_views.tmdb_movie_detail_view(factory.get(f'/api/movies/tmdb/{tmdb_id}/'), tmdb_id)
+            if response.status_code != 200:
+                raise CommandError(f'Sync view returned {response.status_code} for movie {tmdb_id}')
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            # Warm up the keep-alive pool
+            list(executor.map(call, [0] * threads))
+            start = time.perf_counter()
+            list(executor.map(call, ids))
+            return time.perf_counter() - start
+
+    async def _run_asgi(self, ids) -> float:
+        factory = AsyncRequestFactory()
+
+        async def call(tmdb_id):
+            response = await async_api_views.tmdb_movie_detail_view(
+                factory.get(f'/api/movies/tmdb/{tmdb_id}/'), tmdb_id
+            )
+            if response.status_code != 200:
+                raise CommandError(f'Async view returned {response.status_code} for movie {tmdb_id}')
+
+        await call(0)
+        start = time.perf_counter()
+        await asyncio.gather(*(call(tmdb_id) for tmdb_id in ids))
+        return time.perf_counter() - start
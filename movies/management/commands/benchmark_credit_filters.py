@@ -0,0 +1,49 @@
+"""
+Management command to compare the ?actor= / ?director= movie filters,
+which go through the Person/Credit indexes, with scanning the actors JSON
+and director text columns for the same names.
+"""
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from movies.models import Credit, Movie, Person
+
+
+class Command(BaseCommand):
+    help = 'Benchmark credit-index actor/director filters against JSON/text column scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--names', type=int, default=5,
+                            help='People per role to look up, most credited first (default: 5)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per measurement; the best is reported (default: 5)')
+
+    def handle(self, *args, **options):
+        if not Credit.objects.exists():
+            raise CommandError('No credits to benchmark with; run backfill_credits first')
+
+        for role, column in ((Credit.ACTOR, 'actors'), (Credit.DIRECTOR, 'director')):
+            people = (
+                Person.objects.filter(credits__role=role)
+                .annotate(n=Count('credits')).order_by('-n')[:options['names']]
+            )
+            for person in people:
+                indexed = Movie.objects.credited([person.name], role=role)
+                if column == 'actors':
+                    # JSON "contains" is not available on every backend; a
+                    # match on the encoded text is what a scan comes down to
+                    scanned = Movie.objects.filter(actors__icontains=f'"{person.name}"')
+                else:
+                    scanned = Movie.objects.filter(director__iexact=person.name)
+
+                count = indexed.count()
+                fast = self._best(lambda: list(indexed.values_list('pk', flat=True)), options['repeat'])
+                slow = self._best(lambda: list(scanned.values_list('pk', flat=True)), options['repeat'])
+                self.stdout.write(
+                    f'🔎 {role:<8} {person.name[:30]:<30} {count:6d} movies   '
+                    f'credits {fast * 1000:8.2f} ms   scan {slow * 1000:8.2f} ms   ({slow / fast:.0f}x)'
+                )
+
+    def _best(self, func, repeat: int) -> float:
+        return min(timeit.repeat(func, number=1, repeat=repeat))
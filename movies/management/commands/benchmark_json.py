@@ -0,0 +1,57 @@
+"""
+Management command to compare JSON rendering and parsing speed of DRF's
+stdlib-based classes with the orjson-based ones (figflix/renderers.py),
+on real MovieSerializer payloads from the local catalog.
+"""
+import io
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from figflix.parsers import FastJSONParser
+from figflix.renderers import FastJSONRenderer, orjson
+from movies.models import Movie
+from movies.serializers import MovieCardSerializer, MovieSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark JSON rendering/parsing of movie payloads (stdlib json vs orjson)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000,
+                            help='Movies per payload (default: 1000)')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Timed runs per measurement; the best is reported (default: 20)')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson is not installed (poetry install -E fast-json)')
+
+        movies = list(Movie.objects.prefetch_related('genres')[:options['rows']])
+        if not movies:
+            raise CommandError('No movies in the database to benchmark with')
+
+        for serializer_class in (MovieSerializer, MovieCardSerializer):
+            data = serializer_class(movies, many=True).data
+            body = JSONRenderer().render(data)
+            self.stdout.write(
+                f'🔎 {serializer_class.__name__}: {len(movies)} movies, {len(body) / 1024:.0f} KiB'
+            )
+
+            render = self._best(lambda: JSONRenderer().render(data), options['repeat'])
+            fast_render = self._best(lambda: FastJSONRenderer().render(data), options['repeat'])
+            parse = self._best(lambda: JSONParser().parse(io.BytesIO(body)), options['repeat'])
+            fast_parse = self._best(lambda: FastJSONParser().parse(io.BytesIO(body)), options['repeat'])
+
+            self._report('render', render, fast_render)
+            self._report('parse', parse, fast_parse)
+
+    def _best(self, func, repeat: int) -> float:
+        return min(timeit.repeat(func, number=1, repeat=repeat))
+
+    def _report(self, label: str, stdlib: float, fast: float):
+        self.stdout.write(
+            f'   {label:<7} json {stdlib * 1000:7.2f} ms   orjson {fast * 1000:7.2f} ms   '
+            f'({stdlib / fast:.1f}x)'
+        )
@@ -0,0 +1,57 @@
+"""
+Management command to compare ranked full-text search (movies/search.py)
+with the icontains scan it replaced, on the movie list's first page and
+count, for words sampled from catalog titles.
+"""
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from movies import search
+from movies.models import Movie
+
+PAGE_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full-text search against icontains scans of the catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=10,
+                            help='Title words to search for (default: 10)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per measurement; the best is reported (default: 5)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed for sampling titles (default: 0)')
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError('No full-text index on this database; run migrate and rebuild_search_index')
+        last = Movie.objects.order_by('-pk').values_list('pk', flat=True).first()
+        if last is None:
+            raise CommandError('No movies to benchmark with')
+
+        rng = random.Random(options['seed'])
+        ids = [rng.randint(1, last) for _ in range(options['queries'] * 5)]
+        words = []
+        for title in Movie.objects.filter(pk__in=ids).values_list('title', flat=True):
+            word = max(search._terms(title), key=len, default='')
+            if len(word) >= 3 and word not in words:
+                words.append(word)
+        words = words[:options['queries']]
+
+        self.stdout.write(f'🔎 {len(words)} queries over {Movie.objects.count()} movies, first {PAGE_SIZE} results')
+        for word in words:
+            ranked = search.search(Movie.objects.all(), word)
+            scanned = search._icontains(Movie.objects.all(), word).order_by('-popularity', '-id')
+            count = ranked.count()
+
+            fast = self._best(lambda: (ranked.count(), list(ranked[:PAGE_SIZE])), options['repeat'])
+            slow = self._best(lambda: (scanned.count(), list(scanned[:PAGE_SIZE])), options['repeat'])
+            self.stdout.write(
+                f'   {word[:20]:<20} {count:7d} matches   '
+                f'full-text {fast * 1000:8.2f} ms   icontains {slow * 1000:8.2f} ms   ({slow / fast:.0f}x)'
+            )
+
+    def _best(self, func, repeat: int) -> float:
+        return min(timeit.repeat(func, number=1, repeat=repeat))
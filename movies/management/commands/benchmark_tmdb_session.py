@@ -0,0 +1,71 @@
+"""
+Management command to compare TMDbService's pooled keep-alive session with
+plain requests.get() calls, which open a new connection per request.
+
+Runs against an in-process fake TMDb server (movies/fake_tmdb.py), so no
+API key or network access is needed; --latency adds server-side delay.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from movies.fake_tmdb import FakeTMDb, make_server
+from movies.tmdb_service import TMDbService
+
+
+class Command(BaseCommand):
+    help = 'Benchmark TMDb requests over the pooled session vs. a new connection per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Requests per measurement (default: 500)')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent threads in the parallel measurement (default: 8)')
+        parser.add_argument('--latency', type=float, default=0,
+                            help='Fake server delay per request in milliseconds (default: 0)')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['workers'] < 1:
+            raise CommandError('--requests and --workers must be positive')
+
+        server = make_server(FakeTMDb(latency=options['latency'] / 1000), port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        host, port = server.server_address[:2]
+        base_url = f'http://{host}:{port}/3'
+        self.stdout.write(f'🔎 Fake TMDb on {base_url}, {options["requests"]} requests per run')
+
+        try:
+            pooled = TMDbService()._build_session()
+            urls = [f'{base_url}/movie/{movie_id}' for movie_id in range(1, options['requests'] + 1)]
+
+            for workers in (1, options['workers']):
+                plain = self._run(lambda url: requests.get(url, timeout=5), urls, workers)
+                keep_alive = self._run(lambda url: pooled.get(url, timeout=5), urls, workers)
+                self._report(f'{workers} thread(s)', len(urls), plain, keep_alive)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def _run(self, get, urls, workers: int) -> float:
+        def fetch(url):
+            response = get(url)
+            response.raise_for_status()
+            return response.content
+
+        start = time.perf_counter()
+        if workers == 1:
+            for url in urls:
+                fetch(url)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(fetch, urls))
+        return time.perf_counter() - start
+
+    def _report(self, label: str, count: int, plain: float, pooled: float):
+        self.stdout.write(
+            f'   {label:<12} new connection {plain * 1000:8.1f} ms ({count / plain:6.0f} req/s)   '
+            f'pooled {pooled * 1000:8.1f} ms ({count / pooled:6.0f} req/s)   ({plain / pooled:.1f}x)'
+        )
@@ -0,0 +1,132 @@
+"""
+Management command to verify that hot queries use indexes, by running
+EXPLAIN on each one (see figflix/query_plans.py). Exits with an error when
+a query falls back to a full scan or sorts rows an index should deliver in
+order, so it can gate CI runs against SQLite and PostgreSQL after
+migrations.
+
+Keep CHECKS in step with the queries the views actually run; the ids and
+values used are placeholders, plans do not depend on them. movies/tests.py
+runs every check against the test database.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from figflix.query_plans import PlanCheck, UnsupportedDatabase, explain
+from movies.models import Credit, Movie, Person, WatchHistory
+from recommendations.models import ChatMessage
+from recommendations.recommendation_engine import highly_rated_genre_ids
+from reviews.models import Review
+
+MOVIES = Movie._meta.db_table
+GENRE_LINKS = Movie.genres.through._meta.db_table
+REVIEWS = Review._meta.db_table
+NEWEST = ('-created_at', '-id')
+
+CHECKS = [
+    # Catalog listings (MovieListView, cursor pagination)
+    PlanCheck(
+        'movie list: newest first',
+        lambda: Movie.objects.order_by(*NEWEST)[:20],
+        index_ordered=True,
+    ),
+    PlanCheck(
+        'movie list: one year, newest first',
+        lambda: Movie.objects.filter(release_year=2020).order_by(*NEWEST)[:20],
+        (MOVIES,), index_ordered=True,
+    ),
+    PlanCheck(
+        'movie list: one source, newest first',
+        lambda: Movie.objects.filter(source='admin').order_by(*NEWEST)[:20],
+        (MOVIES,), index_ordered=True,
+    ),
+    PlanCheck(
+        'movie list: top rated by users',
+        lambda: Movie.objects.top_rated_locally()[:20],
+        index_ordered=True,
+    ),
+    PlanCheck(
+        'movie list: one genre',
+        lambda: Movie.objects.with_genres([1]).order_by(*NEWEST)[:20],
+        (GENRE_LINKS,),
+    ),
+    PlanCheck(
+        'movie list: any of several genres',
+        lambda: Movie.objects.with_genres([1, 2, 3]).order_by(*NEWEST)[:20],
+        (GENRE_LINKS,),
+    ),
+    PlanCheck(
+        'movie list: all of several genres',
+        lambda: Movie.objects.with_genres([1, 2], match_all=True).order_by(*NEWEST)[:20],
+        (GENRE_LINKS,),
+    ),
+    PlanCheck(
+        'movie list: genre count',
+        lambda: Movie.objects.with_genres([1, 2], match_all=True).order_by().values('pk'),
+        (GENRE_LINKS,),
+    ),
+    PlanCheck(
+        'movie list: actor',
+        lambda: Movie.objects.credited(['Tom Hanks'], role=Credit.ACTOR).order_by(*NEWEST)[:20],
+        (Person._meta.db_table, Credit._meta.db_table),
+    ),
+
+    # Reviews
+    PlanCheck(
+        'reviews of a movie, newest first',
+        lambda: Review.objects.filter(movie_id=1).order_by(*NEWEST)[:20],
+        (REVIEWS,), index_ordered=True,
+    ),
+    PlanCheck(
+        'reviews by a user, newest first',
+        lambda: Review.objects.filter(user_id=1).order_by(*NEWEST)[:20],
+        (REVIEWS,), index_ordered=True,
+    ),
+    PlanCheck(
+        "recommendations: user's highly rated genres",
+        lambda: highly_rated_genre_ids(1),
+        (REVIEWS, GENRE_LINKS),
+    ),
+
+    # Per-user history
+    PlanCheck(
+        'watch history, most recent first',
+        lambda: WatchHistory.objects.filter(user_id=1).order_by('-watched_at', '-id')[:20],
+        (WatchHistory._meta.db_table,), index_ordered=True,
+    ),
+    PlanCheck(
+        'chat history, oldest first',
+        lambda: ChatMessage.objects.filter(user_id=1).order_by('created_at', 'id')[:50],
+        (ChatMessage._meta.db_table,), index_ordered=True,
+    ),
+
+    # Admin
+    PlanCheck(
+        'user list, newest first',
+        lambda: User.objects.select_related('preferences').order_by('-date_joined', '-id')[:20],
+        index_ordered=True,
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = 'Check with EXPLAIN that hot queries are answered from indexes'
+
+    def handle(self, *args, **options):
+        try:
+            results = [explain(check) for check in CHECKS]
+        except UnsupportedDatabase as e:
+            raise CommandError(str(e))
+
+        for result in results:
+            if result.ok:
+                self.stdout.write(f'✅ {result.check.label}')
+            else:
+                self.stdout.write(f'⚠️  {result.check.label}: {", ".join(result.problems)}')
+            if options['verbosity'] > 1 or not result.ok:
+                for line in result.plan:
+                    self.stdout.write(f'      {line}')
+
+        failed = [r for r in results if not r.ok]
+        if failed:
+            raise CommandError(f'{len(failed)} of {len(results)} queries do not use an index')
+        self.stdout.write(self.style.SUCCESS(f'✅ All {len(results)} queries use indexes'))
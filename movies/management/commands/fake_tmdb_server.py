@@ -0,0 +1,75 @@
+"""
+Management command to run an offline TMDb stand-in for load testing.
+
+    python manage.py fake_tmdb_server --port 8765 --latency 80 --error-rate 0.02
+    TMDB_BASE_URL=http://127.0.0.1:8765 python manage.py runserver
+
+Modes:
+    synthetic  deterministic generated data (default, no network)
+    record     proxy to the real TMDb API and save responses as fixtures
+    replay     serve recorded fixtures (synthetic data for unrecorded requests
+               unless --strict)
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from movies.fake_tmdb import MODES, RECORD, REPLAY, SYNTHETIC, FakeTMDb, make_server
+
+
+class Command(BaseCommand):
+    help = 'Run a fake TMDb API server with record/replay, latency and error injection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--mode', choices=MODES, default=SYNTHETIC)
+        parser.add_argument('--fixtures', default=str(settings.BASE_DIR / 'fixtures' / 'tmdb'),
+                            help='Directory of recorded responses')
+        parser.add_argument('--upstream', default='https://api.themoviedb.org/3',
+                            help='Real TMDb API base URL (record mode)')
+        parser.add_argument('--latency', type=float, default=0,
+                            help='Added delay per request in milliseconds')
+        parser.add_argument('--jitter', type=float, default=0,
+                            help='Random extra delay of up to this many milliseconds')
+        parser.add_argument('--error-rate', type=float, default=0,
+                            help='Fraction of requests answered with --error-status (0-1)')
+        parser.add_argument('--error-status', type=int, default=503, choices=[429, 500, 502, 503, 504],
+                            help='Status code of injected errors')
+        parser.add_argument('--strict', action='store_true',
+                            help='Replay mode: 404 for requests without a fixture')
+        parser.add_argument('--seed', type=int, help='Seed for reproducible jitter and error injection')
+        parser.add_argument('--verbose-requests', action='store_true', help='Log every request')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['error_rate'] <= 1:
+            raise CommandError('--error-rate must be between 0 and 1')
+        if options['mode'] == RECORD and not settings.TMDB_API_KEY:
+            raise CommandError('TMDB_API_KEY is required to record from the real API')
+
+        fake = FakeTMDb(
+            mode=options['mode'],
+            fixtures=options['fixtures'],
+            upstream=options['upstream'],
+            api_key=settings.TMDB_API_KEY,
+            latency=options['latency'] / 1000,
+            jitter=options['jitter'] / 1000,
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            strict=options['strict'],
+            seed=options['seed'],
+        )
+        server = make_server(fake, options['host'], options['port'], options['verbose_requests'])
+        host, port = server.server_address[:2]
+
+        self.stdout.write(f"🎬 Fake TMDb ({options['mode']}) listening on http://{host}:{port}")
+        if options['mode'] in (RECORD, REPLAY):
+            self.stdout.write(f"📁 Fixtures: {options['fixtures']}")
+        self.stdout.write(f'   Set TMDB_BASE_URL=http://{host}:{port} to use it. Ctrl+C to stop.')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            stats = ', '.join(f'{count} {name}' for name, count in fake.stats().items())
+            self.stdout.write(self.style.SUCCESS(f'✅ Stopped ({stats})'))
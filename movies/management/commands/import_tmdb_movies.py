@@ -0,0 +1,46 @@
+"""
+Management command to bulk import TMDb movies by id.
+Ids can be passed as arguments and/or read from a file (one id per line).
+"""
+from collections import Counter
+from django.core.management.base import BaseCommand, CommandError
+from movies.tmdb_import import IMPORTED, bulk_import_movies
+
+
+class Command(BaseCommand):
+    help = 'Import many TMDb movies into the local catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tmdb_ids', nargs='*', type=int, help='TMDb movie ids')
+        parser.add_argument('--file', help='File with one TMDb id per line')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent TMDb requests')
+        parser.add_argument('--chunk-size', type=int, default=200,
+                            help='Ids fetched and written per round')
+        parser.add_argument('--verbose-results', action='store_true',
+                            help='Print the outcome for every id')
+
+    def handle(self, *args, **options):
+        tmdb_ids = list(options['tmdb_ids'])
+        if options['file']:
+            with open(options['file']) as f:
+                tmdb_ids.extend(int(line) for line in f if line.strip())
+        if not tmdb_ids:
+            raise CommandError('No TMDb ids given')
+
+        totals = Counter()
+        chunk_size = options['chunk_size']
+        for start in range(0, len(tmdb_ids), chunk_size):
+            chunk = tmdb_ids[start:start + chunk_size]
+            results = bulk_import_movies(chunk, max_workers=options['workers'])
+            totals.update(r['status'] for r in results)
+
+            if options['verbose_results']:
+                for r in results:
+                    self.stdout.write(f"{r['tmdb_id']}: {r['status']}")
+            self.stdout.write(f'📥 Processed {min(start + chunk_size, len(tmdb_ids))}/{len(tmdb_ids)} ids')
+
+        summary = ', '.join(f'{count} {status}' for status, count in sorted(totals.items()))
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Imported {totals[IMPORTED]} movies ({summary})')
+        )
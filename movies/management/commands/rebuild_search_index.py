@@ -0,0 +1,16 @@
+"""
+Management command to rebuild the movie full-text search index.
+Run after bulk changes that bypass signals (raw SQL, QuerySet.update).
+"""
+from django.core.management.base import BaseCommand, CommandError
+from movies import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the movie full-text search index'
+
+    def handle(self, *args, **options):
+        count = search.rebuild()
+        if count is None:
+            raise CommandError('Full-text search is not available on this database (SQLite/PostgreSQL only)')
+        self.stdout.write(self.style.SUCCESS(f'✅ Indexed {count} movies'))
@@ -0,0 +1,37 @@
+"""
+Management command to recompute Movie.rating_count/rating_sum/rating_avg
+from the reviews table. Signals keep them in sync on normal writes; run this
+after bulk review changes (QuerySet.update, raw SQL, data imports).
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from movies.models import Movie
+from reviews.models import Review
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized movie rating counters from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report movies whose counters have drifted')
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+        drifted = Movie.objects.annotate(
+            actual_count=Coalesce(Subquery(reviews.annotate(c=Count('pk')).values('c')), 0),
+            actual_sum=Coalesce(Subquery(reviews.annotate(s=Sum('rating')).values('s')), 0),
+        ).filter(~Q(rating_count=F('actual_count')) | ~Q(rating_sum=F('actual_sum')))
+        drifted_ids = list(drifted.values_list('pk', flat=True))
+
+        self.stdout.write(f'🔎 {len(drifted_ids)} movies with out-of-date rating counters')
+        if options['dry_run'] or not drifted_ids:
+            return
+
+        updated = 0
+        for start in range(0, len(drifted_ids), BATCH_SIZE):
+            updated += Movie.objects.filter(pk__in=drifted_ids[start:start + BATCH_SIZE]).recompute_ratings()
+        self.stdout.write(self.style.SUCCESS(f'✅ Repaired rating counters of {updated} movies'))
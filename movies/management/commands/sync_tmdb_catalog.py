@@ -0,0 +1,72 @@
+"""
+Management command to mirror TMDb listings into the local catalog.
+Pulls popular, top rated and per-genre discover pages in parallel and
+upserts them into Movie/Genre, keyed on tmdb_id.
+
+Run it on a schedule (e.g. cron every few hours) and set
+TMDB_SERVE_FROM_MIRROR=True to serve the TMDb listing endpoints locally.
+Exits non-zero if any page could not be fetched, so the scheduler notices.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.management.base import BaseCommand, CommandError
+from movies.tmdb_import import upsert_genres, upsert_movie_results
+from movies.tmdb_service import tmdb_service
+
+
+class Command(BaseCommand):
+    help = 'Mirror TMDb popular, top rated and discover pages into the local catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=5,
+                            help='Pages to fetch per popular/top rated list (20 movies per page)')
+        parser.add_argument('--discover-pages', type=int, default=2,
+                            help='Pages to fetch per genre from /discover/movie (0 to skip)')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent TMDb requests')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows per bulk upsert')
+
+    def handle(self, *args, **options):
+        if not tmdb_service.api_key:
+            raise CommandError('TMDB_API_KEY is not configured')
+
+        # Genres first, so movie genre links can be resolved. Pages are
+        # fetched without the local-catalog fallback: mirroring our own rows
+        # back into the catalog would hide an outage.
+        genres_data = tmdb_service._make_request('/genre/movie/list')
+        if genres_data is None:
+            raise CommandError('Could not fetch the genre list from TMDb')
+        tmdb_genres = genres_data.get('genres', [])
+        upsert_genres(tmdb_genres)
+        self.stdout.write(f'🎭 Synced {len(tmdb_genres)} genres')
+
+        jobs = []
+        for page in range(1, options['pages'] + 1):
+            jobs.append(('/movie/popular', {'page': page}))
+            jobs.append(('/movie/top_rated', {'page': page}))
+        for genre in tmdb_genres:
+            for page in range(1, options['discover_pages'] + 1):
+                jobs.append(('/discover/movie', tmdb_service._discover_params([genre['id']], page=page)))
+
+        results = []
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [executor.submit(tmdb_service._make_request, endpoint, params) for endpoint, params in jobs]
+            for future in as_completed(futures):
+                data = future.result()
+                if data is None:
+                    failed += 1
+                    continue
+                results.extend(tmdb_service._format_movie_results(data)['results'])
+
+        self.stdout.write(f'📥 Fetched {len(jobs) - failed} of {len(jobs)} pages')
+
+        count = upsert_movie_results(results, batch_size=options['batch_size'])
+        if failed:
+            raise CommandError(
+                f'{failed} of {len(jobs)} pages could not be fetched from TMDb '
+                f'({count} movies mirrored from the rest)'
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Mirrored {count} TMDb movies into the local catalog')
+        )
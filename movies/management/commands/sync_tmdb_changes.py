@@ -0,0 +1,55 @@
+"""
+Management command to apply TMDb changes to already imported movies.
+Reads /movie/changes since the stored watermark, refreshes only the local
+movies that changed, and advances the watermark when every one was
+refreshed or found missing from TMDb.
+
+Run it on a schedule (e.g. cron hourly) alongside sync_tmdb_catalog.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime, parse_date
+from django.utils import timezone
+from datetime import datetime, time
+from movies.tmdb_import import sync_movie_changes
+from movies.tmdb_service import tmdb_service
+
+
+class Command(BaseCommand):
+    help = 'Refresh local movies changed on TMDb since the last sync'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since',
+                            help='Start date/time (ISO 8601) instead of the stored watermark')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent TMDb requests')
+
+    def handle(self, *args, **options):
+        if not tmdb_service.api_key:
+            raise CommandError('TMDB_API_KEY is not configured')
+
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                day = parse_date(options['since'])
+                if day is None:
+                    raise CommandError(f"Invalid --since value: {options['since']}")
+                since = datetime.combine(day, time.min)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        stats = sync_movie_changes(since=since, max_workers=options['workers'])
+        if stats is None:
+            raise CommandError('Could not read the TMDb change feed; watermark not advanced')
+
+        self.stdout.write(
+            f"🔎 {stats['changed']} movies changed on TMDb since {stats['since']:%Y-%m-%d %H:%M}, "
+            f"{stats['matched']} in the local catalog"
+        )
+        if stats['not_found']:
+            self.stdout.write(f"🗑️ {stats['not_found']} movies are no longer on TMDb; left unchanged")
+        if not stats['watermark_advanced']:
+            self.stdout.write(
+                self.style.WARNING(f"⚠️ {stats['failed']} movies could not be refreshed; watermark not advanced")
+            )
+        self.stdout.write(self.style.SUCCESS(f"✅ Refreshed {stats['updated']} movies"))
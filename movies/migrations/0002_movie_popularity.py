@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='popularity',
+            field=models.FloatField(blank=True, help_text='TMDb popularity score', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-popularity'], name='movie_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-tmdb_rating', '-tmdb_vote_count'], name='movie_tmdb_rating_idx'),
+        ),
+    ]
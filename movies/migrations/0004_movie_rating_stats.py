@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_stats(apps, schema_editor):
+    Movie = apps.get_model('movies', 'Movie')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+    Movie.objects.update(
+        rating_count=Coalesce(Subquery(reviews.annotate(c=Count('pk')).values('c')), 0),
+        rating_sum=Coalesce(Subquery(reviews.annotate(s=Sum('rating')).values('s')), 0),
+    )
+    for movie in Movie.objects.filter(rating_count__gt=0).only('rating_sum', 'rating_count'):
+        movie.rating_avg = movie.rating_sum / movie.rating_count
+        movie.save(update_fields=['rating_avg'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_tmdbsyncstate'),
+        ('reviews', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='rating_avg',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-rating_avg', '-rating_count'], name='movie_rating_avg_idx'),
+        ),
+        migrations.RunPython(backfill_rating_stats, migrations.RunPython.noop),
+    ]
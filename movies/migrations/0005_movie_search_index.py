@@ -0,0 +1,68 @@
+# Full-text search index for movies/search.py
+
+from django.db import migrations
+
+SQLITE_CREATE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS movie_search USING fts5(
+    title, description, director, actors, genres,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+SQLITE_POPULATE = """
+INSERT INTO movie_search (rowid, title, description, director, actors, genres)
+SELECT m.id, m.title, m.description, m.director, m.actors,
+       (SELECT group_concat(g.name, ' ')
+          FROM movies_movie_genres mg JOIN movies_genre g ON g.id = mg.genre_id
+         WHERE mg.movie_id = m.id)
+  FROM movies_movie m
+"""
+
+POSTGRES_CREATE = """
+CREATE TABLE IF NOT EXISTS movie_search (
+    movie_id bigint PRIMARY KEY REFERENCES movies_movie (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+    document tsvector NOT NULL
+);
+CREATE INDEX IF NOT EXISTS movie_search_document_idx ON movie_search USING GIN (document);
+"""
+
+POSTGRES_POPULATE = """
+INSERT INTO movie_search (movie_id, document)
+SELECT m.id,
+       setweight(to_tsvector(%(config)s::regconfig, m.title), 'A') ||
+       setweight(to_tsvector(%(config)s::regconfig, m.description), 'D') ||
+       setweight(to_tsvector(%(config)s::regconfig, m.director || ' ' || m.actors::text), 'B') ||
+       setweight(to_tsvector(%(config)s::regconfig, coalesce(
+           (SELECT string_agg(g.name, ' ')
+              FROM movies_movie_genres mg JOIN movies_genre g ON g.id = mg.genre_id
+             WHERE mg.movie_id = m.id), '')), 'C')
+  FROM movies_movie m
+"""
+
+
+def create_search_index(apps, schema_editor):
+    from django.conf import settings
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(SQLITE_POPULATE)
+    elif vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_CREATE)
+        schema_editor.execute(POSTGRES_POPULATE, {'config': settings.SEARCH_PG_CONFIG})
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE IF EXISTS movie_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0004_movie_rating_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
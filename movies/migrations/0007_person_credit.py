@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Person',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('name_key', models.CharField(editable=False, help_text='Case- and whitespace-insensitive name used for lookups', max_length=255, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Credit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('actor', 'Actor'), ('director', 'Director')], max_length=10)),
+                ('order', models.PositiveSmallIntegerField(default=0, help_text='Billing order within the role')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='credits', to='movies.movie')),
+                ('person', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='credits', to='movies.person')),
+            ],
+            options={
+                'ordering': ['movie', 'role', 'order'],
+                'constraints': [models.UniqueConstraint(fields=('person', 'movie', 'role'), name='credit_person_movie_role_uniq')],
+            },
+        ),
+    ]
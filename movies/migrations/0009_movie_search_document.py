@@ -0,0 +1,58 @@
+# Joinable full-text index for movies/search.py
+#
+# Querysets join movie_search on `rowid` through MovieSearchDocument, so
+# the PostgreSQL key column takes the name of the SQLite FTS5 one. Its
+# documents are rebuilt with actors joined by spaces, the text
+# search.index_movies() writes (0005 indexed the JSON array).
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+POSTGRES_POPULATE = """
+DELETE FROM movie_search;
+INSERT INTO movie_search (rowid, document)
+SELECT m.id,
+       setweight(to_tsvector(%(config)s::regconfig, m.title), 'A') ||
+       setweight(to_tsvector(%(config)s::regconfig, m.description), 'D') ||
+       setweight(to_tsvector(%(config)s::regconfig, m.director || ' ' || coalesce(
+           (SELECT string_agg(a.value, ' ') FROM jsonb_array_elements_text(m.actors) a), '')), 'B') ||
+       setweight(to_tsvector(%(config)s::regconfig, coalesce(
+           (SELECT string_agg(g.name, ' ')
+              FROM movies_movie_genres mg JOIN movies_genre g ON g.id = mg.genre_id
+             WHERE mg.movie_id = m.id), '')), 'C')
+  FROM movies_movie m
+"""
+
+
+def rekey_search_index(apps, schema_editor):
+    from django.conf import settings
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE movie_search RENAME COLUMN movie_id TO rowid')
+        schema_editor.execute(POSTGRES_POPULATE, {'config': settings.SEARCH_PG_CONFIG})
+
+
+def restore_search_key(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE movie_search RENAME COLUMN rowid TO movie_id')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieSearchDocument',
+            fields=[
+                ('movie', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='movies.movie')),
+            ],
+            options={
+                'db_table': 'movie_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(rekey_search_index, restore_search_key),
+    ]
@@ -1,8 +1,16 @@
 """
 Models for movies app - stores both TMDb movies and admin-uploaded movies.
 """
-from django.db import models
+from typing import Iterable, Optional
+
+from django.db import models, transaction
+from django.db.models import (
+    Case, Count, Exists, F, FloatField, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce
 from django.contrib.auth import get_user_model
+from django.utils.text import slugify
+from figflix.conditional import bump
 
 User = get_user_model()
 
@@ -17,10 +25,106 @@ class Genre(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def slug(self):
+        """URL-safe form of the name, accepted by the ?genre= filter."""
+        return slugify(self.name)
+
     class Meta:
         ordering = ['name']
 
 
+class MovieQuerySet(models.QuerySet):
+    """
+    Custom queryset for Movie.
+    """
+
+    def add_ratings(self, count: int, total: int):
+        """
+        Apply a review change to the denormalized rating columns.
+
+        Args:
+            count: change in number of reviews (+1, 0 or -1)
+            total: change in the sum of ratings
+
+        Joins the caller's transaction, if any, so the counters commit or
+        roll back with the review write that changed them.
+        """
+        with transaction.atomic(savepoint=False):
+            self.update(
+                rating_count=F('rating_count') + count,
+                rating_sum=F('rating_sum') + total,
+            )
+            # Separate statement: MySQL evaluates SET clauses left to right
+            self.refresh_rating_avg()
+        bump(Movie)
+
+    def refresh_rating_avg(self):
+        """Derive rating_avg from rating_sum/rating_count."""
+        return self.update(rating_avg=Case(
+            When(rating_count=0, then=Value(None)),
+            default=Cast('rating_sum', FloatField()) / F('rating_count'),
+            output_field=FloatField(),
+        ))
+
+    def recompute_ratings(self) -> int:
+        """
+        Recompute rating columns from the reviews table in one UPDATE.
+
+        Returns:
+            Number of movies updated.
+        """
+        from reviews.models import Review
+
+        reviews = Review.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+        with transaction.atomic():
+            updated = self.update(
+                rating_count=Coalesce(Subquery(reviews.annotate(c=Count('pk')).values('c')), 0),
+                rating_sum=Coalesce(Subquery(reviews.annotate(s=Sum('rating')).values('s')), 0),
+            )
+            self.refresh_rating_avg()
+        bump(Movie)
+        return updated
+
+    def top_rated_locally(self):
+        """Order by user rating, unreviewed movies last (uses movie_rating_avg_idx)."""
+        return self.order_by(F('rating_avg').desc(nulls_last=True), '-rating_count', '-id')
+
+    def with_genres(self, genre_ids: Iterable[int], match_all: bool = False):
+        """
+        Movies in any of the given genre pks, or in every one of them with
+        match_all.
+
+        Each test is an EXISTS on the movie-genre table, answered from its
+        (movie_id, genre_id) unique index. Unlike joining genres, this never
+        repeats a movie, so no DISTINCT is needed.
+        """
+        genre_ids = set(genre_ids)
+        if not genre_ids:
+            return self.none()
+        links = Movie.genres.through.objects.filter(movie_id=OuterRef('pk'))
+        if not match_all:
+            return self.filter(Exists(links.filter(genre_id__in=genre_ids)))
+        queryset = self
+        for genre_id in sorted(genre_ids):
+            queryset = queryset.filter(Exists(links.filter(genre_id=genre_id)))
+        return queryset
+
+    def credited(self, names: Iterable[str], role: Optional[str] = None):
+        """
+        Movies crediting any of the named people (case-insensitive exact
+        names), optionally only in one Credit role.
+
+        Resolved through the person and credit indexes, without reading
+        the actors/director columns.
+        """
+        keys = [Person.name_key_for(name) for name in names]
+        credits = Credit.objects.filter(person__name_key__in=keys)
+        if role:
+            credits = credits.filter(role=role)
+        return self.filter(pk__in=credits.values('movie_id'))
+
+
 class Movie(models.Model):
     """
     Movie model - can be from TMDb API or uploaded by admin.
@@ -40,6 +144,12 @@ class Movie(models.Model):
     tmdb_id = models.IntegerField(unique=True, null=True, blank=True)
     tmdb_rating = models.FloatField(null=True, blank=True)
     tmdb_vote_count = models.IntegerField(null=True, blank=True)
+    popularity = models.FloatField(null=True, blank=True, help_text="TMDb popularity score")
+
+    # User ratings, kept in sync with reviews by reviews.signals
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_avg = models.FloatField(null=True, blank=True, editable=False)
 
     # Media files
     poster = models.ImageField(upload_to='posters/', null=True, blank=True)
@@ -61,16 +171,16 @@ class Movie(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MovieQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.title} ({self.release_year})"
 
     @property
     def average_rating(self):
-        """Calculate average user rating"""
-        from reviews.models import Review
-        reviews = self.reviews.all()
-        if reviews.exists():
-            return reviews.aggregate(models.Avg('rating'))['rating__avg']
+        """Average user rating, falling back to the TMDb rating when unreviewed."""
+        if self.rating_avg is not None:
+            return self.rating_avg
         return self.tmdb_rating or 0.0
 
     @property
@@ -82,6 +192,78 @@ class Movie(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Local TMDb mirror: popular and top-rated listings
+            models.Index(fields=['-popularity'], name='movie_popularity_idx'),
+            models.Index(fields=['-tmdb_rating', '-tmdb_vote_count'], name='movie_tmdb_rating_idx'),
+            # Local "top rated by users" listing
+            models.Index(fields=['-rating_avg', '-rating_count'], name='movie_rating_avg_idx'),
+            # Keyset pagination of the catalog (figflix.pagination)
+            models.Index(fields=['-created_at', '-id'], name='movie_created_idx'),
+            # Catalog filtered by year or source, newest first; the leading
+            # columns also cover the facet counts (movies/facets.py)
+            models.Index(fields=['release_year', '-created_at', '-id'], name='movie_year_created_idx'),
+            models.Index(fields=['source', '-created_at', '-id'], name='movie_source_created_idx'),
+            models.Index(fields=['language'], name='movie_language_idx'),
+            # Latest change, part of the autocomplete refresh signature
+            models.Index(fields=['updated_at'], name='movie_updated_idx'),
+        ]
+
+
+class Person(models.Model):
+    """
+    Cast or crew member, shared by every movie crediting them.
+
+    People are identified by name, like the names stored on Movie.
+    """
+    name = models.CharField(max_length=255)
+    name_key = models.CharField(
+        max_length=255, unique=True, editable=False,
+        help_text="Case- and whitespace-insensitive name used for lookups",
+    )
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def name_key_for(name: str) -> str:
+        return ' '.join(name.split()).casefold()[:255]
+
+    def save(self, *args, **kwargs):
+        self.name_key = self.name_key_for(self.name)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        ordering = ['name']
+
+
+class Credit(models.Model):
+    """
+    A person's role in a movie; the normalized form of Movie.actors and
+    Movie.director, kept in sync by movies/credits.py.
+    """
+    ACTOR = 'actor'
+    DIRECTOR = 'director'
+    ROLE_CHOICES = (
+        (ACTOR, 'Actor'),
+        (DIRECTOR, 'Director'),
+    )
+
+    # Indexed through the leading column of credit_person_movie_role_uniq
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name='credits', db_index=False)
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='credits')
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    order = models.PositiveSmallIntegerField(default=0, help_text="Billing order within the role")
+
+    def __str__(self):
+        return f"{self.person.name} ({self.role}) in {self.movie.title}"
+
+    class Meta:
+        ordering = ['movie', 'role', 'order']
+        constraints = [
+            # Also the (person, movie) index behind the actor/director filters
+            models.UniqueConstraint(fields=['person', 'movie', 'role'], name='credit_person_movie_role_uniq'),
+        ]
 
 
 class WatchHistory(models.Model):
@@ -98,3 +280,40 @@ class WatchHistory(models.Model):
     class Meta:
         ordering = ['-watched_at']
         unique_together = ['user', 'movie']
+        indexes = [
+            models.Index(fields=['user', '-watched_at', '-id'], name='watch_user_watched_idx'),
+        ]
+
+
+class TMDbSyncState(models.Model):
+    """
+    Persisted watermark for incremental TMDb sync jobs.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField(help_text="Changes up to this time have been applied")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.watermark:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        verbose_name = 'TMDb sync state'
+
+
+class MovieSearchDocument(models.Model):
+    """
+    A movie's row in the full-text index (see movies/search.py).
+
+    The table is created by migrations as an FTS5 virtual table (SQLite) or
+    a tsvector table (PostgreSQL) and written with raw SQL; the model only
+    lets querysets join it through `Movie.search_document`. The key is the
+    FTS5 rowid, the only column FTS5 can look up without reading the row.
+    """
+    movie = models.OneToOneField(
+        Movie, on_delete=models.DO_NOTHING, primary_key=True, db_constraint=False,
+        db_column='rowid', related_name='search_document',
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'movie_search'
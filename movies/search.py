@@ -0,0 +1,249 @@
+"""
+Full-text search over the movie catalog.
+
+The index lives in a side table, `movie_search`, created by migrations
+0005/0009: an FTS5 virtual table on SQLite, or a tsvector column with a GIN
+index on PostgreSQL, keyed by movie id in a `rowid` column on both. Each
+row covers title, description, director, actors and genre names of one
+movie. Querysets join it through the unmanaged MovieSearchDocument model
+(Movie.search_document). Ranking uses BM25
+(SQLite) or ts_rank (PostgreSQL), with title matches weighted highest.
+
+The index is kept in sync by signals (see movies/signals.py) and by the
+bulk writers in tmdb_import.py, which bypass signals. Other databases fall
+back to icontains filtering.
+"""
+import re
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField, F, FloatField, Func, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+TABLE = 'movie_search'
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+BATCH_SIZE = 500
+
+# bm25() column weights, in FTS5 column order:
+# title, description, director, actors, genres
+FTS5_WEIGHTS = (10.0, 1.0, 3.0, 3.0, 2.0)
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+_available = None
+
+
+def is_available() -> bool:
+    """True if the database has a full-text index (checked once per process)."""
+    global _available
+    if _available is None:
+        _available = (
+            connection.vendor in SUPPORTED_VENDORS
+            and TABLE in connection.introspection.table_names()
+        )
+    return _available
+
+
+def _terms(query: str) -> List[str]:
+    return WORD_RE.findall(query.lower())
+
+
+def _fts5_query(terms: List[str]) -> str:
+    """All terms must match; the last one as a prefix (search-as-you-type)."""
+    quoted = [f'"{t}"' for t in terms]
+    if len(terms[-1]) >= settings.SEARCH_MIN_PREFIX_LENGTH:
+        quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _tsquery(terms: List[str]) -> str:
+    if len(terms[-1]) >= settings.SEARCH_MIN_PREFIX_LENGTH:
+        terms = terms[:-1] + [f'{terms[-1]}:*']
+    return ' & '.join(terms)
+
+
+def _icontains(queryset: QuerySet, query: str) -> QuerySet:
+    return queryset.filter(
+        Q(title__icontains=query) |
+        Q(description__icontains=query) |
+        Q(director__icontains=query)
+    )
+
+
+class _IndexExpression(Func):
+    """
+    An expression over the index row joined through Movie.search_document,
+    compiled against the alias of that join.
+    """
+
+    def __init__(self, terms: List[str]):
+        super().__init__(F('search_document'))
+        self.terms = terms
+
+    def _table(self, compiler) -> str:
+        return compiler.quote_name_unless_alias(self.source_expressions[0].alias)
+
+
+class Match(_IndexExpression):
+    """Whether the movie's index row matches all terms."""
+    output_field = BooleanField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # FTS5 matches against the hidden column named after the table
+        return f'{self._table(compiler)}.{TABLE} MATCH %s', [_fts5_query(self.terms)]
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return (
+            f'{self._table(compiler)}.document @@ to_tsquery(%s::regconfig, %s)',
+            [settings.SEARCH_PG_CONFIG, _tsquery(self.terms)],
+        )
+
+
+class Rank(_IndexExpression):
+    """Relevance of a Match on the same terms; higher is better."""
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        weights = ', '.join(str(w) for w in FTS5_WEIGHTS)
+        # bm25() is lower for better matches
+        return f'-bm25({self._table(compiler)}.{TABLE}, {weights})', []
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return (
+            f'ts_rank({self._table(compiler)}.document, to_tsquery(%s::regconfig, %s))',
+            [settings.SEARCH_PG_CONFIG, _tsquery(self.terms)],
+        )
+
+
+def search(queryset: QuerySet, query: str, order_by_rank: bool = True) -> QuerySet:
+    """
+    Filter a Movie queryset to full-text matches of `query`.
+
+    Adds a `search_rank` annotation (higher is better) and orders by it
+    unless `order_by_rank` is False.
+    """
+    terms = _terms(query)
+    if not terms:
+        return queryset.none()
+    if not is_available():
+        return _icontains(queryset, query)
+
+    # Joins the index once (an inner join, so the planner can start from
+    # the match); ranking in a correlated subquery would re-run the match
+    # for every candidate row
+    queryset = (
+        queryset.filter(search_document__isnull=False)
+        .filter(Match(terms))
+        .annotate(search_rank=Rank(terms))
+    )
+    if order_by_rank:
+        queryset = queryset.order_by('-search_rank', '-id')
+    return queryset
+
+
+def matching(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Filter a Movie queryset to full-text matches of `query`, unranked.
+
+    Matches through an `id IN (...)` subquery instead of search()'s join,
+    so the result can itself be used as a subquery (e.g. pk__in=...).
+    """
+    terms = _terms(query)
+    if not terms:
+        return queryset.none()
+    if not is_available():
+        return _icontains(queryset, query)
+
+    if connection.vendor == 'sqlite':
+        matches = RawSQL(f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s', [_fts5_query(terms)])
+    else:
+        matches = RawSQL(
+            f'SELECT rowid FROM {TABLE} WHERE document @@ to_tsquery(%s::regconfig, %s)',
+            [settings.SEARCH_PG_CONFIG, _tsquery(terms)],
+        )
+    return queryset.filter(pk__in=matches)
+
+
+def _documents(movie_ids: List[int]):
+    """Yield (id, title, description, director, actors, genres) per movie."""
+    from .genre_registry import genre_registry
+    from .models import Movie
+
+    # One registry snapshot per batch, not one lookup per genre link
+    genre_names = {entry.id: entry.name for entry in genre_registry.all()}
+    genres = {}
+    through = Movie.genres.through
+    for movie_id, genre_id in through.objects.filter(movie_id__in=movie_ids).values_list('movie_id', 'genre_id'):
+        if genre_id in genre_names:
+            genres.setdefault(movie_id, []).append(genre_names[genre_id])
+
+    rows = Movie.objects.filter(pk__in=movie_ids).values_list('id', 'title', 'description', 'director', 'actors')
+    for movie_id, title, description, director, actors in rows:
+        yield (
+            movie_id, title, description, director,
+            ' '.join(actors or []), ' '.join(genres.get(movie_id, [])),
+        )
+
+
+def index_movies(movie_ids: Iterable[int]):
+    """(Re)index the given movies; ids of deleted movies are removed."""
+    if not is_available():
+        return
+    movie_ids = list(movie_ids)
+    for start in range(0, len(movie_ids), BATCH_SIZE):
+        batch = movie_ids[start:start + BATCH_SIZE]
+        docs = list(_documents(batch))
+        placeholders = ', '.join(['%s'] * len(batch))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid IN ({placeholders})', batch)
+            if connection.vendor == 'sqlite':
+                cursor.executemany(
+                    f'INSERT INTO {TABLE} (rowid, title, description, director, actors, genres) '
+                    f'VALUES (%s, %s, %s, %s, %s, %s)',
+                    docs,
+                )
+            else:
+                cursor.executemany(
+                    f'INSERT INTO {TABLE} (rowid, document) VALUES (%s, '
+                    f"setweight(to_tsvector(%s::regconfig, %s::text), 'A') || "
+                    f"setweight(to_tsvector(%s::regconfig, %s::text), 'D') || "
+                    f"setweight(to_tsvector(%s::regconfig, %s::text || ' ' || %s::text), 'B') || "
+                    f"setweight(to_tsvector(%s::regconfig, %s::text), 'C'))",
+                    [
+                        (movie_id, cfg, title, cfg, description, cfg, director, actors, cfg, genres)
+                        for movie_id, title, description, director, actors, genres in docs
+                        for cfg in [settings.SEARCH_PG_CONFIG]
+                    ],
+                )
+
+
+def remove_movies(movie_ids: Iterable[int]):
+    if not is_available():
+        return
+    movie_ids = list(movie_ids)
+    for start in range(0, len(movie_ids), BATCH_SIZE):
+        batch = movie_ids[start:start + BATCH_SIZE]
+        placeholders = ', '.join(['%s'] * len(batch))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid IN ({placeholders})', batch)
+
+
+def rebuild(batch_size: int = 5000) -> Optional[int]:
+    """
+    Reindex the whole catalog.
+
+    Returns:
+        Number of movies indexed, or None if full-text search is unavailable.
+    """
+    from .models import Movie
+
+    if not is_available():
+        return None
+    ids = list(Movie.objects.order_by('pk').values_list('pk', flat=True))
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE}')
+        for start in range(0, len(ids), batch_size):
+            index_movies(ids[start:start + batch_size])
+    return len(ids)
@@ -1,33 +1,169 @@
 """
 Serializers for movies app.
 """
+from urllib.parse import urlencode
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
+from .image_proxy import movie_image_source, source_version
 from .models import Movie, Genre, WatchHistory
 
 
+class ImageVariantField(serializers.Field):
+    """
+    URL of a resized poster/backdrop variant served by movie_image_view.
+
+    Emits the list-size variant when the movie is serialized as part of a
+    list and the detail-size variant otherwise (see IMAGE_PROXY_VARIANTS).
+    Pass context={'image_variant': 'list' | 'detail'} to override.
+    """
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def _variant(self):
+        if 'image_variant' in self.context:
+            return self.context['image_variant']
+        parent = self.parent
+        while parent is not None:
+            if isinstance(parent, serializers.ListSerializer):
+                return 'list'
+            parent = parent.parent
+        return 'detail'
+
+    def to_representation(self, movie):
+        resolved = movie_image_source(movie, self.kind)
+        if resolved is None:
+            # Not proxyable: fall back to the stored URL
+            return movie.poster_url if self.kind == 'poster' else movie.backdrop_url
+
+        width = settings.IMAGE_PROXY_VARIANTS[self.kind][self._variant()]
+        url = reverse('api_movie_image', args=[movie.pk, self.kind])
+        url = f"{url}?{urlencode({'w': width, 'v': source_version(resolved[0])})}"
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class SparseFieldsetMixin:
+    """
+    Lets clients choose fields with ?fields=id,title or drop them with
+    ?omit=description. Only the top-level serializer of a response (or the
+    child of a top-level list) is trimmed; nested serializers keep their shape.
+
+    `field_columns` maps serializer fields that are not plain model fields to
+    the model columns they read, so views can fetch just those columns with
+    restrict_queryset().
+    """
+    field_columns = {}
+
+    @classmethod
+    def requested_fields(cls, request):
+        names = list(cls.Meta.fields)
+        if request is None:
+            return names
+        requested = request.query_params.get('fields')
+        if requested:
+            wanted = {name.strip() for name in requested.split(',')}
+            names = [name for name in names if name in wanted or name == 'id']
+        omitted = request.query_params.get('omit')
+        if omitted:
+            unwanted = {name.strip() for name in omitted.split(',')}
+            names = [name for name in names if name not in unwanted or name == 'id']
+        return names
+
+    @classmethod
+    def model_columns(cls, names):
+        model = cls.Meta.model
+        concrete = {f.name for f in model._meta.concrete_fields}
+        columns = {'id'}
+        for name in names:
+            if name in cls.field_columns:
+                columns.update(cls.field_columns[name])
+            elif name in concrete:
+                columns.add(name)
+        return columns
+
+    @classmethod
+    def restrict_queryset(cls, queryset, names, extra_columns=()):
+        """Defer the columns and skip the prefetches `names` do not need."""
+        many_to_many = {f.name for f in cls.Meta.model._meta.many_to_many}
+        queryset = queryset.only(*cls.model_columns(names), *extra_columns)
+        prefetch = [name for name in names if name in many_to_many]
+        return queryset.prefetch_related(*prefetch) if prefetch else queryset
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root():
+            return fields
+        names = set(self.requested_fields(self.context.get('request')))
+        return {name: field for name, field in fields.items() if name in names}
+
+
+# Model columns read by the computed movie fields
+MOVIE_FIELD_COLUMNS = {
+    'average_rating': ('rating_avg', 'tmdb_rating'),
+    'poster_image_url': ('poster', 'poster_url'),
+    'poster_variant_url': ('poster', 'poster_url'),
+    'backdrop_variant_url': ('backdrop_url',),
+}
+
+
 class GenreSerializer(serializers.ModelSerializer):
     """Serializer for genres"""
     class Meta:
         model = Genre
-        fields = ['id', 'name', 'tmdb_id']
+        fields = ['id', 'name', 'slug', 'tmdb_id']
 
 
-class MovieSerializer(serializers.ModelSerializer):
+class MovieSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for movies"""
     genres = GenreSerializer(many=True, read_only=True)
     average_rating = serializers.ReadOnlyField()
     poster_image_url = serializers.ReadOnlyField()
+    poster_variant_url = ImageVariantField('poster')
+    backdrop_variant_url = ImageVariantField('backdrop')
 
     class Meta:
         model = Movie
         fields = [
             'id', 'title', 'description', 'release_year', 'runtime',
-            'poster_image_url', 'poster_url', 'backdrop_url', 'trailer_url',
+            'poster_image_url', 'poster_variant_url', 'backdrop_variant_url',
+            'poster_url', 'backdrop_url', 'trailer_url',
             'genres', 'actors', 'director', 'language',
-            'tmdb_id', 'tmdb_rating', 'tmdb_vote_count', 'average_rating',
+            'tmdb_id', 'tmdb_rating', 'tmdb_vote_count', 'average_rating', 'rating_count',
             'source', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'source', 'average_rating']
+        read_only_fields = ['created_at', 'updated_at', 'source', 'average_rating', 'rating_count']
+
+    field_columns = MOVIE_FIELD_COLUMNS
+
+
+class MovieCardSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Compact movie shape for grids and other list contexts"""
+    genres = GenreSerializer(many=True, read_only=True)
+    average_rating = serializers.ReadOnlyField()
+    poster_image_url = serializers.ReadOnlyField()
+    poster_variant_url = ImageVariantField('poster')
+
+    class Meta:
+        model = Movie
+        fields = [
+            'id', 'title', 'release_year', 'runtime',
+            'poster_image_url', 'poster_variant_url',
+            'genres', 'average_rating', 'rating_count',
+        ]
+        read_only_fields = fields
+
+    field_columns = MOVIE_FIELD_COLUMNS
 
 
 class MovieCreateSerializer(serializers.ModelSerializer):
@@ -66,3 +202,8 @@ class WatchHistorySerializer(serializers.ModelSerializer):
         model = WatchHistory
         fields = ['id', 'movie', 'movie_id', 'watched_at']
         read_only_fields = ['watched_at']
+
+
+class WatchHistoryCardSerializer(WatchHistorySerializer):
+    """Watch history with compact movie cards (?view=card)"""
+    movie = MovieCardSerializer(read_only=True)
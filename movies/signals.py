@@ -0,0 +1,110 @@
+"""
+Signal handlers for the movies app, connected in MoviesConfig.ready().
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from figflix.conditional import bump
+from . import credits, search
+from .autocomplete import ROW_FIELDS as AUTOCOMPLETE_FIELDS, movie_autocomplete
+from .genre_registry import genre_registry
+from .models import Genre, Movie
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genre_registry(sender, **kwargs):
+    genre_registry.invalidate()
+
+
+# Table versions for conditional GET (figflix/conditional.py). Movie
+# responses embed genre names, so genre writes bump both tables.
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def bump_movie_version(sender, **kwargs):
+    bump(Movie)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def bump_genre_version(sender, **kwargs):
+    bump(Genre, Movie)
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+def bump_movie_genres_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump(Movie)
+
+
+# Full-text index. Bulk writers (tmdb_import) call search.index_movies()
+# themselves; `manage.py rebuild_search_index` repairs anything else.
+
+@receiver(post_save, sender=Movie)
+def index_movie(sender, instance, **kwargs):
+    search.index_movies([instance.pk])
+
+
+@receiver(post_delete, sender=Movie)
+def unindex_movie(sender, instance, **kwargs):
+    search.remove_movies([instance.pk])
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+def reindex_movie_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            search.index_movies([instance.pk])
+        return
+
+    # genre.movies.add(...) and friends: instance is the Genre
+    if action == 'pre_clear':
+        instance._search_movie_ids = list(instance.movies.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        search.index_movies(pk_set)
+    elif action == 'post_clear':
+        search.index_movies(getattr(instance, '_search_movie_ids', []))
+
+
+@receiver(pre_delete, sender=Genre)
+def remember_genre_movies(sender, instance, **kwargs):
+    instance._search_movie_ids = list(instance.movies.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def reindex_genre_movies(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    movie_ids = getattr(instance, '_search_movie_ids', None)
+    if movie_ids is None:
+        movie_ids = instance.movies.values_list('pk', flat=True)
+    search.index_movies(movie_ids)
+
+
+# Autocomplete index of this process. Bulk writers (tmdb_import) call
+# movie_autocomplete.movies_changed() themselves.
+
+@receiver(post_save, sender=Movie)
+def update_autocomplete(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(AUTOCOMPLETE_FIELDS) & set(update_fields):
+        return
+    movie_autocomplete.movies_changed([instance.pk])
+
+
+@receiver(post_delete, sender=Movie)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    movie_autocomplete.movies_removed([instance.pk])
+
+
+# Person/Credit rows. Bulk writers (tmdb_import) call
+# credits.set_movie_credits() themselves; `manage.py backfill_credits`
+# rebuilds them for everything else.
+
+@receiver(post_save, sender=Movie)
+def sync_credits(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not {'actors', 'director'} & set(update_fields):
+        return
+    if created and not instance.actors and not instance.director:
+        return
+    credits.set_movie_credits({instance.pk: credits.movie_people(instance.director, instance.actors)})
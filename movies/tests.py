@@ -0,0 +1,1133 @@
+import base64
+import json
+import shutil
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+import httpx
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from urllib3 import HTTPResponse
+
+from accounts.models import User
+from figflix.checks import check_shared_cache_features
+from figflix.query_plans import PlanCheck, UnsupportedDatabase, explain
+from figflix.response_cache import response_cache
+from recommendations.models import ChatMessage
+from reviews.models import Review
+from . import autocomplete, image_proxy, search
+from .async_tmdb_service import AsyncTMDbService
+from .fake_tmdb import GENRES, FakeTMDb, SyntheticTMDb, make_server
+from .genre_registry import GenreRegistry, genre_registry
+from .management.commands.check_query_plans import CHECKS
+from .models import Credit, Genre, Movie, Person, TMDbSyncState, WatchHistory
+from .serializers import MovieCardSerializer
+from .tmdb_cache import SingleFlight
+from .tmdb_import import (
+    ALREADY_IMPORTED, CHANGES_WATERMARK, FAILED, IMPORTED, NOT_FOUND, bulk_import_movies, refresh_movies,
+    sync_movie_changes, upsert_genres, upsert_movie_results,
+)
+from .tmdb_service import TMDbNotFound, TMDbService, tmdb_service
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Concurrent callers of one key share a single upstream call."""
+
+    THREADS = 16
+
+    def setUp(self):
+        cache.clear()
+        self.flight = SingleFlight(lock_timeout=5, wait_timeout=2, poll_interval=0.01)
+
+    def _wait_for(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail('timed out waiting for threads')
+            time.sleep(0.005)
+
+    def _run_concurrently(self, fn, lookup=lambda: None, key='tmdb:/movie/1'):
+        """Start a leader, then THREADS - 1 followers while it is still in flight."""
+        results, errors = [], []
+
+        def call():
+            try:
+                results.append(self.flight.do(key, fn, lookup))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(self.THREADS)]
+        threads[0].start()
+        self._wait_for(lambda: self.started.is_set())
+        for thread in threads[1:]:
+            thread.start()
+        self._wait_for(lambda: self.flight.stats()['coalesced_local'] == self.THREADS - 1)
+        self.release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        return results, errors
+
+    def _blocking_fetcher(self, result=None, error=None):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.upstream_calls = 0
+
+        def fetch():
+            self.upstream_calls += 1
+            self.started.set()
+            self.release.wait(timeout=5)
+            if error is not None:
+                raise error
+            return result
+
+        return fetch
+
+    def test_concurrent_callers_share_one_fetch(self):
+        payload = {'id': 1, 'title': 'Movie 1'}
+        results, errors = self._run_concurrently(self._blocking_fetcher(result=payload))
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.upstream_calls, 1)
+        self.assertEqual(len(results), self.THREADS)
+        self.assertTrue(all(result is payload for result in results))
+        self.assertEqual(self.flight.stats(), {
+            'leader_calls': 1, 'coalesced_local': self.THREADS - 1, 'coalesced_shared': 0,
+        })
+        # The in-flight call and the cross-process lock are released
+        self.assertEqual(self.flight._calls, {})
+        self.assertIsNone(cache.get('tmdb:/movie/1:lock'))
+
+    def test_leader_error_reaches_every_caller(self):
+        results, errors = self._run_concurrently(self._blocking_fetcher(error=ValueError('boom')))
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), self.THREADS)
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+        self.assertEqual(self.upstream_calls, 1)
+        self.assertIsNone(cache.get('tmdb:/movie/1:lock'))
+
+    def test_waits_for_another_process_holding_the_lock(self):
+        key = 'tmdb:/movie/2'
+        cache.add(f'{key}:lock', 'other-worker', timeout=5)
+        stored = {}
+        # The other worker stores its result shortly after we start waiting
+        threading.Timer(0.05, lambda: stored.update(payload={'id': 2})).start()
+
+        def fetch():
+            self.fail('fetched despite another worker holding the lock')
+
+        result = self.flight.do(key, fetch, lambda: stored.get('payload'))
+
+        self.assertEqual(result, {'id': 2})
+        self.assertEqual(self.flight.stats(), {'leader_calls': 0, 'coalesced_local': 0, 'coalesced_shared': 1})
+
+    def test_fetches_itself_when_the_lock_holder_never_finishes(self):
+        key = 'tmdb:/movie/3'
+        cache.add(f'{key}:lock', 'stuck-worker', timeout=5)
+        flight = SingleFlight(lock_timeout=5, wait_timeout=0.05, poll_interval=0.01)
+
+        result = flight.do(key, lambda: {'id': 3}, lambda: None)
+
+        self.assertEqual(result, {'id': 3})
+        self.assertEqual(flight.stats(), {'leader_calls': 1, 'coalesced_local': 0, 'coalesced_shared': 0})
+        # Someone else's lock is left alone
+        self.assertEqual(cache.get(f'{key}:lock'), 'stuck-worker')
+
+
+class TMDbCacheTests(SimpleTestCase):
+    """Fresh hits skip TMDb, stale ones refresh once, and outages serve the last good copy."""
+
+    ENDPOINT = '/movie/popular'
+
+    def setUp(self):
+        cache.clear()
+        self.service = TMDbService()
+        self.ttl = self.service.cache.get_ttl(self.ENDPOINT)
+        self.service.cache.set(self.service.cache.make_key(self.ENDPOINT, {'page': 1}), self.ENDPOINT, {'page': 'old'})
+
+    def _later(self, seconds):
+        """Move the clock (including cache expiry) `seconds` ahead."""
+        return mock.patch('time.time', return_value=time.time() + seconds)
+
+    def _request(self):
+        return self.service._make_request(self.ENDPOINT, {'page': 1})
+
+    def test_fresh_hit_skips_upstream(self):
+        with mock.patch.object(self.service, '_fetch') as fetch:
+            self.assertEqual(self._request(), {'page': 'old'})
+
+        fetch.assert_not_called()
+        self.assertEqual(self.service.cache_stats()['local_hits'], 1)
+
+    def test_stale_hit_is_served_while_one_refresh_runs(self):
+        release = threading.Event()
+
+        def fetch(endpoint, params=None):
+            release.wait(timeout=5)
+            return {'page': 'new'}
+
+        with self._later(self.ttl + 1), mock.patch.object(self.service, '_fetch', side_effect=fetch) as upstream:
+            self.assertEqual([self._request() for _ in range(3)], [{'page': 'old'}] * 3)
+            release.set()
+            self.service._refresh_executor.shutdown(wait=True)
+
+            upstream.assert_called_once()
+            self.assertEqual(self._request(), {'page': 'new'})
+        self.assertEqual(self.service.cache_stats()['stale_hits'], 3)
+
+    def test_entries_expire_after_the_stale_window(self):
+        with self._later(self.ttl + self.service.cache.stale_ttl + 1), \
+                mock.patch.object(self.service, '_fetch', return_value={'page': 'new'}) as fetch:
+            self.assertEqual(self._request(), {'page': 'new'})
+
+        fetch.assert_called_once()
+        self.assertEqual(self.service.cache_stats()['misses'], 1)
+
+    def test_outage_serves_the_last_good_copy(self):
+        with self._later(self.ttl + self.service.cache.stale_ttl + 1), \
+                mock.patch.object(self.service, '_fetch', return_value=None):
+            self.assertEqual(self._request(), {'page': 'old'})
+
+        self.assertEqual(self.service.resilience_stats()['degraded']['last_good_served'], 1)
+
+
+class RecordingTMDb(FakeTMDb):
+    """Fake TMDb that remembers the path of every request it answers."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.paths = []
+
+    def handle(self, path, params):
+        self.paths.append(path)
+        return super().handle(path, params)
+
+
+class FakeTMDbMixin:
+    """Points a TMDb service at a fake TMDb server for one test."""
+
+    def serve_fake_tmdb(self, service, fake=None):
+        self.fake = fake or RecordingTMDb()
+        server = make_server(self.fake, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        host, port = server.server_address[:2]
+        for target, name, value in (
+            (service, 'base_url', f'http://{host}:{port}/3'),
+            (service, 'api_key', 'test'),
+            (service, 'cache_enabled', False),
+            (service.rate_limiter, 'rate', 0),
+        ):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return self.fake
+
+
+class MovieBundleTests(FakeTMDbMixin, SimpleTestCase):
+    """Details, trailers and credits come back in one request when TMDb appends them."""
+
+    def setUp(self):
+        self.service = TMDbService()
+        self.serve_fake_tmdb(self.service)
+
+    def test_one_request_for_the_bundle(self):
+        bundle = self.service.get_movie_bundle(7)
+
+        self.assertEqual(self.fake.paths, ['/movie/7'])
+        self.assertEqual(self.fake.stats()['requests'], 1)
+        self.assertEqual(bundle['details']['director'], 'Director 7')
+        self.assertEqual(bundle['details']['trailer_url'], 'https://www.youtube.com/watch?v=trailer7')
+        self.assertEqual(len(bundle['details']['actors']), 10)
+
+    def test_missing_parts_are_fetched_separately(self):
+        # TMDb ignoring append_to_response
+        synthetic = SyntheticTMDb()
+        with mock.patch.object(self.fake.synthetic, 'movie_detail',
+                               lambda movie_id, append='': synthetic.movie_detail(movie_id)):
+            bundle = self.service.get_movie_bundle(7)
+
+        self.assertEqual(self.fake.paths[0], '/movie/7')
+        self.assertCountEqual(self.fake.paths[1:], ['/movie/7/videos', '/movie/7/credits'])
+        self.assertEqual(bundle, self.service.get_movie_bundle(7))
+
+    def test_only_the_missing_part_is_fetched(self):
+        synthetic = SyntheticTMDb()
+        with mock.patch.object(self.fake.synthetic, 'movie_detail',
+                               lambda movie_id, append='': synthetic.movie_detail(movie_id, 'videos')):
+            bundle = self.service.get_movie_bundle(7)
+
+        self.assertEqual(self.fake.paths, ['/movie/7', '/movie/7/credits'])
+        self.assertEqual(bundle['details']['director'], 'Director 7')
+
+
+@override_settings(TMDB_BACKOFF_FACTOR=0.5, TMDB_BACKOFF_MAX=10)
+class RetryDelayTests(SimpleTestCase):
+    """Retry-After is honoured, but never for longer than TMDB_BACKOFF_MAX."""
+
+    def test_sync_retry_after_is_capped(self):
+        retry = TMDbService()._build_session().get_adapter('https://').max_retries
+
+        self.assertEqual(retry.get_retry_after(HTTPResponse(headers={'Retry-After': '3'})), 3)
+        self.assertEqual(retry.get_retry_after(HTTPResponse(headers={'Retry-After': '3600'})), 10)
+        self.assertIsNone(retry.get_retry_after(HTTPResponse()))
+
+    def test_async_retry_after_is_capped(self):
+        service = AsyncTMDbService()
+
+        self.assertEqual(service._retry_delay(0, httpx.Response(429, headers={'Retry-After': '3'})), 3)
+        self.assertEqual(service._retry_delay(0, httpx.Response(429, headers={'Retry-After': '3600'})), 10)
+        self.assertLessEqual(service._retry_delay(0, httpx.Response(429, headers={'Retry-After': 'soon'})), 0.5)
+        self.assertLessEqual(service._retry_delay(20), 10)
+
+
+class LocalFallbackTests(TestCase):
+    """The local catalog stands in for TMDb only when a caller asks for it."""
+
+    def setUp(self):
+        cache.clear()
+        self.service = TMDbService()
+        Movie.objects.create(title='Local Movie', tmdb_id=550, popularity=10, source='tmdb')
+
+    def test_outage_returns_nothing_without_fallback(self):
+        with mock.patch.object(self.service, '_fetch', return_value=None):
+            self.assertEqual(self.service.get_popular_movies(1)['results'], [])
+            self.assertIsNone(self.service.get_movie_bundle(550))
+            self.assertEqual(self.service.get_genres(), [])
+        self.assertEqual(self.service.resilience_stats()['degraded']['local_fallbacks'], 0)
+
+    def test_outage_serves_local_catalog_with_fallback(self):
+        with mock.patch.object(self.service, '_fetch', return_value=None):
+            popular = self.service.get_popular_movies(1, fallback=True)
+            bundle = self.service.get_movie_bundle(550, fallback=True)
+
+        self.assertEqual([movie['tmdb_id'] for movie in popular['results']], [550])
+        self.assertEqual(bundle['details']['title'], 'Local Movie')
+        self.assertEqual(self.service.resilience_stats()['degraded']['local_fallbacks'], 2)
+
+
+class MovieChangeSyncTests(TestCase):
+    """Movies gone from TMDb are reported apart from fetch failures."""
+
+    def setUp(self):
+        cache.clear()
+        for tmdb_id in (1, 2):
+            Movie.objects.create(title=f'Old {tmdb_id}', tmdb_id=tmdb_id, source='tmdb')
+        self.changes = mock.patch.object(
+            tmdb_service, 'get_movie_changes', return_value={'ids': [1, 2, 3], 'page': 1, 'total_pages': 1}
+        )
+        self.changes.start()
+        self.addCleanup(self.changes.stop)
+
+    def _sync(self, responses):
+        def fetch(endpoint, params=None):
+            response = responses[endpoint]
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        with mock.patch.object(tmdb_service, '_fetch', side_effect=fetch):
+            return sync_movie_changes()
+
+    def test_not_found_movies_do_not_hold_back_the_watermark(self):
+        stats = self._sync({
+            '/movie/1': TMDbNotFound('/movie/1'),
+            '/movie/2': SyntheticTMDb().movie_detail(2, 'videos,credits'),
+        })
+
+        self.assertEqual((stats['matched'], stats['updated'], stats['not_found'], stats['failed']), (2, 1, 1, 0))
+        self.assertTrue(stats['watermark_advanced'])
+        self.assertEqual(TMDbSyncState.objects.get(name=CHANGES_WATERMARK).watermark, stats['until'])
+        self.assertEqual(Movie.objects.get(tmdb_id=1).title, 'Old 1')
+        self.assertEqual(Movie.objects.get(tmdb_id=2).title, 'Movie 2')
+
+    def test_unreachable_movies_keep_the_watermark(self):
+        stats = self._sync({
+            '/movie/1': TMDbNotFound('/movie/1'),
+            '/movie/2': None,
+        })
+
+        self.assertEqual((stats['updated'], stats['not_found'], stats['failed']), (0, 1, 1))
+        self.assertFalse(stats['watermark_advanced'])
+        self.assertFalse(TMDbSyncState.objects.filter(name=CHANGES_WATERMARK).exists())
+
+    def test_uncached_fetch_ignores_copies_stored_while_waiting(self):
+        service = TMDbService()
+        key = service.cache.make_key('/movie/2', None)
+        service.cache.set(key, '/movie/2', {'id': 2, 'title': 'Cached'})
+        # Another worker holds the fetch lock, then releases it
+        cache.add(f'{key}:lock', 'other-worker', timeout=5)
+        threading.Timer(0.1, lambda: cache.delete(f'{key}:lock')).start()
+
+        with mock.patch.object(service, '_fetch', return_value={'id': 2, 'title': 'Fresh'}) as fetch:
+            data = service._make_request('/movie/2', use_cache=False)
+
+        self.assertEqual(data['title'], 'Fresh')
+        fetch.assert_called_once()
+
+
+class FailingTMDb(RecordingTMDb):
+    """Fake TMDb that does not know `missing` movie ids and fails on `failing` ones."""
+
+    def __init__(self, missing=(), failing=(), **kwargs):
+        super().__init__(**kwargs)
+        self.missing = {f'/movie/{i}' for i in missing}
+        self.failing = {f'/movie/{i}' for i in failing}
+
+    def handle(self, path, params):
+        if path in self.missing:
+            self.paths.append(path)
+            return 404, {'status_code': 34, 'status_message': 'Not found', 'success': False}, {}
+        if path in self.failing:
+            self.paths.append(path)
+            return 503, {'status_code': 11, 'status_message': 'Unavailable', 'success': False}, {}
+        return super().handle(path, params)
+
+
+@override_settings(TMDB_MAX_RETRIES=0)
+class BulkImportTests(FakeTMDbMixin, TestCase):
+    """Bulk imports and refreshes report an outcome per TMDb id."""
+
+    def setUp(self):
+        cache.clear()
+        self.service = TMDbService()
+        self.serve_fake_tmdb(self.service, FailingTMDb(missing=[3], failing=[4]))
+        patcher = mock.patch('movies.tmdb_service.tmdb_service', self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        upsert_genres({'id': g, 'name': n} for g, n in GENRES)
+
+    def test_import_outcomes(self):
+        existing = Movie.objects.create(title='Old 1', tmdb_id=1, source='tmdb')
+
+        results = bulk_import_movies([1, 2, 3, 4, 2])
+
+        self.assertEqual(
+            [(r['tmdb_id'], r['status']) for r in results],
+            [(1, ALREADY_IMPORTED), (2, IMPORTED), (3, NOT_FOUND), (4, FAILED)],
+        )
+        self.assertEqual(results[0]['movie_id'], existing.pk)
+        self.assertEqual([r['movie_id'] for r in results[2:]], [None, None])
+        # One bundled request per id that is not in the catalog yet
+        self.assertCountEqual(self.fake.paths, ['/movie/2', '/movie/3', '/movie/4'])
+
+        expected = SyntheticTMDb().movie_detail(2, 'videos,credits')
+        movie = Movie.objects.get(pk=results[1]['movie_id'])
+        self.assertEqual((movie.tmdb_id, movie.title, movie.runtime), (2, 'Movie 2', expected['runtime']))
+        self.assertEqual(movie.director, 'Director 2')
+        self.assertEqual(movie.trailer_url, 'https://www.youtube.com/watch?v=trailer2')
+        self.assertCountEqual(movie.genres.values_list('tmdb_id', flat=True),
+                              [g['id'] for g in expected['genres']])
+        self.assertEqual(Movie.objects.count(), 2)
+
+    def test_reimport_skips_imported_movies(self):
+        first = bulk_import_movies([2])
+        self.fake.paths.clear()
+
+        second = bulk_import_movies([2])
+
+        self.assertEqual(second, [{'tmdb_id': 2, 'status': ALREADY_IMPORTED, 'movie_id': first[0]['movie_id']}])
+        self.assertEqual(self.fake.paths, [])
+
+    def test_refresh_outcomes(self):
+        for tmdb_id in (2, 3, 4):
+            Movie.objects.create(title=f'Old {tmdb_id}', tmdb_id=tmdb_id, source='tmdb')
+
+        stats = refresh_movies([2, 3, 4, 5])
+
+        self.assertEqual(
+            {k: stats[k] for k in ('changed', 'matched', 'updated', 'not_found', 'failed')},
+            {'changed': 4, 'matched': 3, 'updated': 1, 'not_found': 1, 'failed': 1},
+        )
+        # Ids outside the catalog are never fetched
+        self.assertCountEqual(self.fake.paths, ['/movie/2', '/movie/3', '/movie/4'])
+        self.assertEqual(
+            dict(Movie.objects.values_list('tmdb_id', 'title')),
+            {2: 'Movie 2', 3: 'Old 3', 4: 'Old 4'},
+        )
+        self.assertEqual(Movie.objects.get(tmdb_id=2).director, 'Director 2')
+
+    def test_upsert_list_results(self):
+        results = self.service.get_popular_movies(1)['results']
+        first = results[0]
+        kept = Movie.objects.create(title='Old title', tmdb_id=first['tmdb_id'], runtime=999,
+                                    director='Kept Director', source='tmdb')
+
+        self.assertEqual(upsert_movie_results(results, batch_size=7), len(results))
+        self.assertEqual(upsert_movie_results(results, batch_size=7), len(results))
+
+        self.assertEqual(Movie.objects.count(), len(results))
+        kept.refresh_from_db()
+        # List columns are overwritten, details from a full import are kept
+        self.assertEqual((kept.title, kept.runtime, kept.director), (first['title'], 999, 'Kept Director'))
+        for result in results:
+            movie = Movie.objects.get(tmdb_id=result['tmdb_id'])
+            self.assertEqual(movie.title, result['title'])
+            self.assertCountEqual(movie.genres.values_list('tmdb_id', flat=True), result['genre_ids'])
+
+
+class GenreRegistryTests(TestCase):
+    """Genre lookups come from memory and are reloaded once a genre write commits."""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scifi = Genre.objects.create(name='Science Fiction', tmdb_id=878)
+            self.drama = Genre.objects.create(name='Drama', tmdb_id=18)
+
+    def test_lookups(self):
+        genre_registry.all()
+        with self.assertNumQueries(0):
+            self.assertEqual(genre_registry.get_by_id(self.scifi.pk).name, 'Science Fiction')
+            self.assertEqual(genre_registry.get_by_slug('science-fiction').id, self.scifi.pk)
+            self.assertEqual(genre_registry.get_by_slug('Science Fiction').id, self.scifi.pk)
+            self.assertEqual(genre_registry.get_by_name('science fiction').id, self.scifi.pk)
+            self.assertEqual(genre_registry.get_by_tmdb_id(18).id, self.drama.pk)
+            self.assertEqual(genre_registry.resolve(f' {self.drama.pk} ').id, self.drama.pk)
+            self.assertEqual(genre_registry.resolve('drama').id, self.drama.pk)
+            self.assertIsNone(genre_registry.get_by_id(0))
+            self.assertIsNone(genre_registry.get_by_name('Western'))
+            self.assertIsNone(genre_registry.resolve('western'))
+            self.assertEqual(genre_registry.tmdb_id_map(), {878: self.scifi.pk, 18: self.drama.pk})
+            self.assertEqual(genre_registry.ids_for_tmdb_ids([18, 99]), [self.drama.pk])
+            self.assertEqual(genre_registry.tmdb_ids_for_names(['DRAMA', 'Western']), [18])
+
+    def test_other_processes_reload_after_commit(self):
+        # A registry of its own stands in for another worker process
+        other = GenreRegistry()
+        self.assertIsNone(other.get_by_name('Western'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            western = Genre.objects.create(name='Western', tmdb_id=37)
+            # The writer sees its own genre; others keep their snapshot until commit
+            self.assertEqual(genre_registry.get_by_name('Western').id, western.pk)
+            with self.assertNumQueries(0):
+                self.assertIsNone(other.get_by_name('Western'))
+
+        self.assertEqual(other.get_by_name('Western').id, western.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            western.delete()
+        self.assertIsNone(other.get_by_name('Western'))
+
+    def test_uncommitted_write_is_not_published(self):
+        other = GenreRegistry()
+        other.all()
+
+        # Callbacks captured but not run: the write never commits
+        with self.captureOnCommitCallbacks():
+            Genre.objects.create(name='Western', tmdb_id=37)
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(other.get_by_name('Western'))
+
+    def test_bulk_sync(self):
+        other = GenreRegistry()
+        other.all()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            upsert_genres([{'id': 878, 'name': 'Sci-Fi'}, {'id': 18, 'name': 'Drama'}, {'id': 37, 'name': 'Western'}])
+
+        self.assertEqual(Genre.objects.count(), 3)
+        for registry in (genre_registry, other):
+            self.assertEqual(registry.get_by_tmdb_id(878).id, self.scifi.pk)
+            self.assertEqual(registry.get_by_tmdb_id(878).name, 'Sci-Fi')
+            self.assertIsNone(registry.get_by_name('Science Fiction'))
+            self.assertEqual(registry.resolve('sci-fi').id, self.scifi.pk)
+            self.assertEqual(registry.get_by_name('western').tmdb_id, 37)
+
+
+class ImageCacheTests(SimpleTestCase):
+    """Eviction leaves in-progress writes alone and stays bounded."""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.cache = image_proxy.ImageCache(self.root, max_bytes=10_000)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _fill(self, count, size=1000):
+        for i in range(count):
+            self.assertTrue(self.cache._write(self.cache._blob_path(f'{i:064x}'), b'x' * size))
+
+    def test_eviction_skips_files_being_written(self):
+        pending = self.cache._blob_path('f' * 64).with_name(f'.pending.abc{image_proxy.TMP_SUFFIX}')
+        pending.parent.mkdir(parents=True)
+        pending.write_bytes(b'x' * 5000)
+
+        self._fill(30)
+
+        self.assertTrue(pending.exists())
+        self.assertLessEqual(self.cache._size, 10_000)
+
+    def test_lost_temporary_file_is_not_an_error(self):
+        with mock.patch.object(image_proxy.os, 'replace', side_effect=FileNotFoundError):
+            written = self.cache._write(self.cache._blob_path('a' * 64), b'data')
+
+        self.assertFalse(written)
+        self.assertEqual(list(self.root.rglob(f'*{image_proxy.TMP_SUFFIX}')), [])
+
+    def test_capped_eviction_walk_keeps_the_cache_bounded(self):
+        with mock.patch.object(image_proxy, 'EVICT_SCAN_LIMIT', 4):
+            self._fill(60, size=500)
+
+        on_disk = sum(path.stat().st_size for path in self.cache._files())
+        self.assertLessEqual(on_disk, 10_000)
+        self.assertEqual(on_disk, self.cache._size)
+
+    def test_malformed_width_serves_the_default_variant(self):
+        movie = Movie(pk=1, poster_url='https://image.tmdb.org/t/p/w500/poster.jpg')
+        with mock.patch('movies.api_views.get_object_or_404', return_value=movie), \
+                mock.patch('movies.api_views.movie_image_source', return_value=('source', None)), \
+                mock.patch('movies.api_views.get_variant', return_value=None) as get_variant:
+            for width, expected in (('342', 342), ('²', None), ('abc', None), ('', None)):
+                with self.subTest(width=width):
+                    response = self.client.get('/api/movies/1/image/poster/', {'w': width, 'fmt': 'jpeg'})
+
+                    self.assertEqual(response.status_code, 302)
+                    self.assertEqual(get_variant.call_args.args[2], expected)
+
+
+
+
+
+class QueryCountTests(TestCase):
+    """Read endpoints run a fixed number of queries, however many rows they return."""
+
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='x')
+        self.genres = [Genre.objects.create(name='Action', tmdb_id=28), Genre.objects.create(name='Drama', tmdb_id=18)]
+        self.movie = self._add_movies(3)[0]
+        self.client = APIClient()
+
+    def _add_movies(self, count):
+        start = Movie.objects.count()
+        movies = []
+        for i in range(start, start + count):
+            movie = Movie.objects.create(title=f'Movie {i}', release_year=2000 + i, actors=['A', 'B'], director='D')
+            movie.genres.add(*self.genres)
+            reviewer = User.objects.create_user(username=f'reviewer{i}', email=f'reviewer{i}@example.com')
+            Review.objects.create(user=reviewer, movie=movie, rating=4)
+            WatchHistory.objects.create(user=self.viewer, movie=movie)
+            movies.append(movie)
+        return movies
+
+    def assertConstantQueries(self, num, url, user=None):
+        """`num` queries for `url` now, and again after more rows are added."""
+        if user is not None:
+            self.client.force_authenticate(user)
+        for grow in (0, 7):
+            self._add_movies(grow)
+            cache.clear()
+            with self.assertNumQueries(num):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_movie_list(self):
+        # count, page, genre prefetch
+        response = self.assertConstantQueries(3, '/api/movies/')
+        self.assertEqual(response.json()['count'], 10)
+
+    def test_movie_detail(self):
+        # movie, genre prefetch
+        response = self.assertConstantQueries(2, f'/api/movies/{self.movie.pk}/')
+        self.assertEqual(len(response.json()['genres']), 2)
+
+    def test_watch_history(self):
+        # history joined with movies, genre prefetch
+        response = self.assertConstantQueries(2, '/api/movies/watch-history/', user=self.viewer)
+        self.assertEqual(len(response.json()), 10)
+        self.assertIn('description', response.json()[0]['movie'])
+
+    def test_watch_history_cards(self):
+        response = self.assertConstantQueries(2, '/api/movies/watch-history/?view=card', user=self.viewer)
+        self.assertEqual(len(response.json()), 10)
+        self.assertEqual(set(response.json()[0]['movie']), set(MovieCardSerializer.Meta.fields))
+
+    def test_admin_movie_list(self):
+        admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        self.client.force_login(admin_user)
+        # session, user, count, full count, page, then the genre, year and language filter choices;
+        # the rating column reads stored counters, not a query per row
+        response = self.assertConstantQueries(8, '/admin/movies/movie/')
+        self.assertEqual(response.context['cl'].result_count, 10)
+        self.assertContains(response, 'Movie 9')
+
+
+class PaginationTests(TestCase):
+    """Cursor and count-free pages cover every row once; malformed cursors are a 404."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        self.movies = [Movie.objects.create(title=f'Movie {i}', release_year=2000) for i in range(25)]
+        self.movie = self.movies[0]
+        for i in range(5):
+            reviewer = User.objects.create_user(username=f'reviewer{i}', email=f'reviewer{i}@example.com')
+            Review.objects.create(user=reviewer, movie=self.movie, rating=3)
+        for movie in self.movies[:5]:
+            WatchHistory.objects.create(user=self.admin, movie=movie)
+        for i in range(5):
+            ChatMessage.objects.create(user=self.admin, sender='user', message=f'Message {i}')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _walk(self, url):
+        """Follow `next` links from `url`; the ids of every page, in order."""
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertIsNone(body['count'])
+            self.assertIsNone(body['previous'])
+            ids.extend(row['id'] for row in body['results'])
+            url = body['next']
+        return ids
+
+    def _cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def test_cursor_round_trip(self):
+        expected = list(Movie.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        self.assertEqual(self._walk('/api/movies/?cursor=&page_size=10'), expected)
+
+    def test_tampered_cursors(self):
+        when = self.movie.created_at.isoformat()
+        cursors = [
+            'not base64!', self._cursor({'id': 1}), self._cursor([when]), self._cursor([when, 1, 2]),
+            self._cursor(['yesterday', 1]), self._cursor([when, 'abc']), self._cursor([when, {'id': 1}]),
+            self._cursor([when, None]), self._cursor([None, 1]), self._cursor([when, True]),
+            self._cursor([when, 10 ** 30]), self._cursor([[when], 1]),
+        ]
+        urls = ('/api/movies/', f'/api/reviews/movie/{self.movie.pk}/', '/api/users/')
+        for url in urls:
+            for cursor in cursors:
+                with self.subTest(url=url, cursor=cursor):
+                    response = self.client.get(url, {'cursor': cursor})
+                    self.assertEqual(response.status_code, 404)
+                    self.assertEqual(response.json()['detail'], 'Invalid cursor')
+
+    def test_pages_without_count(self):
+        expected = list(Movie.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+        first = self.client.get('/api/movies/?count=false&page_size=10').json()
+        self.assertIsNone(first['count'])
+        self.assertIsNone(first['previous'])
+        self.assertEqual([row['id'] for row in first['results']], expected[:10])
+
+        last = self.client.get('/api/movies/?count=false&page_size=10&page=3').json()
+        self.assertIsNone(last['next'])
+        self.assertIn('page=2', last['previous'])
+        self.assertEqual([row['id'] for row in last['results']], expected[20:])
+
+        self.assertEqual(self.client.get('/api/movies/?count=false&page=abc').status_code, 404)
+
+    def test_paginate_helpers(self):
+        lists = {
+            f'/api/reviews/movie/{self.movie.pk}/': Review.objects.filter(movie=self.movie)
+            .order_by('-created_at', '-id'),
+            '/api/movies/watch-history/': WatchHistory.objects.filter(user=self.admin).order_by('-watched_at', '-id'),
+            '/api/recommendations/chat/history/': ChatMessage.objects.filter(user=self.admin)
+            .order_by('created_at', 'id'),
+            '/api/users/': User.objects.order_by('-date_joined', '-id'),
+        }
+        for url, queryset in lists.items():
+            with self.subTest(url=url):
+                expected = list(queryset.values_list('pk', flat=True))
+                # No pagination parameter: the whole list, as before pagination
+                whole = self.client.get(url).json()
+                self.assertIsInstance(whole, list)
+                self.assertEqual([row['id'] for row in whole], expected)
+
+                self.assertEqual(self._walk(f'{url}?cursor=&page_size=2'), expected)
+
+                paged = self.client.get(url, {'page': 2, 'page_size': 2}).json()
+                self.assertEqual(paged['count'], len(expected))
+                self.assertEqual([row['id'] for row in paged['results']], expected[2:4])
+
+
+class SearchTests(TestCase):
+    """Full-text search ranks through the joined index and matches without it."""
+
+    def setUp(self):
+        cache.clear()
+        drama = Genre.objects.create(name='Drama', tmdb_id=18)
+        self.title = Movie.objects.create(title='Harbor Lights', description='A quiet town.')
+        self.plot = Movie.objects.create(title='Night Shift', description='Lights go out at the harbor.')
+        self.cast = Movie.objects.create(title='Open Sea', actors=['Ann Harbor'], director='D')
+        self.other = Movie.objects.create(title='Desert Road', description='Sand.')
+        self.other.genres.add(drama)
+
+    def test_title_matches_rank_first(self):
+        ranked = list(search.search(Movie.objects.all(), 'harbor'))
+
+        self.assertEqual(ranked[0], self.title)
+        self.assertEqual({movie.pk for movie in ranked}, {self.title.pk, self.plot.pk, self.cast.pk})
+        self.assertTrue(all(movie.search_rank > 0 for movie in ranked))
+
+    def test_matching_agrees_with_search(self):
+        for query in ('harbor', 'lights harb', 'drama', 'ann'):
+            ranked = search.search(Movie.objects.all(), query, order_by_rank=False)
+            self.assertEqual(
+                set(search.matching(Movie.objects.all(), query).values_list('pk', flat=True)),
+                set(ranked.values_list('pk', flat=True)),
+                query,
+            )
+        self.assertFalse(search.matching(Movie.objects.all(), '!!').exists())
+
+    def test_documents_read_the_genre_registry_once_per_batch(self):
+        with mock.patch.object(genre_registry, 'get_by_id') as get_by_id:
+            docs = list(search._documents([self.other.pk, self.title.pk]))
+
+        get_by_id.assert_not_called()
+        self.assertIn((self.other.pk, 'Desert Road', 'Sand.', '', '', 'Drama'), docs)
+
+    @skipUnless(connection.vendor == 'sqlite', 'checks the FTS5 plan')
+    def test_search_plan_starts_from_the_index(self):
+        plan = search.search(Movie.objects.all(), 'harbor')[:20].explain()
+
+        # Matches come from the index, then movies are looked up by key
+        self.assertLess(plan.index('VIRTUAL TABLE'), plan.index('USING INTEGER PRIMARY KEY'))
+
+
+class SharedCacheTests(TestCase):
+    """Validators are only sent when table versions live in a shared cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.movie = Movie.objects.create(title='Cached Movie')
+        self.url = f'/api/movies/{self.movie.pk}/'
+
+    @override_settings(CONDITIONAL_GET_ENABLED=False)
+    def test_disabled_sends_no_validators(self):
+        response = APIClient().get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    @override_settings(CONDITIONAL_GET_ENABLED=True)
+    def test_enabled_answers_not_modified(self):
+        client = APIClient()
+        etag = client.get(self.url)['ETag']
+
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_response_cache_disabled_runs_the_view(self):
+        response_cache._counters.clear()
+        for _ in range(2):
+            self.assertEqual(APIClient().get(self.url).status_code, 200)
+
+        self.assertEqual(response_cache.stats()['misses'] + response_cache.stats()['hits'], 0)
+
+    @override_settings(CONDITIONAL_GET_ENABLED=True, RESPONSE_CACHE_ENABLED=True)
+    def test_check_refuses_a_per_process_cache(self):
+        errors = check_shared_cache_features(None)
+
+        self.assertEqual([error.id for error in errors], ['figflix.E001', 'figflix.E002'])
+
+    @override_settings(
+        CONDITIONAL_GET_ENABLED=True, RESPONSE_CACHE_ENABLED=True,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}},
+    )
+    def test_check_accepts_a_shared_cache(self):
+        self.assertEqual(check_shared_cache_features(None), [])
+
+
+class CatalogFilterTests(TestCase):
+    """The movie list and its facets share filters and reject malformed ones."""
+
+    def setUp(self):
+        cache.clear()
+        self.action = Genre.objects.create(name='Action', tmdb_id=28)
+        self.scifi = Genre.objects.create(name='Science Fiction', tmdb_id=878)
+        self.drama = Genre.objects.create(name='Drama', tmdb_id=18)
+        self.old = Movie.objects.create(title='Old Movie', release_year=1999)
+        self.new = Movie.objects.create(title='New Movie', release_year=2020)
+        self.both = Movie.objects.create(title='Both Movie', release_year=2020)
+        self.old.genres.add(self.action)
+        self.new.genres.add(self.scifi)
+        self.both.genres.add(self.action, self.scifi)
+        self.client = APIClient()
+
+    def _ids(self, query):
+        response = self.client.get(f'/api/movies/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return {movie['id'] for movie in response.json()['results']}
+
+    def test_year(self):
+        self.assertEqual(self._ids('year=2020'), {self.new.pk, self.both.pk})
+        self.assertEqual(self.client.get('/api/movies/facets/?year=1999').json()['count'], 1)
+
+    def test_genre_by_id_slug_or_name(self):
+        for value in (self.scifi.pk, 'science-fiction', 'Science Fiction'):
+            self.assertEqual(self._ids(f'genre={value}'), {self.new.pk, self.both.pk}, value)
+
+    def test_any_genre(self):
+        self.assertEqual(self._ids(f'genre=action,{self.scifi.pk}'), {self.old.pk, self.new.pk, self.both.pk})
+        # Unknown genres are dropped
+        self.assertEqual(self._ids('genre=action,no-such-genre'), {self.old.pk, self.both.pk})
+        self.assertEqual(self._ids('genre=no-such-genre'), set())
+        self.assertEqual(self._ids('genre=drama'), set())
+
+    def test_genre_like_a_number_is_an_unknown_genre(self):
+        self.assertEqual(self._ids('genre=²'), set())
+        self.assertEqual(self._ids('genre=action,²'), {self.old.pk, self.both.pk})
+        response = self.client.get('/api/movies/facets/', {'genre': '²'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_all_genres(self):
+        self.assertEqual(self._ids(f'genre=action,{self.scifi.pk}&genre_match=all'), {self.both.pk})
+        self.assertEqual(self._ids('genre=action,drama&genre_match=all'), set())
+        self.assertEqual(self._ids('genre=action,no-such-genre&genre_match=all'), set())
+        self.assertEqual(
+            self.client.get('/api/movies/facets/?genre=action,science-fiction&genre_match=all').json()['count'], 1
+        )
+
+    def test_genre_filters_use_the_movie_genre_index(self):
+        links = Movie.genres.through
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, links._meta.db_table)
+        index = next(
+            name for name, info in constraints.items()
+            if info['unique'] and info['columns'] == ['movie_id', 'genre_id']
+        )
+        genre_ids = [self.action.pk, self.scifi.pk]
+        for match_all in (False, True):
+            result = explain(PlanCheck(
+                'genre filter',
+                lambda: Movie.objects.with_genres(genre_ids, match_all=match_all).order_by('-created_at', '-id')[:20],
+                (links._meta.db_table,),
+            ))
+            self.assertTrue(result.ok, result.plan)
+            self.assertIn(index, '\n'.join(result.plan))
+
+    def test_malformed_year_is_a_bad_request(self):
+        for year in ('abc', '20x0', '²', '99999999999999999999'):
+            for url in ('/api/movies/', '/api/movies/facets/'):
+                response = self.client.get(url, {'year': year})
+                self.assertEqual(response.status_code, 400, (url, year))
+                self.assertIn('year', response.json())
+
+
+class CreditTests(FakeTMDbMixin, TestCase):
+    """Credits follow movies' actors and director, and back the ?actor=/?director= filters."""
+
+    def setUp(self):
+        cache.clear()
+        self.heat = Movie.objects.create(title='Heat', director='Michael Mann',
+                                         actors=['Al Pacino', 'Robert De Niro'])
+        self.irishman = Movie.objects.create(title='The Irishman', director='Martin Scorsese',
+                                             actors=['Robert De Niro', ' al  pacino', 'Joe Pesci'])
+        self.collateral = Movie.objects.create(title='Collateral', director='Michael Mann', actors=['Tom Cruise'])
+
+    def _ids(self, **params):
+        response = APIClient().get('/api/movies/', params)
+        self.assertEqual(response.status_code, 200)
+        return {movie['id'] for movie in response.json()['results']}
+
+    def _credits(self):
+        return set(Credit.objects.values_list('person__name_key', 'movie_id', 'role', 'order'))
+
+    def test_people_are_shared_by_name(self):
+        self.assertEqual(Person.objects.count(), 6)
+        pacino = Person.objects.get(name_key='al pacino')
+        self.assertEqual(pacino.name, 'Al Pacino')
+        self.assertEqual(
+            list(self.irishman.credits.filter(role=Credit.ACTOR).values_list('person__name_key', 'order')),
+            [('robert de niro', 0), ('al pacino', 1), ('joe pesci', 2)],
+        )
+
+    def test_filters(self):
+        self.assertEqual(self._ids(actor='Robert De Niro'), {self.heat.pk, self.irishman.pk})
+        self.assertEqual(self._ids(actor='  AL   PACINO '), {self.heat.pk, self.irishman.pk})
+        self.assertEqual(self._ids(director='michael mann'), {self.heat.pk, self.collateral.pk})
+        self.assertEqual(self._ids(actor='Al Pacino', director='Michael Mann'), {self.heat.pk})
+        # Roles are not interchangeable
+        self.assertEqual(self._ids(actor='Michael Mann'), set())
+        self.assertEqual(self._ids(director='Al Pacino'), set())
+        self.assertEqual(self._ids(actor='Al'), set())
+
+        self.assertEqual(
+            set(Movie.objects.credited(['tom cruise', 'Martin  Scorsese']).values_list('pk', flat=True)),
+            {self.collateral.pk, self.irishman.pk},
+        )
+
+    def test_saves_rewrite_credits(self):
+        self.heat.actors = ['Val Kilmer']
+        self.heat.save()
+        self.assertEqual(self._ids(actor='Al Pacino'), {self.irishman.pk})
+        self.assertEqual(self._ids(actor='val kilmer'), {self.heat.pk})
+
+        with mock.patch('movies.signals.credits.set_movie_credits') as set_movie_credits:
+            self.collateral.save(update_fields=['title'])
+        set_movie_credits.assert_not_called()
+
+    def test_tmdb_import_syncs_credits(self):
+        self.serve_fake_tmdb(tmdb_service)
+
+        movie_id = bulk_import_movies([7])[0]['movie_id']
+
+        self.assertEqual(set(Movie.objects.credited(['director 7'], role=Credit.DIRECTOR)
+                             .values_list('pk', flat=True)), {movie_id})
+        self.assertEqual(Credit.objects.filter(movie_id=movie_id, role=Credit.ACTOR).count(), 10)
+
+        # A refresh replaces them with TMDb's current credits
+        Credit.objects.filter(movie_id=movie_id).delete()
+        Movie.objects.filter(pk=movie_id).update(director='Someone Else')
+        refresh_movies([7])
+        self.assertEqual(Movie.objects.get(pk=movie_id).director, 'Director 7')
+        self.assertEqual(Credit.objects.filter(movie_id=movie_id).count(), 11)
+
+    def test_backfill_is_idempotent(self):
+        expected = self._credits()
+        people = set(Person.objects.values_list('name_key', flat=True))
+        # As after writes that bypass signals
+        Credit.objects.all().delete()
+        Movie.objects.filter(pk=self.collateral.pk).update(actors=['Tom Cruise', 'Jamie Foxx'])
+        expected.add(('jamie foxx', self.collateral.pk, Credit.ACTOR, 1))
+
+        for _ in range(2):
+            call_command('backfill_credits', batch_size=2, stdout=StringIO())
+            self.assertEqual(self._credits(), expected)
+            self.assertEqual(set(Person.objects.values_list('name_key', flat=True)), people | {'jamie foxx'})
+
+    def test_backfill_resumes_after_start_id(self):
+        Credit.objects.all().delete()
+
+        call_command('backfill_credits', start_id=self.heat.pk, stdout=StringIO())
+
+        self.assertEqual(set(Credit.objects.values_list('movie_id', flat=True)),
+                         {self.irishman.pk, self.collateral.pk})
+
+
+class InlineThread:
+    """
+    Stands in for threading.Thread, running the target on start(). The test
+    connection stays open: the target closes what would be its own.
+    """
+
+    def __init__(self, target, **kwargs):
+        self.target = target
+
+    def start(self):
+        with mock.patch.object(connections['default'], 'close') as close:
+            self.target()
+        self.closed = close.called
+
+
+class AutocompleteTests(TestCase):
+    """The index is built off the request path and follows other processes' writes."""
+
+    def setUp(self):
+        self.index = autocomplete.MovieAutocomplete()
+        self.movie = Movie.objects.create(title='The Dark Knight', director='Nolan', tmdb_vote_count=10)
+
+    def test_first_query_starts_a_build_and_returns_nothing(self):
+        with mock.patch.object(autocomplete.threading, 'Thread') as thread:
+            self.assertEqual(self.index.suggest('dark'), {'titles': [], 'directors': [], 'actors': []})
+
+        thread.return_value.start.assert_called_once()
+        self.assertFalse(self.index.stats()['built'])
+
+    def test_picks_up_writes_from_other_processes(self):
+        with mock.patch.object(autocomplete.threading, 'Thread', InlineThread):
+            self.index.warm()
+            self.assertEqual(self.index.suggest('dark')['titles'][0]['id'], self.movie.pk)
+
+            # As another process would: no signals reach this index
+            Movie.objects.filter(pk=self.movie.pk).update(title='Bright Knight', updated_at=timezone.now())
+            self.assertEqual(len(self.index.suggest('dark')['titles']), 1)
+            self.index._checked_at -= settings.AUTOCOMPLETE_REFRESH_INTERVAL
+            # Answered from the current index while the refresh runs
+            self.index.suggest('dark')
+
+            self.assertEqual(self.index.suggest('dark')['titles'], [])
+            self.assertEqual(self.index.suggest('bright')['titles'][0]['id'], self.movie.pk)
+
+    def test_unchanged_catalog_is_not_rebuilt(self):
+        with mock.patch.object(autocomplete.threading, 'Thread', InlineThread):
+            self.index.warm()
+            self.index._checked_at -= settings.AUTOCOMPLETE_REFRESH_INTERVAL
+            with mock.patch.object(self.index, 'rebuild') as rebuild:
+                self.index.suggest('dark')
+
+        rebuild.assert_not_called()
+
+    def test_background_runs_close_their_connection(self):
+        threads = []
+
+        def thread(**kwargs):
+            threads.append(InlineThread(**kwargs))
+            return threads[-1]
+
+        with mock.patch.object(autocomplete.threading, 'Thread', thread):
+            self.index.warm()
+            self.index._checked_at -= settings.AUTOCOMPLETE_REFRESH_INTERVAL
+            self.index.suggest('dark')
+
+        # The build, and the refresh check that found nothing to do
+        self.assertEqual([t.closed for t in threads], [True, True])
+
+    def test_writes_to_other_tables_keep_the_index(self):
+        user = User.objects.create_user(username='viewer', email='viewer@example.com')
+        with mock.patch.object(autocomplete.threading, 'Thread', InlineThread):
+            self.index.warm()
+            signature = self.index._signature()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Review.objects.create(user=user, movie=self.movie, rating=5)
+                WatchHistory.objects.create(user=user, movie=self.movie)
+                self.movie.genres.add(Genre.objects.create(name='Action', tmdb_id=28))
+            self.assertEqual(self.index._signature(), signature)
+
+            self.index._checked_at -= settings.AUTOCOMPLETE_REFRESH_INTERVAL
+            with mock.patch.object(self.index, 'rebuild') as rebuild:
+                self.index.suggest('dark')
+        rebuild.assert_not_called()
+
+    def test_saves_of_unindexed_fields_are_not_applied(self):
+        with mock.patch('movies.signals.movie_autocomplete') as index:
+            self.movie.save(update_fields=['poster_url', 'popularity'])
+            index.movies_changed.assert_not_called()
+
+            self.movie.save(update_fields=['title'])
+            index.movies_changed.assert_called_once_with([self.movie.pk])
+
+    def test_malformed_limit_uses_the_default(self):
+        empty = {'titles': [], 'directors': [], 'actors': []}
+        with mock.patch.object(autocomplete.movie_autocomplete, 'suggest', return_value=empty) as suggest:
+            for limit in ('²', 'abc', '-1'):
+                with self.subTest(limit=limit):
+                    response = self.client.get('/api/movies/autocomplete/', {'q': 'dark', 'limit': limit})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(suggest.call_args.kwargs['limit'], 10)
+
+
+class QueryPlanTests(TestCase):
+    """Every query in check_query_plans is answered from indexes after migrating."""
+
+    def test_checks(self):
+        for check in CHECKS:
+            with self.subTest(check.label):
+                try:
+                    result = explain(check)
+                except UnsupportedDatabase as e:
+                    self.skipTest(str(e))
+                self.assertTrue(result.ok, f'{", ".join(result.problems)}\n' + '\n'.join(result.plan))
@@ -0,0 +1,273 @@
+"""
+Two-tier response cache and request coalescing for TMDb API payloads.
+
+Tier 1 is a small in-process LRU, tier 2 is the Django cache framework
+(shared between workers when a shared backend such as Redis is configured).
+Entries carry a freshness deadline; once it passes they are still served
+for a grace period while the caller refreshes them in the background.
+Identical concurrent misses are collapsed into one upstream request.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+
+# Query parameters that never change the response body
+IGNORED_PARAMS = ('api_key',)
+
+
+def match_prefix(mapping: Dict[str, Any], endpoint: str, default: Any) -> Any:
+    """Look up an endpoint setting by its longest matching prefix."""
+    matches = [prefix for prefix in mapping if endpoint.startswith(prefix)]
+    if matches:
+        return mapping[max(matches, key=len)]
+    return default
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded in-process cache.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Dict):
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TMDbCache:
+    """
+    Per-endpoint TTL cache with stale-while-revalidate semantics.
+
+    Entries are stored as {'payload': ..., 'fresh_until': timestamp} in both
+    tiers and kept for `stale_ttl` seconds after they stop being fresh. A
+    separate "last good" copy of each payload is kept in the shared tier for
+    `last_good_ttl` seconds to serve while TMDb is unavailable.
+    """
+
+    def __init__(self, ttls: Dict[str, int], default_ttl: int, stale_ttl: int,
+                 local_maxsize: int, last_good_ttl: int = 0, cache_alias: str = 'default'):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.last_good_ttl = last_good_ttl
+        self.local = LRUCache(local_maxsize)
+        self.cache_alias = cache_alias
+        self._counters = {'local_hits': 0, 'shared_hits': 0, 'stale_hits': 0, 'misses': 0}
+        self._counter_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def make_key(self, endpoint: str, params: Optional[Dict] = None) -> str:
+        """
+        Build a cache key from the endpoint and normalized query parameters.
+
+        Parameters are sorted and stringified so that {'page': 1} and
+        {'page': '1'} map to the same entry.
+        """
+        normalized = sorted(
+            (str(k), str(v)) for k, v in (params or {}).items()
+            if k not in IGNORED_PARAMS and v is not None
+        )
+        digest = hashlib.sha1(f"{endpoint}?{urlencode(normalized)}".encode()).hexdigest()
+        return f"tmdb:{digest}"
+
+    def get_ttl(self, endpoint: str) -> int:
+        return match_prefix(self.ttls, endpoint, self.default_ttl)
+
+    def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """
+        Look up a cached payload.
+
+        Returns (payload, is_fresh), or None on a miss.
+        """
+        now = time.time()
+        entry = self.local.get(key)
+        counter = 'local_hits'
+
+        if entry is not None and now > entry['fresh_until'] + self.stale_ttl:
+            self.local.delete(key)
+            entry = None
+
+        if entry is None:
+            entry = self.shared.get(key)
+            counter = 'shared_hits'
+            if entry is not None:
+                self.local.set(key, entry)
+
+        if entry is None:
+            self._incr('misses')
+            return None
+
+        is_fresh = now <= entry['fresh_until']
+        self._incr(counter if is_fresh else 'stale_hits')
+        return entry['payload'], is_fresh
+
+    def set(self, key: str, endpoint: str, payload: Any):
+        """Store a payload in both tiers using the endpoint's TTL."""
+        ttl = self.get_ttl(endpoint)
+        entry = {'payload': payload, 'fresh_until': time.time() + ttl}
+        self.local.set(key, entry)
+        self.shared.set(key, entry, timeout=ttl + self.stale_ttl)
+        if self.last_good_ttl:
+            self.shared.set(f"{key}:last_good", payload, timeout=self.last_good_ttl)
+
+    def get_last_good(self, key: str) -> Optional[Any]:
+        """Return the most recent payload stored for a key, however old."""
+        if not self.last_good_ttl:
+            return None
+        return self.shared.get(f"{key}:last_good")
+
+    def peek_fresh(self, key: str) -> Optional[Any]:
+        """
+        Return a fresh payload from the shared tier, without touching counters.
+        """
+        entry = self.shared.get(key)
+        if entry is not None and time.time() <= entry['fresh_until']:
+            self.local.set(key, entry)
+            return entry['payload']
+        return None
+
+    def clear_local(self):
+        self.local.clear()
+
+    def _incr(self, counter: str):
+        with self._counter_lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for this process."""
+        with self._counter_lock:
+            stats = dict(self._counters)
+        hits = stats['local_hits'] + stats['shared_hits'] + stats['stale_hits']
+        total = hits + stats['misses']
+        stats['hit_ratio'] = round(hits / total, 4) if total else 0.0
+        return stats
+
+
+class _Call:
+    """An in-flight call that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls into one execution.
+
+    Within a process, threads asking for the same key wait for the first
+    caller's result. Across processes, a lock held in the Django cache
+    elects one leader; other workers poll `lookup` (normally the shared
+    cache tier) until the leader has stored its result, the lock goes
+    away, or `wait_timeout` expires, and only then run the call themselves.
+    """
+
+    def __init__(self, lock_timeout: float, wait_timeout: float,
+                 poll_interval: float = 0.05, cache_alias: str = 'default'):
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.cache_alias = cache_alias
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._counters = {'leader_calls': 0, 'coalesced_local': 0, 'coalesced_shared': 0}
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def do(self, key: str, fn: Callable[[], Any], lookup: Callable[[], Any]) -> Any:
+        """
+        Run `fn` once for all concurrent callers of `key` and return its result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._counters['coalesced_local'] += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_shared(key, fn, lookup)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _do_shared(self, key: str, fn: Callable[[], Any], lookup: Callable[[], Any]) -> Any:
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+
+        while not self.shared.add(lock_key, token, timeout=self.lock_timeout):
+            # Another worker is fetching: wait for its result to land
+            time.sleep(self.poll_interval)
+            result = lookup()
+            if result is not None:
+                self._incr('coalesced_shared')
+                return result
+            if time.monotonic() >= deadline:
+                break
+        else:
+            try:
+                self._incr('leader_calls')
+                return fn()
+            finally:
+                if self.shared.get(lock_key) == token:
+                    self.shared.delete(lock_key)
+
+        # Gave up waiting on another worker's lock
+        self._incr('leader_calls')
+        return fn()
+
+    def _incr(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict:
+        """Return coalescing counters for this process."""
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,332 @@
+"""
+Bulk persistence of TMDb data into the local catalog.
+
+Rows are written with batched upserts keyed on tmdb_id, so re-running an
+import refreshes existing movies instead of failing or duplicating them.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Union
+from django.db import transaction
+from django.utils import timezone
+from figflix.conditional import bump
+from . import search
+from .autocomplete import movie_autocomplete
+from .credits import movie_people, set_movie_credits
+from .genre_registry import genre_registry
+from .models import Movie, Genre, TMDbSyncState
+
+BATCH_SIZE = 500
+
+# Fields present in TMDb list results (popular, top rated, discover, search)
+LIST_FIELDS = [
+    'title', 'description', 'release_year', 'poster_url', 'backdrop_url',
+    'tmdb_rating', 'tmdb_vote_count', 'popularity',
+]
+
+# Fields refreshed from a full TMDb bundle
+DETAIL_FIELDS = LIST_FIELDS + ['runtime', 'trailer_url', 'actors', 'director', 'language']
+
+# TMDb's change feed accepts at most 14 days per query
+CHANGES_MAX_DAYS = 14
+CHANGES_WATERMARK = 'movie_changes'
+
+# Ids per IN (...) lookup, below SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 5000
+
+# Per-id outcomes reported by bulk_import_movies
+IMPORTED = 'imported'
+ALREADY_IMPORTED = 'already_imported'
+NOT_FOUND = 'not_found'
+FAILED = 'failed'
+
+
+def parse_year(value) -> int:
+    """Convert a formatted release_year ('1999' or None) to an int."""
+    return int(value) if value else None
+
+
+def build_movie(details: Dict, user=None) -> Movie:
+    """
+    Build an unsaved Movie from TMDbService.get_movie_bundle() details.
+    """
+    return Movie(
+        title=details['title'] or '',
+        description=details['description'] or '',
+        release_year=parse_year(details['release_year']),
+        runtime=details['runtime'],
+        tmdb_id=details['tmdb_id'],
+        tmdb_rating=details['tmdb_rating'],
+        tmdb_vote_count=details['tmdb_vote_count'],
+        popularity=details.get('popularity'),
+        poster_url=details['poster_url'],
+        backdrop_url=details['backdrop_url'],
+        trailer_url=details['trailer_url'],
+        actors=details['actors'],
+        director=details['director'],
+        language=details['language'] or '',
+        source='tmdb',
+        uploaded_by=user,
+    )
+
+
+def upsert_genres(tmdb_genres: Iterable[Dict]) -> int:
+    """
+    Insert or rename genres from a TMDb genre list in one statement.
+    """
+    genres = [Genre(tmdb_id=g['id'], name=g['name']) for g in tmdb_genres]
+    Genre.objects.bulk_create(
+        genres,
+        update_conflicts=True,
+        unique_fields=['tmdb_id'],
+        update_fields=['name'],
+    )
+    # bulk_create does not send post_save
+    genre_registry.invalidate()
+    bump(Genre, Movie)
+    return len(genres)
+
+
+def set_movie_genres(movie_genre_ids: Dict[int, List[int]]):
+    """
+    Replace the genres of many movies at once.
+
+    Args:
+        movie_genre_ids: local movie pk -> list of TMDb genre ids
+    """
+    genre_map = genre_registry.tmdb_id_map()
+    through = Movie.genres.through
+    rows = [
+        through(movie_id=movie_id, genre_id=genre_map[genre_id])
+        for movie_id, genre_ids in movie_genre_ids.items()
+        for genre_id in genre_ids
+        if genre_id in genre_map
+    ]
+    through.objects.filter(movie_id__in=movie_genre_ids.keys()).delete()
+    through.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def upsert_movie_results(results: Iterable[Dict], batch_size: int = BATCH_SIZE) -> int:
+    """
+    Upsert formatted TMDb list results into Movie, with their genres.
+
+    Only columns present in list results are overwritten, so details
+    stored by a full import (runtime, trailer, cast) are kept.
+
+    Returns:
+        Number of movies written.
+    """
+    by_tmdb_id = {r['tmdb_id']: r for r in results if r.get('tmdb_id')}
+    items = list(by_tmdb_id.values())
+    now = timezone.now()
+
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        movies = [
+            Movie(
+                tmdb_id=r['tmdb_id'],
+                title=r['title'] or '',
+                description=r['description'] or '',
+                release_year=parse_year(r['release_year']),
+                poster_url=r['poster_url'],
+                backdrop_url=r['backdrop_url'],
+                tmdb_rating=r['tmdb_rating'],
+                tmdb_vote_count=r['tmdb_vote_count'],
+                popularity=r.get('popularity'),
+                source='tmdb',
+                created_at=now,
+                updated_at=now,
+            )
+            for r in batch
+        ]
+        with transaction.atomic():
+            Movie.objects.bulk_create(
+                movies,
+                update_conflicts=True,
+                unique_fields=['tmdb_id'],
+                update_fields=LIST_FIELDS + ['updated_at'],
+            )
+            # Upserted rows do not get their pks back, so look them up
+            pks = dict(
+                Movie.objects.filter(tmdb_id__in=[r['tmdb_id'] for r in batch]).values_list('tmdb_id', 'id')
+            )
+            set_movie_genres({pks[r['tmdb_id']]: r['genre_ids'] for r in batch})
+            search.index_movies(pks.values())
+            movie_autocomplete.movies_changed(pks.values())
+            bump(Movie)
+
+    return len(items)
+
+
+def fetch_bundles(tmdb_ids: Iterable[int], max_workers: int = 8,
+                  use_cache: bool = True) -> Dict[int, Union[Dict, str, None]]:
+    """
+    Fetch TMDb bundles (details, videos, credits) for many ids concurrently.
+
+    Returns:
+        Per id, the bundle, NOT_FOUND if TMDb does not know the id, or None
+        if it could not be fetched (TMDb unreachable or failing).
+    """
+    from .tmdb_service import TMDbNotFound, tmdb_service
+
+    def fetch(tmdb_id):
+        try:
+            return tmdb_service.get_movie_bundle(tmdb_id, use_cache=use_cache, raise_not_found=True)
+        except TMDbNotFound:
+            return NOT_FOUND
+
+    tmdb_ids = list(tmdb_ids)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(tmdb_ids, executor.map(fetch, tmdb_ids)))
+
+
+def bulk_import_movies(tmdb_ids: Iterable[int], user=None, max_workers: int = 8,
+                       batch_size: int = BATCH_SIZE) -> List[Dict]:
+    """
+    Import many TMDb movies into the local catalog.
+
+    Already imported ids are skipped with a single IN query, the remaining
+    bundles are fetched concurrently, and movies and genre links are
+    written with bulk inserts.
+
+    Returns:
+        One {'tmdb_id', 'status', 'movie_id'} dict per distinct requested id,
+        in request order.
+    """
+    tmdb_ids = list(dict.fromkeys(tmdb_ids))
+    existing = dict(Movie.objects.filter(tmdb_id__in=tmdb_ids).values_list('tmdb_id', 'id'))
+    bundles = fetch_bundles([i for i in tmdb_ids if i not in existing], max_workers=max_workers)
+
+    details = [b['details'] for b in bundles.values() if isinstance(b, dict)]
+    with transaction.atomic():
+        Movie.objects.bulk_create(
+            [build_movie(d, user) for d in details],
+            batch_size=batch_size,
+            # Another import may have inserted some of these meanwhile
+            ignore_conflicts=True,
+        )
+        created = dict(
+            Movie.objects.filter(tmdb_id__in=[d['tmdb_id'] for d in details]).values_list('tmdb_id', 'id')
+        )
+        set_movie_genres({created[d['tmdb_id']]: d['genre_ids'] for d in details})
+        set_movie_credits({
+            created[d['tmdb_id']]: movie_people(d['director'], d['actors']) for d in details
+        })
+        search.index_movies(created.values())
+        movie_autocomplete.movies_changed(created.values())
+        bump(Movie)
+
+    results = []
+    for tmdb_id in tmdb_ids:
+        if tmdb_id in existing:
+            results.append({'tmdb_id': tmdb_id, 'status': ALREADY_IMPORTED, 'movie_id': existing[tmdb_id]})
+        elif isinstance(bundles[tmdb_id], dict):
+            results.append({'tmdb_id': tmdb_id, 'status': IMPORTED, 'movie_id': created.get(tmdb_id)})
+        elif bundles[tmdb_id] == NOT_FOUND:
+            results.append({'tmdb_id': tmdb_id, 'status': NOT_FOUND, 'movie_id': None})
+        else:
+            results.append({'tmdb_id': tmdb_id, 'status': FAILED, 'movie_id': None})
+    return results
+
+
+def fetch_changed_ids(since: datetime, until: datetime) -> Optional[Set[int]]:
+    """
+    Collect ids from TMDb's movie change feed between two times.
+
+    Returns None if any page could not be fetched, so a partial feed is
+    never mistaken for a complete one.
+    """
+    from .tmdb_service import tmdb_service
+
+    changed = set()
+    start = since
+    while start < until:
+        end = min(start + timedelta(days=CHANGES_MAX_DAYS), until)
+        page, total_pages = 1, 1
+        while page <= total_pages:
+            data = tmdb_service.get_movie_changes(start.date().isoformat(), end.date().isoformat(), page)
+            if data is None:
+                return None
+            changed.update(data['ids'])
+            total_pages = data['total_pages']
+            page += 1
+        start = end
+    return changed
+
+
+def refresh_movies(tmdb_ids: Iterable[int], max_workers: int = 8,
+                   batch_size: int = BATCH_SIZE) -> Dict:
+    """
+    Re-fetch and update local movies whose tmdb_id is in `tmdb_ids`.
+
+    Ids not in the local catalog are dropped with IN lookups, so the cost
+    follows the number of changed local titles rather than catalog size.
+    Movies TMDb no longer knows are counted as 'not_found' and left as they
+    are; 'failed' only counts movies TMDb could not be asked about.
+    """
+    tmdb_ids = list(tmdb_ids)
+    local = {}
+    for start in range(0, len(tmdb_ids), LOOKUP_CHUNK_SIZE):
+        chunk = tmdb_ids[start:start + LOOKUP_CHUNK_SIZE]
+        local.update(Movie.objects.filter(tmdb_id__in=chunk).values_list('tmdb_id', 'id'))
+
+    bundles = fetch_bundles(local.keys(), max_workers=max_workers, use_cache=False)
+
+    now = timezone.now()
+    movies, genre_ids = [], {}
+    not_found = 0
+    for tmdb_id, bundle in bundles.items():
+        if bundle == NOT_FOUND:
+            not_found += 1
+            continue
+        if not bundle:
+            continue
+        movie = build_movie(bundle['details'])
+        movie.pk = local[tmdb_id]
+        movie.updated_at = now
+        movies.append(movie)
+        genre_ids[movie.pk] = bundle['details']['genre_ids']
+
+    with transaction.atomic():
+        Movie.objects.bulk_update(movies, DETAIL_FIELDS + ['updated_at'], batch_size=batch_size)
+        set_movie_genres(genre_ids)
+        set_movie_credits({movie.pk: movie_people(movie.director, movie.actors) for movie in movies})
+        search.index_movies(genre_ids.keys())
+        movie_autocomplete.movies_changed(genre_ids.keys())
+        bump(Movie)
+
+    return {
+        'changed': len(tmdb_ids),
+        'matched': len(local),
+        'updated': len(movies),
+        'not_found': not_found,
+        'failed': len(local) - len(movies) - not_found,
+    }
+
+
+def sync_movie_changes(since: Optional[datetime] = None, max_workers: int = 8) -> Optional[Dict]:
+    """
+    Apply TMDb changes made since the stored watermark to local movies.
+
+    The watermark only advances when every changed local movie was
+    refreshed or is gone from TMDb; otherwise the next run retries the
+    same window.
+
+    Returns:
+        Refresh counts plus 'since', 'until' and 'watermark_advanced', or
+        None if the change feed could not be read.
+    """
+    until = timezone.now()
+    if since is None:
+        state = TMDbSyncState.objects.filter(name=CHANGES_WATERMARK).first()
+        since = state.watermark if state else until - timedelta(days=1)
+
+    changed = fetch_changed_ids(since, until)
+    if changed is None:
+        return None
+
+    stats = refresh_movies(changed, max_workers=max_workers)
+    stats.update({'since': since, 'until': until, 'watermark_advanced': stats['failed'] == 0})
+    if stats['watermark_advanced']:
+        TMDbSyncState.objects.update_or_create(name=CHANGES_WATERMARK, defaults={'watermark': until})
+    return stats
@@ -0,0 +1,178 @@
+"""
+Rate limiting and circuit breaking for TMDb API calls.
+
+Both keep their state in the Django cache so that, with a shared cache
+backend, every worker process draws from the same request budget and sees
+the same breaker state.
+"""
+import threading
+import time
+from typing import Dict
+
+from django.core.cache import caches
+
+
+class RateLimiter:
+    """
+    Shared token bucket holding `rate` tokens, refilled once per second.
+
+    Each call takes a token by incrementing the counter for the current
+    one-second window. When the bucket is empty the caller sleeps until the
+    next refill, but never longer than `max_wait` in total; past that,
+    acquire() gives up so requests do not pile up behind the limiter.
+    """
+
+    def __init__(self, rate: int, max_wait: float, cache_alias: str = 'default',
+                 key_prefix: str = 'tmdb:ratelimit'):
+        self.rate = rate
+        self.max_wait = max_wait
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self._counters = {'acquired': 0, 'rejected': 0, 'throttled': 0,
+                          'total_wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def try_acquire(self) -> float:
+        """
+        Try to take a token without waiting.
+
+        Returns 0 on success, otherwise the seconds until the next refill.
+        """
+        if not self.rate:
+            return 0.0
+
+        now = time.time()
+        window = int(now)
+        key = f"{self.key_prefix}:{window}"
+        self.shared.add(key, 0, timeout=2)
+        try:
+            taken = self.shared.incr(key)
+        except ValueError:
+            # The window key expired or was evicted between add() and incr()
+            self.shared.add(key, 1, timeout=2)
+            taken = 1
+
+        if taken <= self.rate:
+            return 0.0
+        return (window + 1) - now
+
+    def acquire(self) -> bool:
+        """
+        Take a token, sleeping for refills up to `max_wait` seconds.
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if delay == 0:
+                self.record_wait(waited)
+                return True
+            if waited + delay > self.max_wait:
+                self.record_wait(waited, rejected=True)
+                return False
+            time.sleep(delay)
+            waited += delay
+
+    def record_wait(self, waited: float, rejected: bool = False):
+        with self._lock:
+            self._counters['rejected' if rejected else 'acquired'] += 1
+            if waited:
+                self._counters['throttled'] += 1
+                self._counters['total_wait_seconds'] += waited
+                self._counters['max_wait_seconds'] = max(self._counters['max_wait_seconds'], waited)
+
+    def stats(self) -> Dict:
+        """Return limiter wait counters for this process."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats['total_wait_seconds'] = round(stats['total_wait_seconds'], 3)
+        stats['max_wait_seconds'] = round(stats['max_wait_seconds'], 3)
+        stats['rate_per_second'] = self.rate
+        return stats
+
+
+class CircuitBreaker:
+    """
+    Shared circuit breaker for an upstream service.
+
+    closed:    requests flow; consecutive failures are counted, and the
+               count resets on success or after `failure_window` seconds.
+    open:      after `failure_threshold` failures, requests are refused for
+               `reset_timeout` seconds without touching the network.
+    half_open: once the timeout passes, a single probe request is let
+               through; success closes the breaker, failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, failure_window: int, reset_timeout: int,
+                 cache_alias: str = 'default', key_prefix: str = 'tmdb:breaker'):
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+        self.cache_alias = cache_alias
+        self.failures_key = f"{key_prefix}:failures"
+        self.open_key = f"{key_prefix}:open"
+        self.probe_key = f"{key_prefix}:probe"
+        self._lock = threading.Lock()
+        self._counters = {'short_circuited': 0, 'failures': 0, 'opened': 0}
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    @property
+    def state(self) -> str:
+        if self.shared.get(self.open_key):
+            return self.OPEN
+        if (self.shared.get(self.failures_key) or 0) >= self.failure_threshold:
+            return self.HALF_OPEN
+        return self.CLOSED
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent to the upstream."""
+        state = self.state
+        allowed = (
+            state == self.CLOSED
+            or (state == self.HALF_OPEN and self.shared.add(self.probe_key, 1, timeout=self.reset_timeout))
+        )
+        if not allowed:
+            self._incr('short_circuited')
+        return allowed
+
+    def record_success(self):
+        if self.shared.get(self.failures_key):
+            self.shared.delete_many([self.failures_key, self.probe_key])
+
+    def record_failure(self):
+        self._incr('failures')
+        self.shared.add(self.failures_key, 0, timeout=self.failure_window)
+        try:
+            failures = self.shared.incr(self.failures_key)
+        except ValueError:
+            failures = 1
+            self.shared.set(self.failures_key, failures, timeout=self.failure_window)
+
+        if failures >= self.failure_threshold:
+            self.shared.set(self.open_key, time.time(), timeout=self.reset_timeout)
+            # The failure count must outlive the open period to mark half-open
+            self.shared.set(self.failures_key, failures, timeout=self.reset_timeout * 2)
+            self.shared.delete(self.probe_key)
+            self._incr('opened')
+
+    def _incr(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict:
+        """Return breaker state (shared) and counters (this process)."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats['state'] = self.state
+        stats['recent_failures'] = self.shared.get(self.failures_key) or 0
+        return stats
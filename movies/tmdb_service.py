@@ -1,9 +1,49 @@
 """
 TMDb API Service - handles all interactions with The Movie Database API.
 """
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from .tmdb_cache import SingleFlight, TMDbCache, match_prefix
+from .tmdb_resilience import CircuitBreaker, RateLimiter
+
+# Upstream statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def is_upstream_failure(status_code: Optional[int]) -> bool:
+    """Whether a response status means TMDb itself is unhealthy (vs. a bad request)."""
+    return status_code is None or status_code in RETRY_STATUSES
+
+
+class TMDbNotFound(Exception):
+    """TMDb answered 404: the requested resource does not exist."""
+
+
+class JitteredRetry(Retry):
+    """
+    Retry policy that spreads exponential backoff delays randomly, so that
+    workers throttled at the same moment do not retry in lockstep.
+    Retry-After headers sent with 429/503 responses still take precedence,
+    up to `backoff_max`: a worker is never parked for however long TMDb asks.
+    """
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.backoff_max)
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return random.uniform(backoff / 2, backoff)
 
 
 class TMDbService:
@@ -15,22 +55,176 @@ class TMDbService:
         self.api_key = settings.TMDB_API_KEY
         self.base_url = settings.TMDB_BASE_URL
         self.image_base_url = settings.TMDB_IMAGE_BASE_URL
+        self.default_timeout = (settings.TMDB_CONNECT_TIMEOUT, settings.TMDB_READ_TIMEOUT)
+        self.timeouts = getattr(settings, 'TMDB_TIMEOUTS', {})
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.cache_enabled = settings.TMDB_CACHE_ENABLED
+        self.cache = TMDbCache(
+            ttls=settings.TMDB_CACHE_TTLS,
+            default_ttl=settings.TMDB_CACHE_DEFAULT_TTL,
+            stale_ttl=settings.TMDB_CACHE_STALE_TTL,
+            local_maxsize=settings.TMDB_CACHE_LOCAL_MAXSIZE,
+            last_good_ttl=settings.TMDB_CACHE_LAST_GOOD_TTL,
+        )
+        self.singleflight = SingleFlight(
+            lock_timeout=settings.TMDB_SINGLEFLIGHT_LOCK_TIMEOUT,
+            wait_timeout=settings.TMDB_SINGLEFLIGHT_WAIT_TIMEOUT,
+        )
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='tmdb-refresh')
+        self.rate_limiter = RateLimiter(
+            rate=settings.TMDB_RATE_LIMIT,
+            max_wait=settings.TMDB_RATE_LIMIT_MAX_WAIT,
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.TMDB_BREAKER_FAILURE_THRESHOLD,
+            failure_window=settings.TMDB_BREAKER_FAILURE_WINDOW,
+            reset_timeout=settings.TMDB_BREAKER_RESET_TIMEOUT,
+        )
+        self._degraded_counters = {'last_good_served': 0, 'local_fallbacks': 0}
+        self._degraded_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Shared keep-alive session, created on first use.
 
-    def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
+        The session is shared by all threads: urllib3 connection pools are
+        thread-safe and the session itself is never mutated after creation.
         """
-        Make HTTP request to TMDb API.
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self) -> requests.Session:
+        """Create a session with a pooled adapter and jittered retries."""
+        retry = JitteredRetry(
+            total=settings.TMDB_MAX_RETRIES,
+            backoff_factor=settings.TMDB_BACKOFF_FACTOR,
+            backoff_max=settings.TMDB_BACKOFF_MAX,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.TMDB_POOL_CONNECTIONS,
+            pool_maxsize=settings.TMDB_POOL_MAXSIZE,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Accept': 'application/json'})
+        return session
+
+    def _get_timeout(self, endpoint: str) -> Tuple[float, float]:
+        """Resolve (connect, read) timeout for an endpoint by longest prefix."""
+        return tuple(match_prefix(self.timeouts, endpoint, self.default_timeout))
+
+    def _make_request(self, endpoint: str, params: Dict = None, use_cache: bool = True,
+                      raise_not_found: bool = False) -> Optional[Dict]:
+        """
+        Make HTTP request to TMDb API, served from cache when possible.
+
+        Stale cache entries are returned immediately while a background
+        refresh fetches a new copy. Concurrent misses for the same endpoint
+        and params, in this or other worker processes, share one upstream
+        request. If TMDb cannot be reached, the last good payload for the
+        same request is returned when one is still cached.
 
         Args:
             endpoint: API endpoint (e.g., '/movie/popular')
             params: Query parameters
+            use_cache: False to always fetch from TMDb, without falling back
+                to cached copies (the fresh payload is still stored)
+            raise_not_found: raise TMDbNotFound when TMDb answers 404, so
+                callers can tell a missing resource from an outage
 
         Returns:
             JSON response as dictionary, or None if error
         """
+        try:
+            if not self.cache_enabled:
+                return self._fetch(endpoint, params)
+
+            key = self.cache.make_key(endpoint, params)
+            cached = self.cache.get(key) if use_cache else None
+            if cached is not None:
+                payload, is_fresh = cached
+                if not is_fresh:
+                    self._refresh_in_background(key, endpoint, params)
+                return payload
+
+            data = self._fetch_shared(key, endpoint, params, use_cache=use_cache)
+        except TMDbNotFound:
+            if raise_not_found:
+                raise
+            return None
+
+        if data is None and use_cache:
+            data = self.cache.get_last_good(key)
+            if data is not None:
+                self._incr_degraded('last_good_served')
+        return data
+
+    def _fetch_shared(self, key: str, endpoint: str, params: Optional[Dict],
+                      use_cache: bool = True) -> Optional[Dict]:
+        """
+        Fetch and cache a payload, coalescing identical in-flight requests.
+
+        With use_cache=False, callers waiting on another worker's fetch do
+        not take the copy it stores (which may predate the wait), but fetch
+        again once its lock is released.
+        """
+        def fetch_and_store():
+            data = self._fetch(endpoint, params)
+            if data is not None:
+                self.cache.set(key, endpoint, data)
+            return data
+
+        lookup = (lambda: self.cache.peek_fresh(key)) if use_cache else (lambda: None)
+        return self.singleflight.do(key, fetch_and_store, lookup)
+
+    def _refresh_in_background(self, key: str, endpoint: str, params: Optional[Dict]):
+        """Schedule a cache refresh for a stale key, at most one per key."""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch_shared(key, endpoint, params)
+            except TMDbNotFound:
+                pass
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(refresh)
+
+    def _fetch(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
+        """
+        Fetch a payload from the TMDb API, bypassing the cache.
+
+        Requests are refused without touching the network while the circuit
+        breaker is open or the shared rate limit cannot be met in time.
+        Raises TMDbNotFound on a 404; other failures return None.
+        """
         if not self.api_key:
             print("Warning: TMDB_API_KEY not configured")
             return None
 
+        if not self.breaker.allow_request():
+            return None
+        if not self.rate_limiter.acquire():
+            print(f"TMDb rate limit: dropped request to {endpoint}")
+            return None
+
         url = f"{self.base_url}{endpoint}"
         default_params = {'api_key': self.api_key, 'language': 'en-US'}
 
@@ -38,39 +232,58 @@ class TMDbService:
             default_params.update(params)
 
         try:
-            response = requests.get(url, params=default_params, timeout=10)
+            response = self.session.get(url, params=default_params, timeout=self._get_timeout(endpoint))
             response.raise_for_status()
-            return response.json()
+            data = response.json()
         except requests.exceptions.RequestException as e:
             print(f"TMDb API Error: {e}")
+            status_code = e.response.status_code if e.response is not None else None
+            if is_upstream_failure(status_code):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            if status_code == 404:
+                raise TMDbNotFound(endpoint) from e
             return None
 
-    def search_movies(self, query: str, page: int = 1) -> Dict:
+        self.breaker.record_success()
+        return data
+
+    def search_movies(self, query: str, page: int = 1, fallback: bool = False) -> Dict:
         """
         Search for movies by title.
 
         Example: GET /search/movie?api_key=XXX&query=Inception
+
+        Pass fallback=True to search the local catalog if TMDb cannot be
+        reached (the same applies to the other read methods).
         """
         data = self._make_request('/search/movie', {'query': query, 'page': page})
+        if data is None and fallback:
+            return self._local_fallback('search_movies', query, page)
         return self._format_movie_results(data)
 
-    def get_popular_movies(self, page: int = 1) -> Dict:
+    def get_popular_movies(self, page: int = 1, fallback: bool = False) -> Dict:
         """
         Get popular movies.
 
         Example: GET /movie/popular?api_key=XXX&page=1
         """
         data = self._make_request('/movie/popular', {'page': page})
+        if data is None and fallback:
+            return self._local_fallback('popular_movies', page)
         return self._format_movie_results(data)
 
-    def get_top_rated_movies(self, page: int = 1) -> Dict:
+    def get_top_rated_movies(self, page: int = 1, fallback: bool = False) -> Dict:
         """
         Get top rated movies.
         """
         data = self._make_request('/movie/top_rated', {'page': page})
+        if data is None and fallback:
+            return self._local_fallback('top_rated_movies', page)
         return self._format_movie_results(data)
 
-    def get_movie_details(self, movie_id: int) -> Optional[Dict]:
+    def get_movie_details(self, movie_id: int, fallback: bool = False) -> Optional[Dict]:
         """
         Get detailed information about a movie.
 
@@ -79,6 +292,8 @@ class TMDbService:
         data = self._make_request(f'/movie/{movie_id}')
         if data:
             return self._format_movie_detail(data)
+        if fallback:
+            return self._local_fallback('movie_detail', movie_id)
         return None
 
     def get_movie_videos(self, movie_id: int) -> List[Dict]:
@@ -88,45 +303,124 @@ class TMDbService:
         Example: GET /movie/{movie_id}/videos?api_key=XXX
         """
         data = self._make_request(f'/movie/{movie_id}/videos')
-        if data and 'results' in data:
-            # Filter for YouTube trailers
-            trailers = [
-                v for v in data['results']
-                if v.get('site') == 'YouTube' and v.get('type') == 'Trailer'
-            ]
-            return trailers
-        return []
+        return self._format_videos(data)
 
     def get_movie_credits(self, movie_id: int) -> Dict:
         """
         Get movie cast and crew.
         """
         data = self._make_request(f'/movie/{movie_id}/credits')
-        if data:
-            return {
-                'cast': data.get('cast', [])[:10],  # Top 10 actors
-                'crew': data.get('crew', [])
-            }
-        return {'cast': [], 'crew': []}
+        return self._format_credits(data)
+
+    def get_movie_bundle(self, movie_id: int, use_cache: bool = True, fallback: bool = False,
+                         raise_not_found: bool = False) -> Optional[Dict]:
+        """
+        Get movie details, trailers and credits in one round trip.
+
+        Example: GET /movie/{movie_id}?api_key=XXX&append_to_response=videos,credits
+
+        Returns a dict with 'details', 'videos' and 'credits'. The details
+        also carry 'trailer_url', 'actors' and 'director' derived from the
+        other two. If TMDb leaves out an appended part, it is fetched
+        separately, concurrently with any other missing part.
+        Pass use_cache=False to force a fresh copy from TMDb, and
+        fallback=True to serve the local copy of the movie if TMDb cannot be
+        reached. With raise_not_found=True, TMDbNotFound is raised for ids
+        TMDb does not know instead of returning None.
+        """
+        data = self._make_request(
+            f'/movie/{movie_id}', {'append_to_response': 'videos,credits'},
+            use_cache=use_cache, raise_not_found=raise_not_found,
+        )
+        if not data:
+            if not fallback:
+                return None
+            return self._local_bundle(self._local_fallback('movie_detail', movie_id))
+
+        videos = self._format_videos(data['videos']) if 'videos' in data else None
+        credits = self._format_credits(data['credits']) if 'credits' in data else None
+
+        if videos is None or credits is None:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                videos_future = executor.submit(self.get_movie_videos, movie_id) if videos is None else None
+                credits_future = executor.submit(self.get_movie_credits, movie_id) if credits is None else None
+                if videos_future:
+                    videos = videos_future.result()
+                if credits_future:
+                    credits = credits_future.result()
 
-    def get_genres(self) -> List[Dict]:
+        return self._format_bundle(data, videos, credits)
+
+    def get_genres(self, fallback: bool = False) -> List[Dict]:
         """
         Get list of all movie genres.
 
         Example: GET /genre/movie/list?api_key=XXX
         """
         data = self._make_request('/genre/movie/list')
-        if data and 'genres' in data:
-            return data['genres']
-        return []
+        if data is None:
+            return self._local_fallback('genres') if fallback else []
+        return data.get('genres', [])
+
+    def get_movie_changes(self, start_date: str, end_date: str, page: int = 1) -> Optional[Dict]:
+        """
+        Get ids of movies changed on TMDb between two dates (at most 14 days apart).
+
+        Example: GET /movie/changes?api_key=XXX&start_date=2024-01-01&end_date=2024-01-02&page=1
+
+        Returns {'ids': [...], 'page': n, 'total_pages': n}, or None if TMDb
+        could not be reached, so callers can tell "no changes" from failure.
+        """
+        params = {'start_date': start_date, 'end_date': end_date, 'page': page}
+        data = self._make_request('/movie/changes', params, use_cache=False)
+        if data is None:
+            return None
+        return {
+            'ids': [item['id'] for item in data.get('results', []) if item.get('id')],
+            'page': data.get('page', page),
+            'total_pages': data.get('total_pages', 0),
+        }
 
     def discover_movies(self, genre_ids: List[int] = None, year: int = None,
-                       min_rating: float = None, page: int = 1) -> Dict:
+                       min_rating: float = None, page: int = 1, fallback: bool = False) -> Dict:
         """
         Discover movies with filters.
 
         Example: GET /discover/movie?api_key=XXX&with_genres=28,12&primary_release_year=2023
         """
+        params = self._discover_params(genre_ids, year, min_rating, page)
+        data = self._make_request('/discover/movie', params)
+        if data is None and fallback:
+            return self._local_fallback('discover_movies', genre_ids, year, min_rating, page)
+        return self._format_movie_results(data)
+
+    def _local_fallback(self, name: str, *args):
+        """
+        Serve a read from the local catalog while TMDb is unavailable.
+
+        `name` is a function of movies.local_catalog returning data in the
+        same shape as the corresponding TMDbService method.
+        """
+        from . import local_catalog
+
+        self._incr_degraded('local_fallbacks')
+        return getattr(local_catalog, name)(*args)
+
+    def _local_bundle(self, details: Optional[Dict]) -> Optional[Dict]:
+        """Wrap locally served details in the get_movie_bundle shape."""
+        if details is None:
+            return None
+        return {'details': details, 'videos': [], 'credits': {'cast': [], 'crew': []}}
+
+    def _incr_degraded(self, counter: str):
+        with self._degraded_lock:
+            self._degraded_counters[counter] += 1
+
+    def _discover_params(self, genre_ids: List[int] = None, year: int = None,
+                         min_rating: float = None, page: int = 1) -> Dict:
+        """
+        Build /discover/movie query parameters from filters.
+        """
         params = {'page': page, 'sort_by': 'popularity.desc'}
 
         if genre_ids:
@@ -136,8 +430,7 @@ class TMDbService:
         if min_rating:
             params['vote_average.gte'] = min_rating
 
-        data = self._make_request('/discover/movie', params)
-        return self._format_movie_results(data)
+        return params
 
     def _format_movie_results(self, data: Optional[Dict]) -> Dict:
         """
@@ -157,6 +450,7 @@ class TMDbService:
                 'backdrop_url': f"{self.image_base_url}{movie.get('backdrop_path')}" if movie.get('backdrop_path') else '',
                 'tmdb_rating': movie.get('vote_average'),
                 'tmdb_vote_count': movie.get('vote_count'),
+                'popularity': movie.get('popularity'),
                 'genre_ids': movie.get('genre_ids', [])
             })
 
@@ -181,12 +475,64 @@ class TMDbService:
             'backdrop_url': f"{self.image_base_url}{data.get('backdrop_path')}" if data.get('backdrop_path') else '',
             'tmdb_rating': data.get('vote_average'),
             'tmdb_vote_count': data.get('vote_count'),
+            'popularity': data.get('popularity'),
             'genres': [g['name'] for g in data.get('genres', [])],
             'genre_ids': [g['id'] for g in data.get('genres', [])],
             'language': data.get('original_language'),
             'homepage': data.get('homepage'),
         }
 
+    def cache_stats(self) -> Dict:
+        """Get response cache hit/miss counters for this process."""
+        return self.cache.stats()
+
+    def singleflight_stats(self) -> Dict:
+        """Get request coalescing counters for this process."""
+        return self.singleflight.stats()
+
+    def resilience_stats(self) -> Dict:
+        """Get circuit breaker, rate limiter and fallback metrics."""
+        with self._degraded_lock:
+            degraded = dict(self._degraded_counters)
+        return {
+            'breaker': self.breaker.stats(),
+            'rate_limiter': self.rate_limiter.stats(),
+            'degraded': degraded,
+        }
+
+    def _format_bundle(self, data: Dict, videos: List[Dict], credits: Dict) -> Dict:
+        """
+        Combine a details payload with formatted videos and credits.
+        """
+        details = self._format_movie_detail(data)
+        details['trailer_url'] = f"https://www.youtube.com/watch?v={videos[0]['key']}" if videos else ''
+        details['actors'] = [actor['name'] for actor in credits['cast'][:10]]
+        details['director'] = next((crew['name'] for crew in credits['crew'] if crew.get('job') == 'Director'), '')
+
+        return {'details': details, 'videos': videos, 'credits': credits}
+
+    def _format_videos(self, data: Optional[Dict]) -> List[Dict]:
+        """
+        Filter a videos payload down to YouTube trailers.
+        """
+        if data and 'results' in data:
+            return [
+                v for v in data['results']
+                if v.get('site') == 'YouTube' and v.get('type') == 'Trailer'
+            ]
+        return []
+
+    def _format_credits(self, data: Optional[Dict]) -> Dict:
+        """
+        Format a credits payload: top 10 cast members and the full crew.
+        """
+        if data:
+            return {
+                'cast': data.get('cast', [])[:10],  # Top 10 actors
+                'crew': data.get('crew', [])
+            }
+        return {'cast': [], 'crew': []}
+
     def get_poster_url(self, poster_path: str) -> str:
         """Get full poster URL from path"""
         if poster_path:
@@ -5,6 +5,7 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from figflix.pagination import paginate
 from .models import ChatMessage
 from .serializers import ChatMessageSerializer
 from .recommendation_engine import RecommendationEngine
@@ -92,10 +93,10 @@ def get_chat_history_view(request):
     """
     Get chat history for the current user.
     GET /api/recommendations/chat/history/
+    GET /api/recommendations/chat/history/?cursor=   (paginated, oldest first)
     """
     messages = ChatMessage.objects.filter(user=request.user)
-    serializer = ChatMessageSerializer(messages, many=True)
-    return Response(serializer.data)
+    return paginate(request, messages, ChatMessageSerializer, ('created_at', 'id'))
 
 
 @api_view(['DELETE'])
@@ -26,3 +26,6 @@ class ChatMessage(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='chat_user_created_idx'),
+        ]
@@ -3,12 +3,21 @@ AI-powered movie recommendation engine.
 """
 from typing import List, Dict
 from movies.tmdb_service import tmdb_service
-from movies.models import Movie, WatchHistory, Genre
+from movies.genre_registry import genre_registry
+from movies.models import Genre, Movie, WatchHistory
 from reviews.models import Review
 from accounts.models import UserPreference
 from django.db.models import Avg
 
 
+def highly_rated_genre_ids(user):
+    """TMDb ids of the genres of movies the user rated 4 stars or more."""
+    movie_ids = Review.objects.filter(user=user, rating__gte=4).values('movie_id')
+    return Genre.objects.filter(
+        movies__in=movie_ids, tmdb_id__isnull=False
+    ).order_by().values_list('tmdb_id', flat=True).distinct()
+
+
 class RecommendationEngine:
     """
     AI recommendation engine that suggests movies based on:
@@ -37,20 +46,16 @@ class RecommendationEngine:
         # Get genre IDs from favorite genres
         genre_ids = []
         if prefs.favorite_genres:
-            genres = Genre.objects.filter(name__in=prefs.favorite_genres)
-            genre_ids = [g.tmdb_id for g in genres if g.tmdb_id]
+            genre_ids = genre_registry.tmdb_ids_for_names(prefs.favorite_genres)
 
         # Get movies user has already watched
         watched_movie_ids = WatchHistory.objects.filter(
             user=self.user
         ).values_list('movie__tmdb_id', flat=True)
 
-        # Get highly rated genres from user's reviews
-        user_reviews = Review.objects.filter(user=self.user, rating__gte=4)
-        highly_rated_genres = []
-        for review in user_reviews:
-            movie_genres = review.movie.genres.all()
-            highly_rated_genres.extend([g.tmdb_id for g in movie_genres if g.tmdb_id])
+        # Get highly rated genres from user's reviews (one query, served
+        # by review_user_rating_idx and the movie-genre index)
+        highly_rated_genres = list(highly_rated_genre_ids(self.user))
 
         # Combine preferred and highly rated genres
         all_genre_ids = list(set(genre_ids + highly_rated_genres))
@@ -60,7 +65,8 @@ class RecommendationEngine:
             tmdb_results = tmdb_service.discover_movies(
                 genre_ids=all_genre_ids,
                 min_rating=prefs.min_rating if prefs.min_rating > 0 else None,
-                page=1
+                page=1,
+                fallback=True,
             )
 
             # Filter out already watched movies
@@ -93,7 +99,7 @@ class RecommendationEngine:
             return []
 
         # Discover similar movies
-        tmdb_results = tmdb_service.discover_movies(genre_ids=genre_ids, page=1)
+        tmdb_results = tmdb_service.discover_movies(genre_ids=genre_ids, page=1, fallback=True)
 
         similar = []
         for tmdb_movie in tmdb_results.get('results', []):
@@ -109,7 +115,7 @@ class RecommendationEngine:
         """
         Fallback: get popular movies from TMDb.
         """
-        tmdb_results = tmdb_service.get_popular_movies(page=1)
+        tmdb_results = tmdb_service.get_popular_movies(page=1, fallback=True)
         return tmdb_results.get('results', [])[:limit]
 
     def generate_chat_response(self, user_message: str) -> str:
@@ -153,17 +159,14 @@ class RecommendationEngine:
         """
         Get recommendations for a specific genre.
         """
-        try:
-            genre = Genre.objects.get(name__iexact=genre_name)
-            if genre.tmdb_id:
-                tmdb_results = tmdb_service.discover_movies(genre_ids=[genre.tmdb_id], page=1)
-                movies = tmdb_results.get('results', [])[:3]
-
-                if movies:
-                    movie_list = '\n'.join([f"- {m['title']} ({m['release_year']}) - Rating: {m['tmdb_rating']}/10" for m in movies])
-                    return f"Here are some great {genre_name} movies:\n\n{movie_list}\n\nWould you like more suggestions?"
-        except Genre.DoesNotExist:
-            pass
+        genre = genre_registry.get_by_name(genre_name)
+        if genre and genre.tmdb_id:
+            tmdb_results = tmdb_service.discover_movies(genre_ids=[genre.tmdb_id], page=1, fallback=True)
+            movies = tmdb_results.get('results', [])[:3]
+
+            if movies:
+                movie_list = '\n'.join([f"- {m['title']} ({m['release_year']}) - Rating: {m['tmdb_rating']}/10" for m in movies])
+                return f"Here are some great {genre_name} movies:\n\n{movie_list}\n\nWould you like more suggestions?"
 
         return f"I don't have enough {genre_name} movies yet, but I'm working on it! Try asking for other genres."
 
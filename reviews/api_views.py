@@ -6,20 +6,23 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from figflix.conditional import conditional_get
+from figflix.pagination import paginate
 from movies.models import Movie
 from .models import Review
 from .serializers import ReviewSerializer, ReviewCreateUpdateSerializer
 
 
 @api_view(['GET'])
+@conditional_get(Review, Movie)
 def movie_reviews_view(request, movie_id):
     """
     Get all reviews for a movie.
     GET /api/reviews/movie/{movie_id}/
+    GET /api/reviews/movie/{movie_id}/?cursor=   (paginated)
     """
-    reviews = Review.objects.filter(movie_id=movie_id)
-    serializer = ReviewSerializer(reviews, many=True)
-    return Response(serializer.data)
+    reviews = Review.objects.filter(movie_id=movie_id).select_related('user', 'movie')
+    return paginate(request, reviews, ReviewSerializer, ('-created_at', '-id'))
 
 
 @api_view(['POST'])
@@ -109,28 +112,26 @@ def user_reviews_view(request):
     """
     Get all reviews by the current user.
     GET /api/reviews/my-reviews/
+    GET /api/reviews/my-reviews/?cursor=   (paginated)
     """
-    reviews = Review.objects.filter(user=request.user)
-    serializer = ReviewSerializer(reviews, many=True)
-    return Response(serializer.data)
+    reviews = Review.objects.filter(user=request.user).select_related('user', 'movie')
+    return paginate(request, reviews, ReviewSerializer, ('-created_at', '-id'))
 
 
 @api_view(['GET'])
+@conditional_get(Movie)
 def movie_average_rating_view(request, movie_id):
     """
     Get average rating for a movie.
     GET /api/reviews/movie/{movie_id}/average/
     """
     movie = get_object_or_404(Movie, pk=movie_id)
-    reviews = Review.objects.filter(movie=movie)
 
-    if reviews.exists():
-        from django.db.models import Avg
-        avg_rating = reviews.aggregate(Avg('rating'))['rating__avg']
+    if movie.rating_count:
         return Response({
             'movie_id': movie_id,
-            'average_rating': round(avg_rating, 1),
-            'total_reviews': reviews.count()
+            'average_rating': round(movie.rating_avg, 1),
+            'total_reviews': movie.rating_count
         })
     else:
         return Response({
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_hot_path_indexes'),
+        ('reviews', '0002_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', 'rating', 'movie'], name='review_user_rating_idx'),
+        ),
+    ]
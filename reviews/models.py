@@ -1,7 +1,7 @@
 """
 Models for reviews and ratings.
 """
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from movies.models import Movie
@@ -28,6 +28,19 @@ class Review(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.movie.title} ({self.rating}★)"
 
+    def save(self, *args, **kwargs):
+        # The signals updating Movie's rating counters (signals.py) run in
+        # the same transaction as the write
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
         unique_together = ['user', 'movie']  # One review per user per movie
+        indexes = [
+            # Keyset pagination of per-movie and per-user review lists
+            models.Index(fields=['movie', '-created_at', '-id'], name='review_movie_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='review_user_created_idx'),
+            # A user's highly rated movies (recommendation engine), index-only
+            models.Index(fields=['user', 'rating', 'movie'], name='review_user_rating_idx'),
+        ]
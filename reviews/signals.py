@@ -0,0 +1,77 @@
+"""
+Keep Movie.rating_count/rating_sum/rating_avg in sync with reviews, and
+the reviews table version (figflix/conditional.py) current.
+
+Runs for every review write made through the ORM (API views, template
+views, admin, cascades). Bulk QuerySet.update() bypasses signals; run
+`manage.py repair_movie_ratings` after such changes.
+
+Counter deltas are taken against the stored review, read and locked in the
+same transaction as the write (Review.save() and deletes run in one), so
+concurrent edits of a review cannot apply a change twice or from a stale
+copy.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from figflix.conditional import bump
+from movies.models import Movie
+from .models import Review
+
+RATING_FIELDS = {'movie', 'movie_id', 'rating'}
+
+
+def _stored_rating(review):
+    """(movie_id, rating) of the review's row, locked until the transaction ends."""
+    return Review.objects.select_for_update().filter(pk=review.pk).values_list('movie_id', 'rating').first()
+
+
+@receiver(pre_save, sender=Review)
+def lock_rating_on_save(sender, instance, update_fields=None, **kwargs):
+    instance._stored_rating = None
+    if instance.pk is None or (update_fields is not None and not RATING_FIELDS & set(update_fields)):
+        return
+    instance._stored_rating = _stored_rating(instance)
+
+
+@receiver(post_save, sender=Review)
+def apply_rating_on_save(sender, instance, update_fields=None, **kwargs):
+    # Saves limited to other fields (including those of deferred instances)
+    # cannot change the counters, so the rating is not loaded for them
+    if update_fields is not None and not RATING_FIELDS & set(update_fields):
+        return
+    stored = instance._stored_rating
+    if stored is None:
+        Movie.objects.filter(pk=instance.movie_id).add_ratings(1, instance.rating)
+        return
+    old_movie_id, old_rating = stored
+    if old_movie_id != instance.movie_id:
+        Movie.objects.filter(pk=old_movie_id).add_ratings(-1, -old_rating)
+        Movie.objects.filter(pk=instance.movie_id).add_ratings(1, instance.rating)
+    elif old_rating != instance.rating:
+        Movie.objects.filter(pk=instance.movie_id).add_ratings(0, instance.rating - old_rating)
+
+
+@receiver(pre_delete, sender=Review)
+def lock_rating_on_delete(sender, instance, **kwargs):
+    instance._stored_rating = _stored_rating(instance)
+
+
+@receiver(post_delete, sender=Review)
+def apply_rating_on_delete(sender, instance, **kwargs):
+    if instance._stored_rating is not None:
+        movie_id, rating = instance._stored_rating
+        Movie.objects.filter(pk=movie_id).add_ratings(-1, -rating)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_version(sender, **kwargs):
+    bump(Review)
+
+
+@receiver(post_save, sender=get_user_model())
+def bump_review_version_on_rename(sender, created, update_fields=None, **kwargs):
+    # Reviews embed usernames; logins only save last_login
+    if not created and (update_fields is None or 'username' in update_fields):
+        bump(Review)
@@ -0,0 +1,121 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from movies.models import Movie
+from .models import Review
+
+
+class ReviewQueryCountTests(TestCase):
+    """Review lists run a fixed number of queries, however many reviews they return."""
+
+    def setUp(self):
+        cache.clear()
+        self.movie = Movie.objects.create(title='Reviewed Movie', release_year=2001)
+        self.author = User.objects.create_user(username='author', email='author@example.com', password='x')
+        self._add_reviews(3)
+        self.client = APIClient()
+
+    def _add_reviews(self, count):
+        """`count` reviews of self.movie by new users, and as many by self.author of new movies."""
+        start = User.objects.count()
+        for i in range(start, start + count):
+            reviewer = User.objects.create_user(username=f'reviewer{i}', email=f'reviewer{i}@example.com')
+            Review.objects.create(user=reviewer, movie=self.movie, rating=i % 5 + 1, review_text='Fine')
+            other = Movie.objects.create(title=f'Other {i}', release_year=2000)
+            Review.objects.create(user=self.author, movie=other, rating=3)
+
+    def assertConstantQueries(self, num, url, user=None):
+        """`num` queries for `url` now, and again after more reviews are added."""
+        if user is not None:
+            self.client.force_authenticate(user)
+        for grow in (0, 7):
+            self._add_reviews(grow)
+            cache.clear()
+            with self.assertNumQueries(num):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_movie_reviews(self):
+        # reviews joined with their user and movie
+        response = self.assertConstantQueries(1, f'/api/reviews/movie/{self.movie.pk}/')
+        self.assertEqual(len(response.json()), 10)
+
+    def test_user_reviews(self):
+        response = self.assertConstantQueries(1, '/api/reviews/my-reviews/', user=self.author)
+        self.assertEqual(len(response.json()), 10)
+
+    def test_movie_average_rating(self):
+        # Served from the denormalized rating columns on Movie
+        response = self.assertConstantQueries(1, f'/api/reviews/movie/{self.movie.pk}/average/')
+        self.assertEqual(response.json()['total_reviews'], 10)
+
+
+class RatingCounterTests(TestCase):
+    """Movie rating counters follow review writes and agree with a full recompute."""
+
+    def setUp(self):
+        self.first = Movie.objects.create(title='First', release_year=2001)
+        self.second = Movie.objects.create(title='Second', release_year=2002)
+        self.users = [User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com') for i in range(3)]
+
+    def assertCounters(self, movie, count, total):
+        """`movie`'s counters are (count, total), as recompute_ratings() would set them."""
+        columns = ('rating_count', 'rating_sum', 'rating_avg')
+        stored = Movie.objects.filter(pk=movie.pk).values_list(*columns).get()
+        Movie.objects.filter(pk=movie.pk).recompute_ratings()
+        self.assertEqual(stored, Movie.objects.filter(pk=movie.pk).values_list(*columns).get())
+        self.assertEqual(stored, (count, total, total / count if count else None))
+
+    def test_create_update_delete(self):
+        review = Review.objects.create(user=self.users[0], movie=self.first, rating=4)
+        Review.objects.create(user=self.users[1], movie=self.first, rating=1)
+        self.assertCounters(self.first, 2, 5)
+
+        review.rating = 5
+        review.save()
+        self.assertCounters(self.first, 2, 6)
+
+        review.delete()
+        self.assertCounters(self.first, 1, 1)
+
+        Review.objects.filter(movie=self.first).delete()
+        self.assertCounters(self.first, 0, 0)
+
+    def test_move_to_another_movie(self):
+        review = Review.objects.create(user=self.users[0], movie=self.first, rating=4)
+        Review.objects.create(user=self.users[1], movie=self.second, rating=2)
+
+        review.movie = self.second
+        review.rating = 3
+        review.save()
+
+        self.assertCounters(self.first, 0, 0)
+        self.assertCounters(self.second, 2, 5)
+
+    def test_stale_copies_do_not_drift(self):
+        review = Review.objects.create(user=self.users[0], movie=self.first, rating=3)
+        # Two requests editing the same review, each from its own copy
+        one, other = Review.objects.get(pk=review.pk), Review.objects.get(pk=review.pk)
+
+        one.rating = 5
+        one.save()
+        other.rating = 2
+        other.save()
+        self.assertCounters(self.first, 1, 2)
+
+        one.delete()
+        other.delete()
+        self.assertCounters(self.first, 0, 0)
+
+    def test_deferred_rating_is_not_loaded(self):
+        review = Review.objects.create(user=self.users[0], movie=self.first, rating=4)
+
+        # The select and the update only: nothing reads the deferred fields
+        with self.assertNumQueries(2):
+            review = Review.objects.only('review_text').get(pk=review.pk)
+            review.review_text = 'Better on a second watch'
+            review.save()
+        self.assertCounters(self.first, 1, 4)
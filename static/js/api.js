@@ -27,6 +27,53 @@ axios.defaults.headers.common['X-CSRFToken'] = csrftoken;
 // API base URLs
 const API_BASE = '/api';
 
+/**
+ * Conditional GET: remember the ETag and body of GET responses and send
+ * If-None-Match on the next request for the same URL. A 304 is answered
+ * from the remembered body, so callers always see a normal 200 response.
+ */
+const ETAG_CACHE_MAX_ENTRIES = 100;
+const etagCache = new Map();
+
+function etagCacheKey(config) {
+    return axios.getUri(config);
+}
+
+axios.interceptors.request.use((config) => {
+    if ((config.method || 'get').toLowerCase() !== 'get') {
+        return config;
+    }
+    const cached = etagCache.get(etagCacheKey(config));
+    if (cached) {
+        config.headers = config.headers || {};
+        config.headers['If-None-Match'] = cached.etag;
+        config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304;
+    }
+    return config;
+});
+
+axios.interceptors.response.use((response) => {
+    const config = response.config;
+    if ((config.method || 'get').toLowerCase() !== 'get') {
+        return response;
+    }
+    const key = etagCacheKey(config);
+    if (response.status === 304) {
+        const cached = etagCache.get(key);
+        return { ...response, status: 200, data: cached ? cached.data : response.data };
+    }
+    const etag = response.headers && response.headers.etag;
+    if (etag) {
+        // Re-insert so the Map's order is least recently used first
+        etagCache.delete(key);
+        etagCache.set(key, { etag, data: response.data });
+        if (etagCache.size > ETAG_CACHE_MAX_ENTRIES) {
+            etagCache.delete(etagCache.keys().next().value);
+        }
+    }
+    return response;
+});
+
 /**
  * API client for making requests
  */
@@ -51,6 +98,10 @@ const API = {
     // Movies
     movies: {
         list: (params) => axios.get(`${API_BASE}/movies/`, { params }),
+        facets: (params) => axios.get(`${API_BASE}/movies/facets/`, { params }),
+        autocomplete: (q, limit = 8) => axios.get(`${API_BASE}/movies/autocomplete/`, {
+            params: { q, limit }
+        }),
         get: (id) => axios.get(`${API_BASE}/movies/${id}/`),
         create: (data) => axios.post(`${API_BASE}/movies/create/`, data, {
             headers: { 'Content-Type': 'multipart/form-data' }
@@ -78,7 +129,9 @@ const API = {
 
         // Watch history
         watchHistory: {
-            list: () => axios.get(`${API_BASE}/movies/watch-history/`),
+            list: () => axios.get(`${API_BASE}/movies/watch-history/`, {
+                params: { view: 'card' }
+            }),
             add: (movieId) => axios.post(`${API_BASE}/movies/watch-history/add/`, { movie_id: movieId }),
         }
     },
@@ -64,7 +64,7 @@ async function loadWatchHistory() {
         container.innerHTML = history.slice(0, 10).map(item => `
             <a href="/movies/${item.movie.id}/" class="movie-card">
                 <img
-                    src="${item.movie.poster_image_url || 'https://via.placeholder.com/300x450?text=No+Poster'}"
+                    src="${item.movie.poster_variant_url || item.movie.poster_image_url || 'https://via.placeholder.com/300x450?text=No+Poster'}"
                     alt="${item.movie.title}"
                     class="w-full h-auto rounded-lg shadow-lg"
                     onerror="this.src='https://via.placeholder.com/300x450?text=No+Poster'"
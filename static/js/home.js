@@ -193,7 +193,7 @@ function displayMovies(movies) {
 
         const rating = movie.average_rating != null ? movie.average_rating.toFixed(1) :
                       movie.tmdb_rating != null ? movie.tmdb_rating.toFixed(1) : 'N/A';
-        const posterUrl = movie.poster_image_url || movie.poster_url || 'https://via.placeholder.com/300x450?text=No+Poster';
+        const posterUrl = movie.poster_variant_url || movie.poster_image_url || movie.poster_url || 'https://via.placeholder.com/300x450?text=No+Poster';
         const badge = isLocal ? '<span class="bg-green-600 text-xs px-2 py-1 rounded">Our Collection</span>' :
                                 '<span class="bg-blue-600 text-xs px-2 py-1 rounded">TMDb</span>';
 
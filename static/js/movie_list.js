@@ -13,6 +13,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     // Set up event listeners
     document.getElementById('searchInput').addEventListener('input', debounce(handleSearch, 500));
+    document.getElementById('searchInput').addEventListener('input', debounce(loadSuggestions, 100));
     document.getElementById('genreFilter').addEventListener('change', handleFilterChange);
     document.getElementById('sortBy').addEventListener('change', handleFilterChange);
 });
@@ -28,8 +29,9 @@ async function loadGenres() {
         const genreFilter = document.getElementById('genreFilter');
         genres.forEach(genre => {
             const option = document.createElement('option');
-            option.value = genre.name;
+            option.value = genre.slug;
             option.textContent = genre.name;
+            option.dataset.name = genre.name;
             genreFilter.appendChild(option);
         });
     } catch (error) {
@@ -37,6 +39,37 @@ async function loadGenres() {
     }
 }
 
+/**
+ * Show how many local movies each genre option would match,
+ * given the current search
+ */
+async function loadGenreCounts() {
+    try {
+        const params = currentFilters.search ? { search: currentFilters.search } : {};
+        const response = await API.movies.facets(params);
+        const counts = {};
+        response.data.genres.forEach(genre => {
+            counts[genre.name] = genre.count;
+        });
+
+        document.querySelectorAll('#genreFilter option[data-name]').forEach(option => {
+            const name = option.dataset.name;
+            option.textContent = `${name} (${counts[name] || 0})`;
+        });
+    } catch (error) {
+        console.error('Failed to load genre counts:', error);
+    }
+}
+
+/**
+ * Drop the counts when browsing TMDb, where they do not apply
+ */
+function clearGenreCounts() {
+    document.querySelectorAll('#genreFilter option[data-name]').forEach(option => {
+        option.textContent = option.dataset.name;
+    });
+}
+
 /**
  * Load movies based on current source and filters
  */
@@ -51,15 +84,18 @@ async function loadMovies() {
             // Load from local database
             const params = {
                 page: currentPage,
+                view: 'card',
                 ...currentFilters
             };
             console.log('Loading local movies with params:', params);
             response = await API.movies.list(params);
             console.log('Local movies response:', response.data);
             displayLocalMovies(response.data);
+            loadGenreCounts();
 
         } else {
             // Load from TMDb
+            clearGenreCounts();
             const sortBy = currentFilters.sort || 'popular';
 
             if (sortBy === 'popular') {
@@ -98,7 +134,7 @@ function displayLocalMovies(movies) {
         <a href="/movies/${movie.id}/" class="movie-card">
             <div class="relative">
                 <img
-                    src="${movie.poster_image_url || 'https://via.placeholder.com/300x450?text=No+Poster'}"
+                    src="${movie.poster_variant_url || movie.poster_image_url || 'https://via.placeholder.com/300x450?text=No+Poster'}"
                     alt="${movie.title}"
                     class="w-full h-auto rounded-lg shadow-lg"
                     onerror="this.src='https://via.placeholder.com/300x450?text=No+Poster'"
@@ -241,6 +277,41 @@ function handleSearch(e) {
     loadMovies();
 }
 
+/**
+ * Fill the search box suggestions from the local catalog
+ */
+async function loadSuggestions(e) {
+    const query = e.target.value.trim();
+    const datalist = document.getElementById('searchSuggestions');
+
+    if (!query || currentSource !== 'local') {
+        datalist.innerHTML = '';
+        return;
+    }
+
+    try {
+        const response = await API.movies.autocomplete(query);
+        // Ignore answers to keystrokes the user has already typed past
+        if (e.target.value.trim() !== query) {
+            return;
+        }
+        const { titles, directors, actors } = response.data;
+        const values = [
+            ...titles.map(t => t.title),
+            ...directors.map(d => d.name),
+            ...actors.map(a => a.name),
+        ];
+        datalist.innerHTML = '';
+        [...new Set(values)].forEach(value => {
+            const option = document.createElement('option');
+            option.value = value;
+            datalist.appendChild(option);
+        });
+    } catch (error) {
+        console.error('Error loading suggestions:', error);
+    }
+}
+
 /**
  * Handle filter changes
  */